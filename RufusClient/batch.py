@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import time
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+DEFAULT_BATCH_DIR = os.path.join(".rufus_cache", "batches")
+
+
+def batch_line(custom_id, body, endpoint=BATCH_ENDPOINT):
+    """One line of a Batch API input file."""
+    return {"custom_id": custom_id, "method": "POST", "url": endpoint, "body": body}
+
+
+def write_batch_file(requests, path, endpoint=BATCH_ENDPOINT):
+    """
+    Write chat requests as a Batch API JSONL input file.
+
+    Args:
+        requests (dict): custom_id -> request body (model, messages, ...)
+        path (str): File to write
+        endpoint (str, optional): API endpoint every line targets
+
+    Returns:
+        str: ``path``
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for custom_id, body in requests.items():
+            f.write(json.dumps(batch_line(custom_id, body, endpoint), ensure_ascii=False) + "\n")
+    return path
+
+
+def read_batch_results(text):
+    """
+    Parse a Batch API output or error file.
+
+    Yields:
+        tuple: (custom_id, body, error): ``body`` is the response body of a successful
+               request and None otherwise, in which case ``error`` describes the failure
+    """
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") == 200 and not record.get("error"):
+            yield record["custom_id"], response.get("body"), None
+        else:
+            yield record["custom_id"], None, record.get("error") or response.get("body") or "failed"
+
+
+def completion_text(body):
+    """Message text of a chat completion response body."""
+    return (body["choices"][0]["message"].get("content") or "").strip()
+
+
+class BatchRunner:
+    """
+    Runs many chat requests through the Batch API: half the price of
+    interactive calls, with much higher limits, answered within hours.
+
+    ``run`` writes the requests to a JSONL file, uploads it, creates the
+    batch, polls until it finishes and maps the responses back by
+    ``custom_id``. Requests that failed, or that an expired or cancelled
+    batch never ran, are resubmitted in a new batch, up to ``max_attempts``
+    submissions in total.
+
+    The endpoint is whatever the client points at, so a local stand-in
+    server can drive it (``get_llm_client("openai", key, base_url=...)``).
+
+    Attributes:
+        client (OpenAI): Client the files and batches are created with
+        directory (str): Where the JSONL input files are written
+        poll_interval (float): Seconds between status checks
+        max_attempts (int): Submissions per request before it is reported as failed
+        failures (dict): custom_id -> last error, for requests that never succeeded
+        inputs (dict): Batch id -> JSONL input file, until the batch's results are read
+    """
+
+    def __init__(self, client, directory=DEFAULT_BATCH_DIR, poll_interval=60, max_attempts=3,
+                 completion_window="24h", endpoint=BATCH_ENDPOINT):
+        self.client = client
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.completion_window = completion_window
+        self.endpoint = endpoint
+        self.failures = {}
+        self.inputs = {}
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, requests):
+        """
+        Run ``requests`` to completion.
+
+        Args:
+            requests (dict): custom_id -> request body
+
+        Returns:
+            dict: custom_id -> response body for every request that succeeded;
+                  the others are in ``failures``
+        """
+        results = {}
+        self.failures = {}
+        pending = dict(requests)
+        for attempt in range(1, self.max_attempts + 1):
+            if not pending:
+                break
+            batch = self.wait(self.submit(pending))
+            succeeded, failed = self.collect(batch)
+            self.discard_input(batch.id)
+            for custom_id in pending:
+                if custom_id in succeeded:
+                    results[custom_id] = succeeded[custom_id]
+                else:
+                    # Lines missing from both files were never run (expired or cancelled batch)
+                    self.failures[custom_id] = failed.get(custom_id, f"not run (batch {batch.status})")
+            pending = {custom_id: pending[custom_id] for custom_id in pending if custom_id not in succeeded}
+            for custom_id in succeeded:
+                self.failures.pop(custom_id, None)
+            if pending:
+                self.logger.warning(f"{len(pending)} batch request(s) failed in attempt {attempt} "
+                                    f"of {self.max_attempts}.")
+        return results
+
+    def submit(self, requests):
+        """Write, upload and start one batch; return its id."""
+        path = os.path.join(self.directory, f"batch-{time.time_ns()}.jsonl")
+        write_batch_file(requests, path, self.endpoint)
+        with open(path, "rb") as f:
+            uploaded = self.client.files.create(file=(os.path.basename(path), f.read()), purpose="batch")
+        batch = self.client.batches.create(input_file_id=uploaded.id, endpoint=self.endpoint,
+                                           completion_window=self.completion_window)
+        self.inputs[batch.id] = path
+        self.logger.info(f"Submitted batch {batch.id} with {len(requests)} request(s) from {path}.")
+        return batch.id
+
+    def discard_input(self, batch_id):
+        """Delete a batch's JSONL input file once its results have been read."""
+        path = self.inputs.pop(batch_id, None)
+        if path is None:
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def wait(self, batch_id):
+        """Poll until the batch reaches a terminal status; return the final batch object."""
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in TERMINAL_STATUSES:
+                self.logger.info(f"Batch {batch_id} {batch.status}.")
+                return batch
+            time.sleep(self.poll_interval)
+
+    def collect(self, batch):
+        """
+        Read a finished batch's output and error files.
+
+        Returns:
+            tuple: (succeeded, failed) dicts, custom_id -> response body / error
+        """
+        succeeded, failed = {}, {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            text = self.client.files.content(file_id).text
+            for custom_id, body, error in read_batch_results(text):
+                if body is not None:
+                    succeeded[custom_id] = body
+                else:
+                    failed[custom_id] = error
+        return succeeded, failed
@@ -0,0 +1,230 @@
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+
+DEFAULT_OPTIONS = ("--headless", "--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage")
+
+MEMORY_SCRIPT = "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : null"
+
+
+@lru_cache(maxsize=None)
+def chromedriver_path():
+    # ChromeDriverManager hits the network and the disk; resolve the driver once per process
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def create_chrome_driver(options=DEFAULT_OPTIONS):
+    chrome_options = Options()
+    for option in options:
+        chrome_options.add_argument(option)
+    return webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options)
+
+
+class PooledBrowser:
+    """A WebDriver plus the bookkeeping the pool uses to decide when to recycle it."""
+
+    def __init__(self, driver, baseline_memory):
+        self.driver = driver
+        self.baseline_memory = baseline_memory
+        self.pages_served = 0
+
+
+class BrowserPool:
+    """
+    Bounded, thread-safe pool of Selenium browsers with lease/return semantics.
+
+    A browser is leased by exactly one thread at a time, so concurrent fetches
+    never share a WebDriver. Browsers are reused across pages and crawls and are
+    replaced when they fail a health check, have served ``max_pages_per_browser``
+    pages, or their JS heap grew by more than ``max_memory_growth_mb``.
+
+    Attributes:
+        size (int): Maximum number of live browsers
+        options (tuple): Chrome command line arguments for new browsers
+        logger (logging.Logger): Logging utility for pool activity
+    """
+
+    def __init__(self, size=2, options=DEFAULT_OPTIONS, max_pages_per_browser=50,
+                 max_memory_growth_mb=500, warm=0, driver_factory=None):
+        """
+        Args:
+            size (int, optional): Maximum live browsers. Defaults to 2.
+            options (tuple, optional): Chrome arguments. Defaults to headless options.
+            max_pages_per_browser (int, optional): Recycle a browser after this many leases. Defaults to 50.
+            max_memory_growth_mb (float, optional): Recycle when the JS heap grew by this much. Defaults to 500.
+            warm (int, optional): Browsers to start immediately. Defaults to 0 (start lazily).
+            driver_factory (callable, optional): ``factory(options) -> driver``; defaults to Chrome
+        """
+        self.size = size
+        self.options = tuple(options)
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_memory_growth_mb = max_memory_growth_mb
+        self.driver_factory = driver_factory or create_chrome_driver
+        self.logger = logging.getLogger(__name__)
+        self._idle = []
+        self._live = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        if warm:
+            self.warm_up(warm)
+
+    def warm_up(self, count):
+        """Start up to ``count`` browsers ahead of the first lease."""
+        started = []
+        with self._condition:
+            count = min(count, self.size - self._live)
+            self._live += max(count, 0)
+        try:
+            for _ in range(max(count, 0)):
+                started.append(self._start_browser())
+        finally:
+            with self._condition:
+                self._live -= max(count, 0) - len(started)
+                self._idle.extend(started)
+                self._condition.notify_all()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """
+        Lease a browser for the duration of a ``with`` block.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a free browser. Waits forever if None.
+
+        Yields:
+            WebDriver: A healthy browser owned by the caller until the block exits
+
+        Raises:
+            TimeoutError: If no browser became available within ``timeout``
+            RuntimeError: If the pool is closed
+        """
+        browser = self.acquire(timeout)
+        try:
+            yield browser.driver
+        finally:
+            self.release(browser)
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise RuntimeError("BrowserPool is closed.")
+                while not self._idle and self._live >= self.size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No browser became available within {timeout}s.")
+                    self._condition.wait(remaining)
+                    if self._closed:
+                        raise RuntimeError("BrowserPool is closed.")
+                if self._idle:
+                    browser = self._idle.pop()
+                else:
+                    self._live += 1
+                    browser = None
+
+            if browser is None:
+                try:
+                    return self._start_browser()
+                except Exception:
+                    self._forget()
+                    raise
+            if self.is_healthy(browser):
+                return browser
+            self.logger.warning("Discarding unhealthy browser.")
+            self._quit(browser)
+
+    def release(self, browser):
+        browser.pages_served += 1
+        if self._closed or self.should_recycle(browser):
+            self._quit(browser)
+            return
+        with self._condition:
+            self._idle.append(browser)
+            self._condition.notify()
+
+    def is_healthy(self, browser):
+        try:
+            return browser.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def should_recycle(self, browser):
+        if browser.pages_served >= self.max_pages_per_browser:
+            self.logger.info(f"Recycling browser after {browser.pages_served} pages.")
+            return True
+        memory = self._memory_bytes(browser.driver)
+        if memory is not None and browser.baseline_memory is not None:
+            growth_mb = (memory - browser.baseline_memory) / (1024 * 1024)
+            if growth_mb > self.max_memory_growth_mb:
+                self.logger.info(f"Recycling browser after {growth_mb:.0f} MB of heap growth.")
+                return True
+        return False
+
+    def close(self):
+        """Quit every idle browser; leased browsers are quit when they are returned."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for browser in idle:
+            self._quit(browser)
+
+    def _start_browser(self):
+        driver = self.driver_factory(self.options)
+        self.logger.info("Selenium WebDriver initialized successfully.")
+        return PooledBrowser(driver, self._memory_bytes(driver))
+
+    def _memory_bytes(self, driver):
+        try:
+            return driver.execute_script(MEMORY_SCRIPT)
+        except Exception:
+            return None
+
+    def _quit(self, browser):
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            self.logger.warning(f"Error quitting browser: {e}")
+        self._forget()
+
+    def _forget(self):
+        with self._condition:
+            self._live -= 1
+            self._condition.notify()
+
+
+_shared_pools = {}
+_shared_pools_lock = threading.Lock()
+
+
+def get_browser_pool(options=DEFAULT_OPTIONS, **kwargs):
+    """
+    Return the process-wide BrowserPool for a set of Chrome options.
+
+    The pool is created on first use; ``kwargs`` (size, max_pages_per_browser,
+    ...) only apply at that point.
+    """
+    key = tuple(options)
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = _shared_pools[key] = BrowserPool(options=key, **kwargs)
+        return pool
+
+
+@atexit.register
+def close_browser_pools():
+    with _shared_pools_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,147 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(".rufus_cache", "checkpoints")
+
+
+def checkpoint_path(url, user_prompt, directory=DEFAULT_CHECKPOINT_DIR):
+    """Checkpoint file for one (start URL, prompt) run, so separate runs never share state."""
+    run_key = hashlib.sha256(f"{url.strip()}\n{user_prompt}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(directory, f"{run_key}.sqlite")
+
+
+def content_hash(content):
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CrawlCheckpoint:
+    """
+    Crash-safe record of a crawl and its extractions, written as the run progresses.
+
+    Each fetched page is committed in one SQLite (WAL) transaction that removes
+    it from the frontier, records its content hash and, for relevant pages,
+    its HTML, and adds the links it discovered. A run killed at any point
+    resumes from the last committed page: finished pages are neither
+    refetched nor sent to the LLM again, and a page whose fetch was cut short
+    is simply still on the frontier.
+
+    Attributes:
+        path (str): SQLite database file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # Durable across process crashes in WAL mode
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT UNIQUE NOT NULL,
+                depth INTEGER NOT NULL,
+                score REAL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT,
+                relevant INTEGER NOT NULL,
+                body BLOB
+            );
+            CREATE TABLE IF NOT EXISTS extractions (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT,
+                result TEXT NOT NULL
+            );
+        """)
+        self._db.commit()
+
+    def load(self):
+        """
+        Return the saved crawl state, or None if nothing was recorded yet.
+
+        Returns:
+            dict: ``fetched`` (list of URLs), ``visited`` (relevant URLs) and
+                  ``frontier`` (list of (url, depth, score) in discovery order)
+        """
+        with self._lock:
+            pages = self._db.execute("SELECT url, relevant FROM pages").fetchall()
+            frontier = self._db.execute("SELECT url, depth, score FROM frontier ORDER BY seq").fetchall()
+        if not pages and not frontier:
+            return None
+        return {
+            "fetched": [url for url, _ in pages],
+            "visited": [url for url, relevant in pages if relevant],
+            "frontier": frontier,
+        }
+
+    def record_page(self, url, content, relevant, links=()):
+        """
+        Atomically mark ``url`` as fetched and queue the links found on it.
+
+        Args:
+            url (str): Fetched URL
+            content (str): Page HTML, or None if the fetch failed
+            relevant (bool): Whether the page is kept; only relevant pages store their HTML
+            links (Iterable[tuple], optional): (url, depth, score) entries for the frontier
+        """
+        digest = content_hash(content) if content else None
+        body = zlib.compress(content.encode("utf-8")) if content and relevant else None
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM frontier WHERE url = ?", (url,))
+            self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                             (url, digest, int(bool(relevant)), body))
+            self._db.executemany("INSERT OR IGNORE INTO frontier (url, depth, score) VALUES (?, ?, ?)",
+                                 list(links))
+
+    def add_frontier(self, links):
+        """Queue (url, depth, score) entries found without fetching a page, e.g. from a sitemap."""
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR IGNORE INTO frontier (url, depth, score) VALUES (?, ?, ?)",
+                                 list(links))
+
+    def page(self, url):
+        """HTML saved for a relevant page, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT body FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def extraction(self, url):
+        """Extraction result saved for ``url``, or None if it was never parsed."""
+        with self._lock:
+            row = self._db.execute("SELECT result FROM extractions WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def record_extraction(self, url, result, content=None):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO extractions VALUES (?, ?, ?)",
+                             (url, content_hash(content) if content else None, result))
+
+    def reset(self):
+        """Forget everything, e.g. before a fresh run of the same crawl."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM frontier")
+            self._db.execute("DELETE FROM pages")
+            self._db.execute("DELETE FROM extractions")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def delete(self):
+        """Close the checkpoint and remove its files, once the run it records has completed."""
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self.path + suffix)
+            except FileNotFoundError:
+                pass
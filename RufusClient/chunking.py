@@ -0,0 +1,74 @@
+import re
+
+from .tokens import CHARS_PER_TOKEN, DEFAULT_MODEL, count_tokens, get_encoder
+
+# Structural boundaries of reduced (markdown) content, coarsest first
+HEADING_BOUNDARY = re.compile(r"\n(?=#{1,6} )")
+PARAGRAPH_BOUNDARY = re.compile(r"\n{2,}")
+LINE_BOUNDARY = re.compile(r"\n")
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+BOUNDARIES = (HEADING_BOUNDARY, PARAGRAPH_BOUNDARY, LINE_BOUNDARY, SENTENCE_BOUNDARY)
+SEPARATOR_TOKENS = 1  # The blank line joining two blocks of a chunk
+
+
+def split_into_chunks(text, max_tokens, model=DEFAULT_MODEL):
+    """
+    Split ``text`` into chunks of at most ``max_tokens`` tokens along structural boundaries.
+
+    Sections (markdown headings) are packed together greedily; a section that
+    is too large on its own is split at paragraphs, then lines, then
+    sentences, and only as a last resort at an arbitrary token position.
+    Every block is tokenized once with the cached encoder.
+
+    Args:
+        text (str): Content to split, typically the reducer's markdown
+        max_tokens (int): Token budget per chunk
+        model (str, optional): Model whose tokenizer counts the budget
+
+    Returns:
+        list: Chunks in document order (a single chunk if the text fits)
+    """
+    if not text:
+        return []
+    if count_tokens(text, model) <= max_tokens:
+        return [text]
+    return _pack(_blocks(text, max_tokens, model, 0), max_tokens)
+
+
+def _blocks(text, max_tokens, model, level):
+    # (block, tokens) pairs, each within the budget
+    if level == len(BOUNDARIES):
+        return _hard_split(text, max_tokens, model)
+    blocks = []
+    for part in BOUNDARIES[level].split(text):
+        if not part.strip():
+            continue
+        tokens = count_tokens(part, model)
+        if tokens <= max_tokens:
+            blocks.append((part, tokens))
+        else:
+            blocks.extend(_blocks(part, max_tokens, model, level + 1))
+    return blocks
+
+
+def _hard_split(text, max_tokens, model):
+    encoder = get_encoder(model)
+    if encoder is None:
+        size = max_tokens * CHARS_PER_TOKEN
+        return [(text[i:i + size], count_tokens(text[i:i + size], model)) for i in range(0, len(text), size)]
+    tokens = encoder.encode(text, disallowed_special=())
+    return [(encoder.decode(tokens[i:i + max_tokens]), len(tokens[i:i + max_tokens]))
+            for i in range(0, len(tokens), max_tokens)]
+
+
+def _pack(blocks, max_tokens):
+    chunks, current, current_tokens = [], [], 0
+    for block, tokens in blocks:
+        if current and current_tokens + SEPARATOR_TOKENS + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current_tokens += tokens + (SEPARATOR_TOKENS if current else 0)
+        current.append(block)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
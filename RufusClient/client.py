@@ -1,8 +1,22 @@
 import os
+import copy
 import json
+import asyncio
+import logging
+import threading
 from .crawler import Crawler
 from .parser import Parser
 from .synthesizer import Synthesizer
+from .synthesis_state import SynthesisState, synthesis_state_path
+from .checkpoint import CrawlCheckpoint, checkpoint_path, DEFAULT_CHECKPOINT_DIR
+from .dedup import NearDuplicateIndex
+from .dispatcher import get_llm_dispatcher
+from .batch import BatchRunner, completion_text
+from .llm_clients import get_llm_client
+from .ranking import PassageRanking
+from .reducer import DEFAULT_REDUCER
+from .html_scan import visible_text
+from .pipeline import PagePipeline, Stage
 from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -28,16 +42,56 @@ class RufusClient:
         - Information Synthesis (Synthesizer)
     """
     
-    def __init__(self, user_prompt, max_depth=2):
+    def __init__(self, user_prompt, max_depth=2, http_cache=None, checkpoint_dir=DEFAULT_CHECKPOINT_DIR,
+                 use_sitemaps=False, duplicate_threshold=0.9, llm_cache=None, llm_dispatcher=None,
+                 batch_runner=None, top_k=None, passage_budget=None, incremental_synthesis=False,
+                 queue_size=16, extract_workers=8, html_workers=None):
         """
         Initialize the RufusClient with user specifications.
 
         Args:
             user_prompt (str): Specific search query or topic to explore
             max_depth (int, optional): Maximum website crawling depth. Defaults to 2.
+            http_cache (HttpCache, optional): Persistent HTTP cache so repeat runs revalidate
+                                              pages with conditional GETs instead of refetching them
+            checkpoint_dir (str, optional): Where each run's crash-safe checkpoint is kept, so an
+                                            interrupted scrape can be resumed. The checkpoint is
+                                            deleted once the scrape completes. None disables
+                                            checkpoints (and ``resume``).
+            use_sitemaps (bool, optional): Seed the crawl from robots.txt and sitemaps before
+                                           fetching any page. Defaults to False.
+            duplicate_threshold (float, optional): Shingle Jaccard similarity at which two pages
+                                                   count as near-duplicates; only one page per group
+                                                   is parsed. None parses every page. Defaults to 0.9.
+            llm_cache (LLMCache, optional): Persistent LLM response cache; re-running the same
+                                            prompt over unchanged pages then makes no LLM calls
+            llm_dispatcher (LLMDispatcher, optional): Scheduler that keeps LLM calls under the
+                                                      provider's RPM/TPM limits and retries throttled
+                                                      calls. Defaults to the shared OpenAI dispatcher.
+            batch_runner (BatchRunner, optional): Runs ``scrape(..., batch=True)`` extractions.
+                                                  Defaults to the OpenAI Batch API.
+            top_k (int, optional): Rank every page's passages against the prompt with BM25 (over
+                                   the whole crawl at once) and send only each page's best
+                                   ``top_k`` passages to the LLM. None sends whole pages.
+            passage_budget (int, optional): Token cap on each page's selected passages
+            incremental_synthesis (bool, optional): Keep the synthesized document of each run, with
+                                                    the pages each part came from, next to the
+                                                    checkpoint, and on the next scrape of the same
+                                                    URL and prompt re-synthesize only the parts
+                                                    whose pages changed. Defaults to False.
+            queue_size (int, optional): Pages buffered between two stages of a streaming scrape
+                                        (``scrape(..., stream=True)``). Defaults to 16.
+            extract_workers (int, optional): Pages extracted at the same time by a streaming
+                                             scrape. Defaults to 8.
+            html_workers (HtmlWorkerPool, optional): Process pool that reduces pages to markdown
+                                                     and scans them for links, so this CPU-bound
+                                                     work scales with cores instead of serialising
+                                                     on the GIL. Pass ``get_html_workers()`` for
+                                                     the shared pool. None does it in-process.
 
         Raises:
-            ValueError: If OpenAI API key is not found in environment variables
+            ValueError: If OpenAI API key is not found in environment variables, or if
+                        ``incremental_synthesis`` is set without a checkpoint_dir
         
         Environment Setup:
             - Loads API key from .env file
@@ -45,12 +99,35 @@ class RufusClient:
         """
         self.user_prompt = user_prompt
         self.max_depth = max_depth
+        self.http_cache = http_cache
+        self.checkpoint_dir = checkpoint_dir
+        self.use_sitemaps = use_sitemaps
+        self.duplicate_threshold = duplicate_threshold
+        self.llm_cache = llm_cache
+        self.llm_dispatcher = llm_dispatcher if llm_dispatcher is not None else get_llm_dispatcher("openai")
+        self.batch_runner = batch_runner
+        self.top_k = top_k
+        self.passage_budget = passage_budget
+        self.passage_ranking = None
+        self.passage_reports = {}  # URL -> input tokens and cost at several k, for the last scrape
+        self.incremental_synthesis = incremental_synthesis
+        self.synthesis_report = None  # Sources reused / re-synthesized by the last incremental scrape
+        self.queue_size = queue_size
+        self.extract_workers = extract_workers
+        self.pipeline_stats = None  # Per-stage counters of the last streaming scrape
+        self.html_workers = html_workers
+        self.reducer = html_workers if html_workers is not None else DEFAULT_REDUCER
+        self.skipped_duplicates = {}  # Duplicate URL -> the URL parsed in its place, for the last scrape
+        self.token_reports = {}  # URL -> input tokens before/after HTML reduction, for the last scrape
+        self.logger = logging.getLogger(__name__)
+        if incremental_synthesis and checkpoint_dir is None:
+            raise ValueError("incremental_synthesis keeps its state in checkpoint_dir; it cannot be None.")
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         if not self.openai_api_key:
             raise ValueError("OpenAI API key not found. Please set it in the .env file.")
 
 
-    def scrape(self, url):
+    def scrape(self, url, resume=False, batch=False, stream=False):
         """
         Comprehensive web scraping method that performs:
         1. Web Crawling
@@ -60,46 +137,465 @@ class RufusClient:
 
         Args:
             url (str): Base URL to start web crawling
+            resume (bool, optional): Continue from the last checkpoint of this URL and prompt
+                                     instead of starting over. Pages already fetched are not
+                                     fetched again and pages already parsed are not sent to the
+                                     LLM again. Defaults to False.
+            batch (bool, optional): Extract every page in one Batch API job instead of
+                                    interactive calls: half the price, but it may take hours.
+                                    Defaults to False.
+            stream (bool, optional): Run fetch, reduce, extract and synthesis as concurrent
+                                     stages joined by bounded queues, so each page is extracted
+                                     as soon as it is fetched instead of after the whole crawl.
+                                     Pages are then ranked for ``top_k`` one at a time and
+                                     de-duplicated in arrival order. Defaults to False.
 
         Returns:
             dict: Structured and synthesized documents extracted from web content
 
+        Raises:
+            ValueError: If both ``batch`` and ``stream`` are set, or ``resume`` without a checkpoint_dir
+
         Workflow:
         - Initializes Crawler with base URL and user prompt
-        - Performs concurrent web content retrieval
+        - Reads each page from the crawler's page store (no second download)
+        - Parses one page per group of (near-)duplicates; see ``skipped_duplicates``
+        - With ``top_k``/``passage_budget``, ranks the passages of every page at once
+          and sends only the best ones; see ``passage_reports``
         - Parses retrieved content using Parser
-        - Synthesizes parsed content into structured documents
+        - Synthesizes parsed content into structured documents, updating the
+          previous run's document when ``incremental_synthesis`` is set
+        - Commits every fetched page and every extraction to the run's checkpoint,
+          which is deleted once the scrape completes
         
         Concurrency:
         - Uses ThreadPoolExecutor for parallel content processing
-        - Improves performance by simultaneous URL fetching and parsing
+        - Improves performance by parsing pages simultaneously
 
         Error Handling:
         - Catches and logs exceptions during URL processing
         - Continues processing other URLs if one fails
         """
-        crawler = Crawler(base_url=url, user_prompt=self.user_prompt, max_depth=self.max_depth)
-        crawled_urls = crawler.crawl()
+        if batch and stream:
+            raise ValueError("A scrape can use the Batch API or stream pages to the LLM, not both.")
+        checkpoint = None
+        if self.checkpoint_dir is not None:
+            checkpoint = CrawlCheckpoint(checkpoint_path(url, self.user_prompt, self.checkpoint_dir))
+            if not resume:
+                checkpoint.reset()
+        elif resume:
+            raise ValueError("resume=True needs a checkpoint_dir.")
+        crawler = Crawler(base_url=url, user_prompt=self.user_prompt, max_depth=self.max_depth,
+                          http_cache=self.http_cache, checkpoint=checkpoint, use_sitemaps=self.use_sitemaps,
+                          html_workers=self.html_workers)
 
         aggregated_data = {"extracted_content": []}  
+        self.token_reports = {}
+        synthesizer = Synthesizer(aggregated_data, self.user_prompt, self.openai_api_key, cache=self.llm_cache,
+                                  dispatcher=self.llm_dispatcher)
+        synthesis = None
+        
+        try:
+            if stream:
+                synthesis = None if self.incremental_synthesis else synthesizer.stream()
+                results = self.stream_pages(crawler, synthesis)
+                crawled_urls = list(results)
+            else:
+                crawled_urls = self.deduplicate(crawler, crawler.crawl())
+                self.rank_passages(crawler, crawled_urls)
+                if batch:
+                    results = self.process_pages_batch(crawler, crawled_urls)
+                else:
+                    results = self.process_pages(crawler, crawled_urls)
+            # Crawl order rather than completion order, so identical runs synthesize identical input
+            extractions = {crawled_url: results[crawled_url] for crawled_url in crawled_urls
+                           if results.get(crawled_url)}
+            aggregated_data["extracted_content"] = list(extractions.values())
+        finally:
+            crawler.pages.close()
+            if checkpoint is not None:
+                checkpoint.close()
         
+        if synthesis is not None:
+            structured_documents = synthesis.finish()
+        elif self.incremental_synthesis:
+            state = SynthesisState(synthesis_state_path(url, self.user_prompt, self.checkpoint_dir),
+                                   self.user_prompt, synthesizer.model)
+            structured_documents = synthesizer.synthesize_incremental(extractions, state)
+            self.synthesis_report = synthesizer.report
+        else:
+            structured_documents = synthesizer.synthesize()
+
+        if checkpoint is not None:
+            checkpoint.delete()  # The run completed: there is nothing left to resume
+        return structured_documents
+
+    def stream_pages(self, crawler, synthesis=None):
+        """
+        Crawl and parse at the same time: a PagePipeline of fetch -> reduce -> extract -> synthesize.
+
+        The crawl hands every relevant page to the reduce stage as soon as it is
+        stored. One worker (one per ``html_workers`` process) de-duplicates and
+        reduces pages into chunks, and ``extract_workers`` workers extract them.
+        Each extraction then goes to the synthesis stream, which structures full
+        batches while the crawl is still running. The queues between the stages
+        hold ``queue_size`` pages, so a slow LLM throttles the crawl instead of
+        letting pages pile up in memory.
+        Pages fetched by an interrupted earlier run are streamed first.
+
+        Args:
+            crawler (Crawler): Crawler of this scrape
+            synthesis (SynthesisStream, optional): Receives every extraction as it is made
+
+        Returns:
+            dict: URL -> extracted content, in the order pages finished extraction
+        """
+        checkpoint = crawler.checkpoint
+        index = None
+        if self.duplicate_threshold is not None:
+            index = NearDuplicateIndex(threshold=self.duplicate_threshold)
+        self.passage_ranking = None
+        self.passage_reports = {}
+        index_lock = threading.Lock()
+
+        def reduce(url):
+            saved = checkpoint.extraction(url) if checkpoint is not None else None
+            if saved is not None:
+                return url, None, saved
+            content = crawler.get_page(url)
+            if not content:
+                return None
+            if index is not None:
+                with index_lock:
+                    representative = index.add(url, visible_text(content))
+                if representative is not None:
+                    self.logger.info(f"Skipping {url}: duplicate of {representative}")
+                    return None
+            parser = self.parser(url, content)
+            chunks = parser.prepare_chunks()
+            self.token_reports[url] = parser.token_report
+            return url, parser, chunks
+
+        def extract(item):
+            url, parser, chunks = item
+            if parser is None:
+                return url, chunks  # Extracted by an earlier run
+            extracted_content = parser.extract_chunks(chunks)
+            if checkpoint is not None and parser.complete:  # Failed pages are retried on resume
+                checkpoint.record_extraction(url, extracted_content, parser.content)
+            return url, extracted_content
+
+        def synthesize(item):
+            if synthesis is not None and item[1]:
+                synthesis.add(item[1])
+            return item
+
+        def produce(emit):
+            for url in sorted(crawler.visited):  # Restored from the checkpoint
+                emit(url)
+            crawler.on_page = emit
+            try:
+                crawler.crawl()
+            finally:
+                crawler.on_page = None
+
+        # Reduction is CPU-bound: more than one worker only pays off when it runs in worker processes
+        reduce_workers = self.html_workers.workers if self.html_workers is not None else 1
+        pipeline = PagePipeline([Stage("reduce", reduce, reduce_workers),
+                                 Stage("extract", extract, self.extract_workers),
+                                 Stage("synthesize", synthesize)], queue_size=self.queue_size)
+        results = dict(pipeline.run(produce))
+        self.pipeline_stats = pipeline.stats
+        self.skipped_duplicates = index.duplicates if index is not None else {}
+        return results
+
+    def for_site(self, url):
+        """
+        A copy of this client for scraping one site alongside others.
+
+        The copy shares the configuration and every shared resource (HTTP and
+        browser pools, LLM clients, cache, dispatcher), but keeps its own
+        per-scrape reports, so concurrent scrapes do not overwrite each other's.
+        Its LLM calls are tagged with the site, so the dispatcher serves
+        concurrent sites round-robin.
+
+        Args:
+            url (str): Base URL of the site
+
+        Returns:
+            RufusClient: The per-site client
+        """
+        site = copy.copy(self)
+        dispatcher = getattr(self.llm_dispatcher, "dispatcher", self.llm_dispatcher)
+        site.llm_dispatcher = dispatcher.for_group(url)
+        site.skipped_duplicates = {}
+        site.token_reports = {}
+        site.passage_ranking = None
+        site.passage_reports = {}
+        site.synthesis_report = None
+        site.pipeline_stats = None
+        return site
+
+    async def ascrape(self, url, **kwargs):
+        """
+        Awaitable ``scrape``, for use from an event loop.
+
+        The scrape runs in a worker thread on a per-site copy of the client
+        (see ``for_site``), so several ``ascrape`` calls can run concurrently.
+        Its reports (``token_reports``, ...) are therefore not kept on this client.
+
+        Args:
+            url (str): Base URL to start web crawling
+            **kwargs: Options of ``scrape`` (resume, batch, stream)
+
+        Returns:
+            dict: Structured and synthesized documents extracted from web content
+        """
+        return await asyncio.to_thread(self.for_site(url).scrape, url, **kwargs)
+
+    def scrape_many(self, urls, max_sites=8, return_exceptions=True, **kwargs):
+        """
+        Scrape many sites concurrently, yielding each result as soon as its site is done.
+
+        Up to ``max_sites`` sites are crawled at once, each on a per-site copy of
+        the client (see ``for_site``). They share the process-wide HTTP and
+        browser pools and this client's LLM dispatcher, whose limits therefore
+        apply to the whole job, and whose queue serves the sites round-robin.
+
+        Args:
+            urls (Iterable[str]): Base URLs of the sites
+            max_sites (int, optional): Sites scraped at the same time. Defaults to 8.
+            return_exceptions (bool, optional): Yield a failed site's exception as its result
+                                                instead of raising it. Defaults to True.
+            **kwargs: Options of ``scrape`` (resume, batch, stream), applied to every site
+
+        Yields:
+            tuple: (url, documents), in completion order
+        """
+        with ThreadPoolExecutor(max_workers=max_sites, thread_name_prefix="site") as executor:
+            futures = {executor.submit(self.for_site(url).scrape, url, **kwargs): url for url in urls}
+            try:
+                for future in as_completed(futures):
+                    url = futures[future]
+                    try:
+                        yield url, future.result()
+                    except Exception as exc:
+                        self.logger.error(f"Error scraping {url}: {exc}")
+                        if not return_exceptions:
+                            raise
+                        yield url, exc
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    async def ascrape_many(self, urls, max_sites=8, return_exceptions=True, **kwargs):
+        """
+        Asynchronous ``scrape_many``: an async generator of (url, documents) in completion order.
+
+        Args:
+            urls (Iterable[str]): Base URLs of the sites
+            max_sites (int, optional): Sites scraped at the same time. Defaults to 8.
+            return_exceptions (bool, optional): Yield a failed site's exception as its result
+                                                instead of raising it. Defaults to True.
+            **kwargs: Options of ``scrape`` (resume, batch, stream), applied to every site
+
+        Yields:
+            tuple: (url, documents)
+        """
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=max_sites, thread_name_prefix="site")
+
+        async def run(url):
+            try:
+                return url, await loop.run_in_executor(executor, lambda: self.for_site(url).scrape(url, **kwargs))
+            except Exception as exc:
+                self.logger.error(f"Error scraping {url}: {exc}")
+                if not return_exceptions:
+                    raise
+                return url, exc
+
+        tasks = [asyncio.ensure_future(run(url)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def process_pages(self, crawler, urls):
+        """
+        Parse pages concurrently with interactive LLM calls.
+
+        Returns:
+            dict: URL -> extracted content, for the pages that did not raise
+        """
+        results = {}
         with ThreadPoolExecutor() as executor:
-            future_to_url = {executor.submit(crawler.fetch, crawled_url): crawled_url for crawled_url in crawled_urls}
+            future_to_url = {executor.submit(self.process_page, crawler, crawled_url): crawled_url for crawled_url in urls}
             
             for future in as_completed(future_to_url):
                 crawled_url = future_to_url[future]
                 try:
-                    content = future.result()
-                    if content:
-                        parser = Parser(content, self.user_prompt, self.openai_api_key)
-                        parsed_data = parser.parse()
-                        extracted_content = parsed_data.get("extracted_content", "")
-                        if extracted_content:
-                            aggregated_data["extracted_content"].append(extracted_content)
+                    results[crawled_url] = future.result()
                 except Exception as exc:
                     print(f"Error processing {crawled_url}: {exc}")
-        
-        synthesizer = Synthesizer(aggregated_data, self.user_prompt, self.openai_api_key)
-        structured_documents = synthesizer.synthesize()
-        
-        return structured_documents
\ No newline at end of file
+        return results
+
+    def deduplicate(self, crawler, urls):
+        """
+        Drop pages whose visible text duplicates, or nearly duplicates, another crawled page.
+
+        Pages are compared by MinHash over word shingles of their visible text, so
+        print views, sort orders and session-parameter variants of a page are sent
+        to the LLM once. The shortest URL of each group is kept. Skipped URLs are
+        logged and recorded in ``skipped_duplicates``.
+
+        Args:
+            crawler (Crawler): Crawler holding the crawled pages
+            urls (Iterable[str]): Crawled URLs
+
+        Returns:
+            list: URLs to parse, one per group
+        """
+        ordered = sorted(urls, key=lambda url: (len(url), url))
+        self.skipped_duplicates = {}
+        if self.duplicate_threshold is None:
+            return ordered
+        index = NearDuplicateIndex(threshold=self.duplicate_threshold)
+        representatives = []
+        for url in ordered:
+            content = crawler.get_page(url)
+            representative = index.add(url, visible_text(content)) if content else None
+            if representative is None:
+                representatives.append(url)
+            else:
+                self.logger.info(f"Skipping {url}: duplicate of {representative}")
+        self.skipped_duplicates = index.duplicates
+        if self.skipped_duplicates:
+            self.logger.info(f"Skipped {len(self.skipped_duplicates)} duplicate page(s) of {len(ordered)}.")
+        return representatives
+
+    def rank_passages(self, crawler, urls):
+        """
+        Fit one passage ranking over the reduced content of every page to parse.
+
+        Does nothing unless ``top_k`` or ``passage_budget`` is set. Records each
+        page's input tokens and cost at several passage counts in
+        ``passage_reports`` so ``top_k`` can be tuned against spend.
+
+        Args:
+            crawler (Crawler): Crawler whose page store holds the crawl-time HTML
+            urls (list): URLs of the pages to parse
+
+        Returns:
+            PassageRanking: The ranking, or None when passage selection is disabled
+        """
+        self.passage_ranking = None
+        self.passage_reports = {}
+        if self.top_k is None and self.passage_budget is None:
+            return None
+        if self.html_workers is not None:
+            documents = dict(zip(urls, self.html_workers.reduce_many(crawler.get_page(url) for url in urls)))
+        else:
+            documents = {url: DEFAULT_REDUCER.reduce(crawler.get_page(url) or "") for url in urls}
+        self.passage_ranking = PassageRanking(self.user_prompt, documents)
+        self.passage_reports = {url: self.passage_ranking.cost_report(url, token_budget=self.passage_budget)
+                                for url in urls}
+        self.logger.info(f"Ranked {len(self.passage_ranking.passages)} passages of {len(urls)} page(s).")
+        return self.passage_ranking
+
+    def parser(self, url, content):
+        """Parser for one page, with this client's cache, dispatcher and passage selection."""
+        return Parser(content, self.user_prompt, self.openai_api_key, reducer=self.reducer, cache=self.llm_cache,
+                      dispatcher=self.llm_dispatcher, top_k=self.top_k, passage_budget=self.passage_budget,
+                      ranking=self.passage_ranking, page_key=url)
+
+    def process_page(self, crawler, url):
+        """
+        Parse one crawled page, reusing the HTML the crawler already downloaded.
+
+        Results are recorded in the crawler's checkpoint; a page parsed by an
+        earlier, interrupted run returns its saved result without an LLM call.
+        A page whose LLM calls failed is not recorded, so a resumed run retries it.
+
+        Args:
+            crawler (Crawler): Crawler whose page store holds the crawl-time HTML
+            url (str): URL of the page to parse
+
+        Returns:
+            str: Extracted content, or an empty string if nothing relevant was found
+        """
+        checkpoint = crawler.checkpoint
+        if checkpoint is not None:
+            saved = checkpoint.extraction(url)
+            if saved is not None:
+                return saved
+        content = crawler.get_page(url)
+        if not content:
+            return ""
+        parser = self.parser(url, content)
+        parsed_data = parser.parse()
+        self.token_reports[url] = parser.token_report
+        extracted_content = parsed_data.get("extracted_content", "")
+        if checkpoint is not None and parser.complete:  # Failed pages are retried on resume
+            checkpoint.record_extraction(url, extracted_content, content)
+        return extracted_content
+
+    def process_pages_batch(self, crawler, urls):
+        """
+        Parse pages with one Batch API job instead of interactive calls.
+
+        Every chunk of every page becomes one line of the batch, identified by
+        the page's position and the chunk's index. Pages already extracted in
+        the checkpoint and chunks already in the LLM cache are not sent.
+        Chunks whose requests still failed after the runner's resubmissions
+        contribute nothing, like a failed interactive call.
+
+        Args:
+            crawler (Crawler): Crawler whose page store holds the crawl-time HTML
+            urls (list): URLs of the pages to parse
+
+        Returns:
+            dict: URL -> extracted content
+        """
+        checkpoint = crawler.checkpoint
+        results, pages, requests = {}, {}, {}
+        for page_number, url in enumerate(urls):
+            saved = checkpoint.extraction(url) if checkpoint is not None else None
+            if saved is not None:
+                results[url] = saved
+                continue
+            content = crawler.get_page(url)
+            if not content:
+                results[url] = ""
+                continue
+            parser = self.parser(url, content)
+            chunks = parser.prepare_chunks()
+            self.token_reports[url] = parser.token_report
+            partials = [self.llm_cache.get(parser.cache_key(chunk)) if self.llm_cache is not None else None
+                        for chunk in chunks]
+            for index, chunk in enumerate(chunks):
+                if partials[index] is None:
+                    requests[f"page-{page_number}-chunk-{index}"] = parser.chunk_request(chunk)
+            pages[url] = (page_number, parser, chunks, partials)
+
+        if requests:
+            runner = self.batch_runner or BatchRunner(get_llm_client("openai", self.openai_api_key))
+            responses = runner.run(requests)
+            self.logger.info(f"Batch extracted {len(responses)} of {len(requests)} chunk(s).")
+        else:
+            responses = {}
+
+        for url, (page_number, parser, chunks, partials) in pages.items():
+            for index, chunk in enumerate(chunks):
+                custom_id = f"page-{page_number}-chunk-{index}"
+                if partials[index] is None and custom_id in responses:
+                    partials[index] = completion_text(responses[custom_id])
+                    if self.llm_cache is not None:
+                        self.llm_cache.set(parser.cache_key(chunk), partials[index])
+            results[url] = parser.merge(partials)
+            complete = all(partial is not None for partial in partials)
+            if checkpoint is not None and complete:
+                checkpoint.record_extraction(url, results[url], parser.content)
+        return results
@@ -1,24 +1,207 @@
+import asyncio
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urldefrag, urlparse
 from tqdm import tqdm
 import logging
+import threading
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-# from webdriver_manager.chrome import ChromeDriverManager 
+from .page_store import PageStore
+from .frontier import Frontier, score_link
+from .http_pool import get_http_pool
+from .browser_pool import get_browser_pool
+from .readiness import PageReadiness
+from .urls import canonicalize_url, FingerprintSet, DEFAULT_TRACKING_PARAMS
+from .html_scan import scan_html
+from .keywords import extract_keywords, KeywordMatcher
+from .sitemap import SiteSeeder
+
+USER_AGENT = "RufusBot/1.0"
 
 class Crawler:
-    def __init__(self, base_url, user_prompt, max_depth=3):
+    def __init__(self, base_url, user_prompt, max_depth=3, page_store=None,
+                 strategy="bfs", max_pages=None, time_budget=None, http_pool=None, browser_pool=None,
+                 readiness=None, http_cache=None, seen=None, tracking_params=DEFAULT_TRACKING_PARAMS,
+                 checkpoint=None, use_sitemaps=False, seeder=None, on_page=None, html_workers=None):
         self.base_url = base_url
+        self.base_domain = urlparse(base_url).netloc  # Parsed once, compared against every link
         self.user_prompt = user_prompt.lower()  # Convert to lowercase for case-insensitive matching
         self.max_depth = max_depth
         self.visited = set()
         self.to_visit = [(base_url, 0)]
         self.logger = self.setup_logger()
         self.keywords = self.extract_keywords(user_prompt)  # Extract keywords from the user prompt
-        self.driver = None  # Selenium WebDriver, initialized only if needed
+        self.matcher = KeywordMatcher(self.keywords)  # Compiled once, scans each page in one pass
+        self.browsers = browser_pool if browser_pool is not None else get_browser_pool()  # Browsers start only when needed
+        self.readiness = readiness if readiness is not None else PageReadiness()  # Records per-page wait time
+        self.http_cache = http_cache  # Optional HttpCache for conditional GETs across runs
+        self.unchanged = set()  # URLs the server confirmed unchanged (304) since the cached copy
+        self.pages = page_store if page_store is not None else PageStore()  # HTML of visited pages
+        self.strategy = strategy  # "bfs" (FIFO frontier) or "best_first" (scored priority frontier)
+        self.max_pages = max_pages  # Stop after this many page fetches
+        self.time_budget = time_budget  # Stop after this many seconds of crawling
+        self.frontier = Frontier()  # Used by the best-first strategy
+        self.pages_fetched = 0
+        self.http = http_pool if http_pool is not None else get_http_pool()  # Shared keep-alive connections
+        self.tracking_params = tracking_params  # Query parameters ignored when comparing links
+        # Fingerprints of every URL fetched so far; pass a urls.BloomFilter for million-URL crawls
+        self.seen = seen if seen is not None else FingerprintSet(canonicalize=self.canonicalize)
+        self.checkpoint = checkpoint  # Optional CrawlCheckpoint: every fetched page is committed to it
+        self.use_sitemaps = use_sitemaps  # Seed the frontier from robots.txt / sitemaps before crawling
+        self.seeder = seeder if seeder is not None else SiteSeeder(self.http, USER_AGENT)
+        self.on_page = on_page  # Called with the URL of each relevant page as soon as it is stored
+        self.final_urls = {}  # Fetched URL -> URL the server redirected it to, the base of its links
+        self.html_workers = html_workers  # Optional HtmlWorkerPool: pages are scanned in worker processes
+        self.robots = None  # robots.txt rules, once read by seed_frontier
+        self.crawl_delay = None  # Seconds between requests, from robots.txt
+        self.lastmods = {}  # Sitemap <lastmod> (Unix time) of seeded URLs
+        self.seeded = False
+        self._next_fetch_at = 0.0
+        self._delay_lock = threading.Lock()
+        if checkpoint is not None:
+            self.restore(checkpoint)
+
+    def restore(self, checkpoint):
+        # Continue a crawl that was interrupted: fetched pages are not fetched again
+        state = checkpoint.load()
+        if state is None:
+            return
+        for url in state["fetched"]:
+            self.seen.add(url)
+        self.visited = set(state["visited"])
+        self.seeded = True  # Sitemap seeds, if any, are already in the saved frontier
+        self.to_visit = [(url, depth) for url, depth, _ in state["frontier"]]
+        if self.strategy == "best_first":
+            for url, depth, score in state["frontier"]:
+                self.frontier.push(url, depth, score=float("inf") if score is None else score)
+            self.to_visit = []
+        self.logger.info(f"Resuming crawl: {len(state['fetched'])} pages already fetched, "
+                         f"{len(state['frontier'])} in the frontier.")
+
+    def seed_frontier(self):
+        """
+        Read robots.txt and, with ``use_sitemaps``, queue sitemap URLs before any page is fetched.
+
+        robots.txt is read once; its crawl-delay then spaces out every fetch and
+        its disallow rules filter links. Sitemap entries go through the same
+        same-domain and relevance checks as links found on pages and are queued
+        at depth 1. Their <lastmod> dates let fetch() serve pages cached after
+        that date without any request.
+        """
+        if self.seeded or not self.use_sitemaps:
+            return
+        self.seeded = True
+        self.robots = self.seeder.robots(self.base_url)
+        self.crawl_delay = self.seeder.crawl_delay(self.base_url)
+
+        base = self.canonicalize(self.base_url)
+        seeds = []
+        for loc, lastmod in self.seeder.entries(self.base_url):
+            link = self.accept_link(loc)
+            if not link or self.canonicalize(link) == base or link in self.seen or link in self.lastmods:
+                continue
+            if self.strategy == "best_first":
+                score = score_link(self.keywords, link)
+                if score <= 0:
+                    continue
+                self.frontier.push(link, 1, score)
+            elif self.is_relevant(link):
+                score = None
+                self.to_visit.append((link, 1))
+            else:
+                continue
+            self.lastmods[link] = lastmod.timestamp() if lastmod else None
+            seeds.append((link, 1, score))
+        if self.checkpoint is not None:
+            self.checkpoint.add_frontier(seeds)
+        self.logger.info(f"Seeded {len(seeds)} URLs from sitemaps"
+                         f"{f', crawl-delay {self.crawl_delay}s' if self.crawl_delay else ''}.")
+
+    def wait_for_crawl_delay(self):
+        # Space requests by the robots.txt crawl-delay, across all fetch threads
+        if not self.crawl_delay:
+            return
+        with self._delay_lock:
+            now = time.monotonic()
+            start = max(now, self._next_fetch_at)
+            self._next_fetch_at = start + self.crawl_delay
+        if start > now:
+            time.sleep(start - now)
+
+    async def acrawl_best_first(self, max_concurrency=10, per_host_concurrency=4):
+        """
+        Asynchronous counterpart of crawl_best_first(), called by acrawl() for that strategy.
+
+        The ``max_concurrency`` best candidates of the frontier (sitemap seeds
+        and a resumed crawl's frontier included) are fetched at once; their
+        links are scored and pushed before the next batch is chosen, so the
+        crawl follows the same priorities as crawl_best_first() a batch at a time.
+
+        Args:
+            max_concurrency (int, optional): Maximum pages in flight overall. Defaults to 10.
+            per_host_concurrency (int, optional): Maximum pages in flight per host. Defaults to 4.
+
+        Returns:
+            set: URLs of the relevant pages that were crawled
+        """
+        for url, depth in self.to_visit:
+            self.frontier.push(url, depth, score=float("inf"))  # Seeds always go first
+        self.to_visit = []
+        await asyncio.to_thread(self.seed_frontier)
+        fetch_limited = self.limited_fetcher(max_concurrency, per_host_concurrency)
+
+        start_time = time.monotonic()
+        with tqdm(total=len(self.frontier), desc="Crawling URLs", unit="url") as pbar:
+            while self.frontier:
+                if self.budget_exhausted(start_time):
+                    break
+                batch = []
+                while self.frontier and len(batch) < max_concurrency:
+                    if self.max_pages is not None and self.pages_fetched + len(batch) >= self.max_pages:
+                        break
+                    url, depth, _ = self.frontier.pop()
+                    if url in self.seen or depth > self.max_depth:
+                        pbar.update(1)
+                        continue
+                    self.seen.add(url)
+                    batch.append((url, depth))
+
+                fetched = await asyncio.gather(*(fetch_limited(url) for url, _ in batch))
+                self.pages_fetched += len(batch)
+                for (url, depth), (content, scan) in zip(batch, fetched):
+                    self.follow_scored_links(url, depth, content, scan, pbar)
+                    pbar.update(1)
+
+        return self.visited
+
+    def limited_fetcher(self, max_concurrency, per_host_concurrency):
+        """Coroutine function fetching and scanning one URL in a thread, within the concurrency limits."""
+        global_limit = asyncio.Semaphore(max_concurrency)
+        host_limits = {}
+
+        def fetch_and_scan(url):
+            content = self.fetch(url)
+            # Scanned in the fetching thread, so with html_workers a batch's pages are scanned in parallel
+            return content, self.scan_page(content, url) if content else None
+
+        async def fetch_limited(url):
+            host = urlparse(url).netloc
+            host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host_concurrency))
+            # Take the host slot first so a busy host never holds global slots hostage
+            async with host_limit:
+                async with global_limit:
+                    self.logger.info(f"Crawling: {url}")
+                    return await asyncio.to_thread(fetch_and_scan, url)
+
+        return fetch_limited
+
+    def record_page(self, url, content, relevant, links=()):
+        if self.checkpoint is not None:
+            self.checkpoint.record_page(url, content, relevant, links)
+
+    def page_stored(self, url):
+        # Hand a relevant page to a streaming consumer; a blocking callback slows the crawl down
+        if self.on_page is not None:
+            self.on_page(url)
 
     def setup_logger(self):
         logger = logging.getLogger(__name__)
@@ -31,50 +214,78 @@ class Crawler:
         return logger
 
     def extract_keywords(self, prompt):
-        return [word.strip() for word in prompt.split()]
-
-    def initialize_selenium(self):
-        if not self.driver:  # Initialize only if not already done
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-            self.logger.info("Selenium WebDriver initialized successfully.")
+        return extract_keywords(prompt)
 
     def is_valid(self, url):
         parsed = urlparse(url)
         return bool(parsed.netloc) and bool(parsed.scheme)
 
-    def get_links(self, content):
-        soup = BeautifulSoup(content, 'html.parser')
-        links = set()
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag['href']
-            full_url = urljoin(self.base_url, href)
-            if self.is_valid(full_url) and self.same_domain(full_url):
-                links.add(full_url)
-        return links
+    def canonicalize(self, url):
+        return canonicalize_url(url, drop_params=self.tracking_params)
+
+    def get_links(self, content, page_url=None):
+        return set(self.get_link_candidates(content, page_url))
+
+    def get_link_candidates(self, content, page_url=None):
+        # Same links as get_links, mapped to the anchor text pointing at them
+        return self.scan_page(content, page_url).links
+
+    def scan_page(self, content, page_url=None):
+        # One streaming pass over the page: links, anchor text and keyword hits together
+        page_url = self.final_urls.get(page_url, page_url) if page_url else self.base_url
+        if self.html_workers is None:
+            return scan_html(content, page_url, self.matcher, self.accept_link)
+        scan = self.html_workers.scan(content, page_url, self.keywords)
+        links = {}
+        for link, anchor_text in scan.links.items():  # Filtered here: robots rules stay in this process
+            accepted = self.accept_link(link)
+            if accepted:
+                previous = links.get(accepted)
+                links[accepted] = f"{previous} {anchor_text}" if previous else anchor_text
+        scan.links = links
+        return scan
+
+    def accept_link(self, url):
+        # A same-domain http(s) link as it will be fetched, or None to drop it. Its canonical
+        # form is only the seen-set key: "/docs/" and "/docs" may be different resources.
+        parsed = urlparse(url)
+        if not parsed.scheme or parsed.netloc != self.base_domain:
+            return None
+        if self.robots is not None and not self.robots.can_fetch(USER_AGENT, url):
+            return None
+        return urldefrag(url).url
 
     def same_domain(self, url):   
     # filters content based on relevance, 
     # ensuring that the crawler processes only the content that matches the base url.
-
-
-        base_domain = urlparse(self.base_url).netloc
-        target_domain = urlparse(url).netloc
-        return base_domain == target_domain
+        return urlparse(url).netloc == self.base_domain
 
     def is_relevant(self, content):
-        content = content.lower()  # Convert to lowercase for case-insensitive matching
-        return any(keyword in content for keyword in self.keywords)
+        return self.matcher.search(content)
+
+    def budget_exhausted(self, start_time):
+        if self.max_pages is not None and self.pages_fetched >= self.max_pages:
+            self.logger.info(f"Page budget of {self.max_pages} reached, stopping crawl.")
+            return True
+        if self.time_budget is not None and time.monotonic() - start_time >= self.time_budget:
+            self.logger.info(f"Time budget of {self.time_budget}s reached, stopping crawl.")
+            return True
+        return False
 
     def fetch(self, url):
+        lastmod = self.lastmods.get(url)
+        if lastmod is not None and self.http_cache is not None:
+            cached = self.http_cache.unchanged_since(url, lastmod)
+            if cached is not None:  # Cached after the sitemap's last change: no request at all
+                self.unchanged.add(url)
+                return cached.text
+        self.wait_for_crawl_delay()
         try:
-            headers = {'User-Agent': 'RufusBot/1.0'}
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+            headers = {'User-Agent': USER_AGENT}
+            response = self.http.get(url, headers=headers, timeout=10, cache=self.http_cache)
+            if getattr(response, "not_modified", False):
+                self.unchanged.add(url)
+            self.record_final_url(url, getattr(response, "url", None))
 
             if not response.text.strip():  # Check if the response is empty
                 self.logger.info(f"Empty response from {url}. Switching to Selenium.")
@@ -86,47 +297,183 @@ class Crawler:
             self.logger.info(f"Attempting to fetch using Selenium due to error.")
             return self.fetch_with_selenium(url)  # Fallback to Selenium on any error
 
+    def get_page(self, url):
+        """Return the HTML stored for ``url`` during the crawl (or a checkpoint), fetching it only if missing."""
+        content = self.pages.get(url)
+        if content is None and self.checkpoint is not None:
+            content = self.checkpoint.page(url)
+        if content is None:
+            content = self.fetch(url)
+        return content
+
+    def record_final_url(self, url, final_url):
+        # Relative links of a redirected page resolve against where it was served from
+        if final_url and final_url != url:
+            self.final_urls[url] = final_url
+
     def fetch_with_selenium(self, url):
-        self.initialize_selenium()
         try:
-            self.driver.get(url)
-            time.sleep(3)  # Wait for the page to load completely
-            # Handle infinite scroll if necessary
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-            while True:
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(3)
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
-            return self.driver.page_source
+            with self.browsers.lease() as driver:
+                driver.get(url)
+                # Wait for load, network idle and DOM quiescence; scrolls infinite-scroll pages
+                self.readiness.wait(driver, url)
+                self.record_final_url(url, driver.current_url)
+                return driver.page_source
         except Exception as e:
             self.logger.error(f"Error fetching {url} with Selenium: {e}")
             return None
 
     def crawl(self):
+        if self.strategy == "best_first":
+            return self.crawl_best_first()
+
+        self.seed_frontier()
+        start_time = time.monotonic()
         with tqdm(total=len(self.to_visit), desc="Crawling URLs", unit="url") as pbar:
             while self.to_visit:
+                if self.budget_exhausted(start_time):
+                    break
                 current_url, depth = self.to_visit.pop(0)
-                if current_url in self.visited or depth > self.max_depth:
+                if current_url in self.seen or depth > self.max_depth:
                     pbar.update(1)  # Update progress bar for skipped URLs
                     continue
 
                 self.logger.info(f"Crawling: {current_url} at depth {depth}")
+                self.seen.add(current_url)
                 content = self.fetch(current_url)
+                self.pages_fetched += 1
 
-                if content and self.is_relevant(content):  # Check if content is relevant
+                scan = self.scan_page(content, current_url) if content else None
+                new_links = []
+                if scan and scan.relevant:  # Check if content is relevant
                     self.visited.add(current_url)
-                    links = self.get_links(content)
-                    for link in links:
-                        if link not in self.visited and self.is_relevant(link):  # Check if the link is relevant
+                    self.pages.put(current_url, content)
+                    self.page_stored(current_url)
+                    for link in scan.links:
+                        if link not in self.seen and self.is_relevant(link):  # Check if the link is relevant
                             self.to_visit.append((link, depth + 1))
+                            new_links.append((link, depth + 1, None))
+                self.record_page(current_url, content, bool(scan and scan.relevant), new_links)
 
                 pbar.update(1)  # Update progress bar after processing a URL
 
-        # Close the Selenium driver if used
-        if self.driver:
-            self.driver.quit()
+        return self.visited
+
+    def crawl_best_first(self):
+        """
+        Crawl the most promising links first using a scored priority frontier.
+
+        Candidate links are scored from their URL tokens, their anchor text and
+        the relevance of the page they were found on (see frontier.score_link).
+        Links whose URL and anchor text mention no keyword are dropped. The crawl
+        stops when the frontier is empty or when max_pages / time_budget is
+        reached, so a budget of N pages fetches the N best candidates seen so
+        far rather than the first N discovered.
+
+        Returns:
+            set: URLs of the relevant pages that were crawled
+        """
+        for url, depth in self.to_visit:
+            self.frontier.push(url, depth, score=float("inf"))  # Seeds always go first
+        self.to_visit = []
+        self.seed_frontier()
+
+        start_time = time.monotonic()
+        with tqdm(total=len(self.frontier), desc="Crawling URLs", unit="url") as pbar:
+            while self.frontier:
+                if self.budget_exhausted(start_time):
+                    break
+                current_url, depth, score = self.frontier.pop()
+                if current_url in self.seen or depth > self.max_depth:
+                    pbar.update(1)
+                    continue
+
+                self.logger.info(f"Crawling: {current_url} at depth {depth} (score {score:.2f})")
+                self.seen.add(current_url)
+                content = self.fetch(current_url)
+                self.pages_fetched += 1
+
+                scan = self.scan_page(content, current_url) if content else None
+                self.follow_scored_links(current_url, depth, content, scan, pbar)
+                pbar.update(1)
+
+        return self.visited
+
+    def follow_scored_links(self, url, depth, content, scan, pbar):
+        # Store a relevant page and push its promising links onto the best-first frontier
+        new_links = []
+        if scan and scan.relevant:
+            self.visited.add(url)
+            self.pages.put(url, content)
+            self.page_stored(url)
+            for link, anchor_text in scan.links.items():
+                if link in self.seen:
+                    continue
+                link_score = score_link(self.keywords, link, anchor_text, scan.relevance)
+                if link_score > 0:
+                    self.frontier.push(link, depth + 1, link_score)
+                    new_links.append((link, depth + 1, link_score))
+                    pbar.total += 1
+        self.record_page(url, content, bool(scan and scan.relevant), new_links)
+
+    async def acrawl(self, max_concurrency=10, per_host_concurrency=4):
+        """
+        Asynchronous counterpart of crawl() that fetches the frontier concurrently.
+
+        The frontier is processed one depth level at a time, so the depth,
+        same-domain and relevance rules are exactly those of crawl() and the
+        returned visited set is the same. Within a level, pages are fetched in
+        worker threads, bounded by a global limit and a per-host limit.
+        With ``strategy="best_first"`` the scored frontier is drained instead
+        (see acrawl_best_first).
+
+        Args:
+            max_concurrency (int, optional): Maximum pages in flight overall. Defaults to 10.
+            per_host_concurrency (int, optional): Maximum pages in flight per host. Defaults to 4.
+
+        Returns:
+            set: URLs of the relevant pages that were crawled
+        """
+        if self.strategy == "best_first":
+            return await self.acrawl_best_first(max_concurrency, per_host_concurrency)
+        await asyncio.to_thread(self.seed_frontier)
+        fetch_limited = self.limited_fetcher(max_concurrency, per_host_concurrency)
+
+        start_time = time.monotonic()
+        with tqdm(total=len(self.to_visit), desc="Crawling URLs", unit="url") as pbar:
+            while self.to_visit:
+                if self.budget_exhausted(start_time):
+                    break
+                depth = min(d for _, d in self.to_visit)
+                level = [url for url, d in self.to_visit if d == depth]
+                self.to_visit = [(url, d) for url, d in self.to_visit if d != depth]
+
+                batch = []
+                for url in level:
+                    if depth > self.max_depth or url in self.seen:
+                        pbar.update(1)  # Update progress bar for skipped URLs
+                        continue
+                    if self.max_pages is not None and self.pages_fetched + len(batch) >= self.max_pages:
+                        self.to_visit.append((url, depth))  # Left for a later run
+                        continue
+                    self.seen.add(url)
+                    batch.append(url)
+
+                fetched = await asyncio.gather(*(fetch_limited(url) for url in batch))
+                self.pages_fetched += len(batch)
+
+                for url, (content, scan) in zip(batch, fetched):
+                    new_links = []
+                    if scan and scan.relevant:  # Check if content is relevant
+                        self.visited.add(url)
+                        self.pages.put(url, content)
+                        self.page_stored(url)
+                        for link in scan.links:
+                            if link not in self.seen and self.is_relevant(link):
+                                self.to_visit.append((link, depth + 1))
+                                new_links.append((link, depth + 1, None))
+                                pbar.total += 1
+                    self.record_page(url, content, bool(scan and scan.relevant), new_links)
+                    pbar.update(1)
 
-        return self.visited
\ No newline at end of file
+        return self.visited
@@ -0,0 +1,133 @@
+import hashlib
+import re
+
+import numpy as np
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def shingles(text, size=3):
+    """Distinct overlapping word ``size``-grams of ``text``, lowercased; the whole text if it is shorter."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """
+    MinHash signatures of word shingle sets.
+
+    The fraction of positions where two signatures agree estimates the Jaccard
+    similarity of the shingle sets (about +/-0.03 with 128 permutations).
+    The permutations are seeded, so signatures are comparable across runs.
+    """
+
+    def __init__(self, num_perm=128, shingle_size=3, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        generator = np.random.RandomState(seed)
+        # Universal hashing (a * x + b) mod p; the product wraps at 64 bits like the usual MinHash tables
+        self._a = generator.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text):
+        """
+        Returns:
+            numpy.ndarray: ``num_perm`` minimum hash values, or None if the text has no words
+        """
+        features = shingles(text, self.shingle_size)
+        if not features:
+            return None
+        digests = b"".join(hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest() for feature in features)
+        hashes = np.frombuffer(digests, dtype=">u4").astype(np.uint64)
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(hashes, self._a) + self._b) % np.uint64(MERSENNE_PRIME) & np.uint64(0xFFFFFFFF)
+        return permuted.min(axis=0)
+
+
+def lsh_rows(threshold, num_perm):
+    """
+    Rows per LSH band: as many as possible while pairs at ``threshold`` still almost surely share a band.
+
+    With b bands of r rows, pairs above roughly (1/b) ** (1/r) similarity become
+    candidates; keeping that point well below the threshold avoids missed pairs.
+    """
+    rows = 1
+    for candidate in (2, 4, 8, 16):
+        if num_perm % candidate == 0 and (candidate / num_perm) ** (1 / candidate) <= threshold * 0.8:
+            rows = candidate
+    return rows
+
+
+def jaccard(signature, other):
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.count_nonzero(signature == other)) / len(signature)
+
+
+class NearDuplicateIndex:
+    """
+    Groups pages whose visible text is identical or nearly identical.
+
+    Exact duplicates (same text up to whitespace) are found by digest.
+    Otherwise a page whose estimated shingle Jaccard similarity to an earlier
+    page reaches ``threshold`` joins that page's cluster, and the earlier page
+    stays the cluster's representative. Candidates are found with LSH banding
+    on the MinHash signatures, so adding a page does not compare it against
+    every page seen before.
+
+    Attributes:
+        threshold (float): Jaccard similarity at or above which pages are near-duplicates
+        duplicates (dict): Duplicate URL -> URL of its cluster's representative
+    """
+
+    def __init__(self, threshold=0.9, num_perm=128, shingle_size=3):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.duplicates = {}
+        self._exact = {}
+        self._signatures = {}
+        self._rows = lsh_rows(threshold, num_perm)
+        self._index = [{} for _ in range(num_perm // self._rows)]
+
+    def add(self, url, text):
+        """
+        Add a page and return the representative it duplicates, or None if it is new.
+
+        Args:
+            url (str): Page URL
+            text (str): Visible text of the page
+        """
+        digest = hashlib.blake2b(" ".join(text.split()).encode("utf-8"), digest_size=16).digest()
+        representative = self._exact.get(digest)
+        if representative is None:
+            signature = self.hasher.signature(text)
+            if signature is None:
+                return None  # Nothing to compare; never folded into another page
+            keys = [signature[i * self._rows:(i + 1) * self._rows].tobytes() for i in range(len(self._index))]
+            representative = self._most_similar(signature, keys)
+            if representative is None:
+                self._exact[digest] = url
+                self._signatures[url] = signature
+                for key, index in zip(keys, self._index):
+                    index.setdefault(key, []).append(url)
+                return None
+        self.duplicates[url] = representative
+        return representative
+
+    def clusters(self):
+        """Representative URL -> list of the duplicate URLs folded into it."""
+        clusters = {}
+        for url, representative in self.duplicates.items():
+            clusters.setdefault(representative, []).append(url)
+        return clusters
+
+    def _most_similar(self, signature, keys):
+        best, best_similarity = None, self.threshold
+        candidates = {url for key, index in zip(keys, self._index) for url in index.get(key, ())}
+        for candidate in sorted(candidates):
+            similarity = jaccard(signature, self._signatures[candidate])
+            if similarity >= best_similarity:
+                best, best_similarity = candidate, similarity
+        return best
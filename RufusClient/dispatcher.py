@@ -0,0 +1,475 @@
+import asyncio
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from .tokens import count_tokens
+
+# Lower numbers are dispatched first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+CALL_TIMEOUT = 600.0  # The OpenAI SDK's default request timeout, in seconds
+
+RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+TOKENS_PER_MESSAGE = 4  # Chat format overhead per message (role, separators)
+
+# After a 429 the request rate is halved, down to this fraction of the configured
+# limit, and each success raises it by this fraction of its current value
+MIN_RATE_SCALE = 0.001
+RECOVERY_STEP = 0.05
+MAX_TRACKED_GROUPS = 1024  # Fair-queuing state is pruned beyond this many groups
+
+# Default LLMDispatcher arguments per provider, for entry-level paid tiers. Groq enforces
+# its small per-minute quotas over the full minute, so its buckets hold a minute of quota.
+PROVIDER_LIMITS = {
+    "openai": {"requests_per_minute": 500, "tokens_per_minute": 200_000},
+    "gemini": {"requests_per_minute": 1000, "tokens_per_minute": 4_000_000},
+    "groq": {"requests_per_minute": 30, "tokens_per_minute": 6_000, "burst_seconds": 60.0},
+}
+# Servers on the local machine (LM Studio) have no rate limits to schedule around
+LOCAL_PROVIDERS = frozenset({"lm-studio"})
+
+
+def estimate_request_tokens(messages, max_tokens=None, model=None):
+    """
+    Tokens a chat request counts against a TPM limit: the prompt plus the requested completion.
+
+    Args:
+        messages (list): Chat messages
+        max_tokens (int, optional): Completion budget; providers reserve it up front
+        model (str, optional): Model whose tokenizer is used
+
+    Returns:
+        int: Estimated tokens
+    """
+    prompt = sum(count_tokens(str(message.get("content") or ""), model) + TOKENS_PER_MESSAGE
+                 for message in messages)
+    return prompt + (max_tokens or 0)
+
+
+def retry_after(error):
+    """
+    Seconds the provider asked us to wait, from an error's Retry-After headers, or None.
+
+    Understands ``retry-after-ms``, ``retry-after`` in seconds and ``retry-after`` as an HTTP date.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def status_of(error):
+    """HTTP status of a provider SDK error (OpenAI, Groq, Google), or None for transport errors."""
+    for name in ("status_code", "code"):
+        status = getattr(error, name, None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def is_retryable(error):
+    """Throttling, overload, timeouts and dropped connections are retried; other errors are not."""
+    status = status_of(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    name = type(error).__name__
+    return name in ("APIConnectionError", "APITimeoutError") or isinstance(error, (ConnectionError, TimeoutError))
+
+
+class TokenBucket:
+    """
+    Continuously refilling token bucket for a per-minute limit.
+
+    The level may go negative: a request larger than the whole bucket is let
+    through once the bucket is full and the debt delays the requests after it.
+
+    ``scale`` slows the refill below the configured rate while the provider
+    is throttling (see ``LLMDispatcher``).
+
+    Attributes:
+        rate (float): Tokens added per second at full speed
+        capacity (float): Maximum level, i.e. the largest burst
+        scale (float): Fraction of ``rate`` currently in effect, in (0, 1]
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else per_minute)
+        self.scale = 1.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate * self.scale)
+        self.updated = now
+
+    def delay(self, amount, now=None):
+        """Seconds until ``amount`` can be taken (0 if it can be taken now)."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / (self.rate * self.scale)) if needed > 0 else 0.0
+
+    def take(self, amount):
+        self._refill(time.monotonic())
+        self.level -= amount
+
+    def refund(self, amount):
+        """Give back an over-estimate (or charge an under-estimate, if negative)."""
+        self.level = min(self.capacity, self.level + amount)
+
+
+class _Job:
+    def __init__(self, call, tokens, priority, future, group=None):
+        self.call = call
+        self.tokens = tokens
+        self.priority = priority
+        self.future = future
+        self.group = group
+        self.round = None  # Fair-queuing round, assigned when first queued
+        self.attempts = 0
+
+
+class LLMDispatcher:
+    """
+    Rate-limit-aware scheduler for the LLM calls of one provider.
+
+    Calls are queued by priority and admitted only when the provider's
+    requests-per-minute and tokens-per-minute buckets allow them, so a crawl
+    with many pages runs close to the provider's ceiling instead of bursting
+    into 429 errors. Request cost is estimated up front with tiktoken and
+    corrected from the reported usage afterwards.
+
+    Throttled (429), overloaded (5xx) and timed-out calls are retried with
+    jittered exponential backoff, or after the delay the provider gives in
+    Retry-After. A 429 pauses all admissions until then, empties the request
+    bucket and halves its refill rate, which then recovers by 5% with each
+    success, so a limit set higher than the provider's real one
+    settles near it instead of causing a 429 storm. Only a call that keeps
+    failing after ``max_retries`` retries raises.
+
+    Calls may be tagged with a ``group`` (the client uses one per site).
+    Within a priority, groups are served round-robin (start-time fair
+    queuing): the n-th queued call of every group goes before the (n+1)-th
+    call of any, so a site with hundreds of pages cannot starve a small one.
+    Untagged calls form one group and keep their submission order.
+
+    The scheduler runs on its own event loop thread. Synchronous code uses
+    ``call``/``chat``, which give up after ``result_timeout`` (the longest a
+    call can take with all its retries); coroutines await ``acall``/``achat``.
+    Should the scheduler itself fail, every queued and later call raises its
+    error instead of waiting forever.
+
+    Attributes:
+        rpm (TokenBucket): Requests-per-minute bucket
+        tpm (TokenBucket): Tokens-per-minute bucket
+        max_concurrency (int): Calls in flight at once
+        max_retries (int): Retries per call before its error is raised
+        result_timeout (float): Seconds ``call``/``chat`` wait for a result before raising TimeoutError
+        stats (dict): Counters: submitted, completed, retried, throttled, failed
+    """
+
+    def __init__(self, requests_per_minute=500, tokens_per_minute=200_000, max_concurrency=16,
+                 max_retries=6, base_delay=1.0, max_delay=60.0, burst_seconds=1.0, model=None,
+                 call_timeout=CALL_TIMEOUT):
+        """
+        Args:
+            requests_per_minute (int, optional): Provider RPM limit. Defaults to 500.
+            tokens_per_minute (int, optional): Provider TPM limit. Defaults to 200,000.
+            max_concurrency (int, optional): Calls in flight at once. Defaults to 16.
+            max_retries (int, optional): Retries per call. Defaults to 6.
+            base_delay (float, optional): First backoff delay in seconds. Defaults to 1.
+            max_delay (float, optional): Longest backoff delay in seconds. Defaults to 60.
+            burst_seconds (float, optional): Seconds of quota that may be spent at once. Providers
+                                             enforce per-minute limits over shorter windows, so the
+                                             buckets hold this much rather than a full minute.
+            model (str, optional): Tokenizer used by ``chat`` to estimate request cost
+            call_timeout (float, optional): Longest one attempt of a call may take. Together with
+                                            the retry budget it bounds how long ``call`` and
+                                            ``chat`` block. Defaults to 600.
+        """
+        self.rpm = TokenBucket(requests_per_minute, max(1.0, requests_per_minute * burst_seconds / 60))
+        self.tpm = TokenBucket(tokens_per_minute, max(1.0, tokens_per_minute * burst_seconds / 60))
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.model = model
+        self.result_timeout = call_timeout * (max_retries + 1) + max_delay * max_retries
+        self.stats = dict.fromkeys(("submitted", "completed", "retried", "throttled", "failed"), 0)
+        self.logger = logging.getLogger(__name__)
+        self._queue = []  # heap of (priority, round, seq, job)
+        self._rounds = {}  # Group -> round of its last queued call
+        self._virtual_round = 0  # Round of the last dispatched call
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._error = None  # Why the scheduler stopped, if it failed
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency,
+                                                               thread_name_prefix="llm-dispatch")
+        self._loop = asyncio.new_event_loop()
+        self._ready = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._thread = threading.Thread(target=self._run_loop, name="llm-dispatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, call, tokens=0, priority=PRIORITY_NORMAL, group=None):
+        """
+        Queue ``call()`` (a blocking function) for dispatch.
+
+        Args:
+            call (callable): Performs one API request and returns its result
+            tokens (int, optional): Estimated tokens the request counts against the TPM limit
+            priority (int, optional): Lower runs first. Defaults to PRIORITY_NORMAL.
+            group (optional): Fairness group, e.g. the site the call is made for
+
+        Returns:
+            concurrent.futures.Future: Resolves to the call's result, or its last error
+        """
+        future = concurrent.futures.Future()
+        job = _Job(call, tokens, priority, future, group)
+        self._loop.call_soon_threadsafe(self._enqueue, job)
+        return future
+
+    def call(self, call, tokens=0, priority=PRIORITY_NORMAL, group=None):
+        """Dispatch ``call()`` and block until its result."""
+        return self._result(self.submit(call, tokens, priority, group))
+
+    async def acall(self, call, tokens=0, priority=PRIORITY_NORMAL, group=None):
+        """Dispatch ``call()`` and await its result from any event loop."""
+        return await asyncio.wrap_future(self.submit(call, tokens, priority, group))
+
+    def chat(self, client, priority=PRIORITY_NORMAL, group=None, **request):
+        """
+        Dispatch one ``client.chat.completions.create(**request)`` call and block until its response.
+
+        The SDK's own retries are disabled for the call, since the dispatcher retries it.
+        """
+        return self._result(self.submit(*self._chat_call(client, request), priority=priority, group=group))
+
+    async def achat(self, client, priority=PRIORITY_NORMAL, group=None, **request):
+        """Awaitable ``chat``."""
+        return await asyncio.wrap_future(self.submit(*self._chat_call(client, request), priority=priority,
+                                                     group=group))
+
+    def for_group(self, group):
+        """View of this dispatcher whose calls all belong to ``group``; see ``DispatcherGroup``."""
+        return DispatcherGroup(self, group)
+
+    def _result(self, future):
+        try:
+            return future.result(timeout=self.result_timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()  # A call still queued is dropped rather than run for nobody
+            raise
+
+    def _chat_call(self, client, request):
+        tokens = estimate_request_tokens(request.get("messages", []), request.get("max_tokens"),
+                                         request.get("model", self.model))
+        if hasattr(client, "with_options"):
+            client = client.with_options(max_retries=0)
+        return (lambda: client.chat.completions.create(**request)), tokens
+
+    def close(self):
+        """Stop the scheduler; queued calls that have not started are cancelled."""
+        if self._loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        self._thread.join()
+        self._loop.close()
+        for *_, job in self._queue:
+            job.future.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def _shutdown(self):
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop.stop()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.create_task(self._dispatch()).add_done_callback(self._dispatch_stopped)
+        self._loop.run_forever()
+
+    def _dispatch_stopped(self, task):
+        if task.cancelled() or task.exception() is None:
+            return  # Shut down by close()
+        self._error = task.exception()
+        self.logger.error(f"LLM dispatcher stopped: {self._error!r}")
+        for *_, job in self._queue:
+            if not job.future.done():
+                job.future.set_exception(self._error)
+        self._queue.clear()
+
+    def _enqueue(self, job):
+        if self._error is not None:
+            if not job.future.done():
+                job.future.set_exception(self._error)
+            return
+        if job.attempts == 0:
+            self.stats["submitted"] += 1
+        if job.round is None:  # Retries keep their place
+            job.round = max(self._rounds.get(job.group, 0), self._virtual_round) + 1
+            self._rounds[job.group] = job.round
+            if len(self._rounds) > MAX_TRACKED_GROUPS:
+                # Groups with nothing ahead of the virtual round would start there anyway
+                self._rounds = {group: last for group, last in self._rounds.items() if last > self._virtual_round}
+        heapq.heappush(self._queue, (job.priority, job.round, next(self._sequence), job))
+        self._ready.set()
+
+    async def _dispatch(self):
+        while True:
+            await self._slots.acquire()
+            while not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+            # Wait for quota before choosing, so a job queued meanwhile with a higher priority goes first
+            while True:
+                job = self._queue[0][-1]
+                now = time.monotonic()
+                delay = max(self._paused_until - now, self.rpm.delay(1, now), self.tpm.delay(job.tokens, now))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            job = heapq.heappop(self._queue)[-1]
+            if job.future.cancelled():  # Its caller timed out
+                self._slots.release()
+                continue
+            self._virtual_round = max(self._virtual_round, job.round)
+            self.rpm.take(1)
+            self.tpm.take(job.tokens)
+            self._loop.create_task(self._execute(job))
+
+    async def _execute(self, job):
+        try:
+            result = await self._loop.run_in_executor(self._executor, job.call)
+        except Exception as e:
+            self._slots.release()
+            self._retry_or_fail(job, e)
+            return
+        self._slots.release()
+        usage = getattr(getattr(result, "usage", None), "total_tokens", None)
+        if isinstance(usage, int) and job.tokens:
+            self.tpm.refund(job.tokens - usage)
+        self.rpm.scale = min(1.0, self.rpm.scale * (1 + RECOVERY_STEP))
+        self.stats["completed"] += 1
+        if not job.future.cancelled():
+            job.future.set_result(result)
+
+    def _retry_or_fail(self, job, error):
+        if job.future.cancelled():
+            return
+        if not is_retryable(error) or job.attempts >= self.max_retries:
+            self.stats["failed"] += 1
+            job.future.set_exception(error)
+            return
+        job.attempts += 1
+        self.stats["retried"] += 1
+        wait = retry_after(error)
+        if wait is None:
+            # Full jitter: spread retries out so throttled callers do not return together
+            wait = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (job.attempts - 1)))
+        if status_of(error) == 429:
+            self.stats["throttled"] += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + wait)
+            self.rpm.level = min(self.rpm.level, 0.0)
+            self.rpm.scale = max(MIN_RATE_SCALE, self.rpm.scale / 2)
+        self.logger.info(f"LLM call failed ({error.__class__.__name__}); retry {job.attempts} "
+                         f"of {self.max_retries} in {wait:.2f}s.")
+        self._loop.call_later(wait, self._enqueue, job)
+
+
+class DispatcherGroup:
+    """
+    A dispatcher as seen by one fairness group: same API, every call tagged with ``group``.
+
+    Components that take a dispatcher (Parser, Synthesizer) can be handed a
+    group view without knowing about groups. Other attributes (stats, rpm, ...)
+    are those of the shared dispatcher.
+    """
+
+    def __init__(self, dispatcher, group):
+        self.dispatcher = dispatcher
+        self.group = group
+
+    def submit(self, call, tokens=0, priority=PRIORITY_NORMAL):
+        return self.dispatcher.submit(call, tokens, priority, self.group)
+
+    def call(self, call, tokens=0, priority=PRIORITY_NORMAL):
+        return self.dispatcher.call(call, tokens, priority, self.group)
+
+    async def acall(self, call, tokens=0, priority=PRIORITY_NORMAL):
+        return await self.dispatcher.acall(call, tokens, priority, self.group)
+
+    def chat(self, client, priority=PRIORITY_NORMAL, **request):
+        return self.dispatcher.chat(client, priority=priority, group=self.group, **request)
+
+    async def achat(self, client, priority=PRIORITY_NORMAL, **request):
+        return await self.dispatcher.achat(client, priority=priority, group=self.group, **request)
+
+    def __getattr__(self, name):
+        return getattr(self.dispatcher, name)
+
+
+_dispatchers = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_llm_dispatcher(provider="openai"):
+    """Return the process-wide dispatcher for ``provider``, creating it with its PROVIDER_LIMITS on first use."""
+    with _dispatchers_lock:
+        if provider not in _dispatchers:
+            _dispatchers[provider] = LLMDispatcher(**PROVIDER_LIMITS.get(provider, {}))
+        return _dispatchers[provider]
+
+
+def dispatch_call(provider, call, tokens=0, priority=PRIORITY_NORMAL):
+    """
+    Run ``call`` through the provider's shared dispatcher and return its result.
+
+    Calls to LOCAL_PROVIDERS run directly: a local server has no quota, and
+    its large prompts would only queue behind a bucket sized for a cloud API.
+    """
+    if provider in LOCAL_PROVIDERS:
+        return call()
+    return get_llm_dispatcher(provider).call(call, tokens, priority)
+
+
+def configure_llm_dispatcher(provider="openai", **kwargs):
+    """
+    Replace the process-wide dispatcher of ``provider``, e.g.
+    ``configure_llm_dispatcher("openai", requests_per_minute=5000, tokens_per_minute=800_000)``.
+
+    Accepts the same keyword arguments as LLMDispatcher and returns the new dispatcher.
+    """
+    dispatcher = LLMDispatcher(**kwargs)
+    with _dispatchers_lock:
+        previous = _dispatchers.get(provider)
+        _dispatchers[provider] = dispatcher
+    if previous is not None:
+        previous.close()
+    return dispatcher
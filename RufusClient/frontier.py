@@ -0,0 +1,69 @@
+import heapq
+import itertools
+import re
+from urllib.parse import urlparse, unquote
+
+from .keywords import stem
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Weights of the signals combined by score_link
+URL_WEIGHT = 2.0
+ANCHOR_WEIGHT = 3.0
+PARENT_WEIGHT = 1.0
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def score_link(keywords, url, anchor_text="", parent_relevance=0.0):
+    """
+    Estimate how promising a link is before fetching it.
+
+    Args:
+        keywords (list): Keywords extracted from the user prompt
+        url (str): Absolute URL of the candidate link
+        anchor_text (str, optional): Visible text of the <a> element(s) pointing to it
+        parent_relevance (float, optional): Relevance (0..1) of the page the link was found on
+
+    Returns:
+        float: 0.0 if neither the URL nor the anchor text mentions a keyword (by stem),
+               otherwise a positive score where higher means more promising
+    """
+    keywords = {stem(keyword) for keyword in keywords}
+    parsed = urlparse(url)
+    url_stems = {stem(token) for token in tokenize(unquote(parsed.path + " " + parsed.query))}
+    anchor_stems = {stem(token) for token in tokenize(anchor_text)}
+    url_hits = len(keywords & url_stems)
+    anchor_hits = len(keywords & anchor_stems)
+    if not url_hits and not anchor_hits:
+        return 0.0
+    return URL_WEIGHT * url_hits + ANCHOR_WEIGHT * anchor_hits + PARENT_WEIGHT * parent_relevance
+
+
+class Frontier:
+    """
+    Priority-queue crawl frontier that pops the highest-scoring URL first.
+
+    Ties are broken in insertion order, so with equal scores the frontier
+    behaves like the FIFO list used by the breadth-first crawl.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+
+    def push(self, url, depth, score=0.0):
+        heapq.heappush(self._heap, (-score, next(self._counter), url, depth))
+
+    def pop(self):
+        """Return ``(url, depth, score)`` of the most promising entry."""
+        neg_score, _, url, depth = heapq.heappop(self._heap)
+        return url, depth, -neg_score
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
@@ -0,0 +1,169 @@
+from functools import lru_cache
+from urllib.parse import urljoin
+
+from lxml import etree
+
+from .keywords import KeywordMatcher
+
+# Elements whose text is never visible content
+SKIPPED_TAGS = frozenset({"script", "style", "noscript", "template", "svg"})
+
+# Navigation hrefs repeat on every page of a site; resolve each (base, href) pair once
+_resolve = lru_cache(maxsize=8192)(urljoin)
+
+
+class PageScan:
+    """
+    Result of one pass over a page.
+
+    Attributes:
+        links (dict): Accepted absolute link URL -> anchor text
+        keyword_hits (dict): Keyword -> number of times the visible text mentions it
+        text_length (int): Characters of visible text seen
+    """
+
+    def __init__(self, links, keyword_hits, text_length):
+        self.links = links
+        self.keyword_hits = keyword_hits
+        self.text_length = text_length
+
+    @property
+    def relevant(self):
+        return any(self.keyword_hits.values())
+
+    @property
+    def relevance(self):
+        # Fraction of keywords that appear somewhere in the page, in [0, 1]
+        if not self.keyword_hits:
+            return 0.0
+        return sum(1 for hits in self.keyword_hits.values() if hits) / len(self.keyword_hits)
+
+
+class _ScanTarget:
+    """lxml parser target: receives SAX-style events, so no tree is ever built."""
+
+    def __init__(self, page_url, matcher, accept_link):
+        self.base_url = page_url
+        self.matcher = matcher
+        self.accept_link = accept_link
+        self.accepted = {}  # href -> accepted URL or None, for hrefs repeated within the page
+        self.links = {}
+        self.keyword_hits = dict.fromkeys(matcher.keywords, 0)
+        self.text_length = 0
+        self.skip_depth = 0
+        self.anchor_href = None
+        self.anchor_depth = 0
+        self.anchor_text = []
+
+    def start(self, tag, attrib):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag == "base" and attrib.get("href"):
+            self.base_url = urljoin(self.base_url, attrib["href"])
+            self.accepted.clear()
+        elif tag == "a":
+            if self.anchor_href is None and attrib.get("href"):
+                self.anchor_href = attrib["href"]
+                self.anchor_depth = 0
+                self.anchor_text = []
+            elif self.anchor_href is not None:
+                self.anchor_depth += 1
+
+    def end(self, tag):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag == "a" and self.anchor_href is not None:
+            if self.anchor_depth:
+                self.anchor_depth -= 1
+                return
+            self._add_link(self.anchor_href, " ".join(self.anchor_text))
+            self.anchor_href = None
+
+    def data(self, text):
+        if self.skip_depth:
+            return
+        self.text_length += len(text)
+        if self.anchor_href is not None:
+            stripped = text.strip()
+            if stripped:
+                self.anchor_text.append(stripped)
+        self.matcher.count(text, self.keyword_hits)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        if self.anchor_href is not None:
+            self._add_link(self.anchor_href, " ".join(self.anchor_text))
+        return PageScan(self.links, self.keyword_hits, self.text_length)
+
+    def _add_link(self, href, anchor_text):
+        if href in self.accepted:
+            full_url = self.accepted[href]
+        else:
+            full_url = self.accepted[href] = self.accept_link(_resolve(self.base_url, href.strip()))
+        if full_url:
+            previous = self.links.get(full_url)
+            self.links[full_url] = f"{previous} {anchor_text}" if previous else anchor_text
+
+
+def scan_html(content, page_url, keywords, accept_link=lambda url: url):
+    """
+    Extract links and the keyword relevance signal from a page in one streaming pass.
+
+    The lxml (libxml2) parser drives callbacks directly; no tree, no lowercased
+    copy of the whole document. Keywords are matched against visible text nodes
+    only, so markup, scripts and styles never make a page relevant.
+
+    Args:
+        content (str): Page HTML
+        page_url (str): URL of the page, used to resolve relative links
+        keywords (KeywordMatcher or list): Compiled matcher, or keywords to build one from
+        accept_link (callable, optional): ``accept_link(absolute_url)`` returning the URL to
+                                          keep (e.g. canonicalised) or None to drop it
+
+    Returns:
+        PageScan: Links with their anchor text, and per-keyword hit counts
+    """
+    matcher = keywords if isinstance(keywords, KeywordMatcher) else KeywordMatcher(keywords)
+    target = _ScanTarget(page_url, matcher, accept_link)
+    if not content or not content.strip():
+        return target.close()
+    parser = etree.HTMLParser(target=target, remove_comments=True, no_network=True)
+    parser.feed(content)
+    return parser.close()
+
+
+class _TextTarget:
+    """lxml parser target that keeps only the visible text nodes."""
+
+    def __init__(self):
+        self.parts = []
+        self.skip_depth = 0
+
+    def start(self, tag, attrib):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def end(self, tag):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+
+    def data(self, text):
+        if not self.skip_depth:
+            self.parts.append(text)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return " ".join(self.parts)
+
+
+def visible_text(content):
+    """Visible text of a page (no markup, scripts, styles or comments), in one streaming pass."""
+    if not content or not content.strip():
+        return ""
+    parser = etree.HTMLParser(target=_TextTarget(), remove_comments=True, no_network=True)
+    parser.feed(content)
+    return parser.close()
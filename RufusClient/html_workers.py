@@ -0,0 +1,193 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from .html_scan import PageScan, scan_html
+from .keywords import KeywordMatcher
+from .reducer import DEFAULT_REDUCER
+
+COMPRESS_LEVEL = 1  # Fastest zlib level: HTML still shrinks 4-8x, for a fraction of the parse time
+
+_reducer = DEFAULT_REDUCER  # Per worker process, set by _init_worker
+
+
+def pack(text):
+    """UTF-8 encode and compress a page for the trip to or from a worker process."""
+    return zlib.compress(text.encode("utf-8"), COMPRESS_LEVEL)
+
+
+def unpack(data):
+    return zlib.decompress(data).decode("utf-8")
+
+
+def _init_worker(reducer):
+    global _reducer
+    _reducer = reducer
+
+
+@lru_cache(maxsize=64)
+def _matcher(keywords):
+    return KeywordMatcher(keywords)
+
+
+def _reduce_packed(data):
+    return pack(_reducer.reduce(unpack(data)))
+
+
+def _apply_packed(function, data):
+    return pack(function(unpack(data)))
+
+
+def _scan_packed(data, page_url, keywords):
+    scan = scan_html(unpack(data), page_url, _matcher(keywords))
+    return tuple(scan.links.items()), tuple(scan.keyword_hits.values()), scan.text_length
+
+
+class HtmlWorkerPool:
+    """
+    Process pool for the CPU-bound HTML work: reduction to markdown and link/keyword scans.
+
+    HTML parsing and html2text conversion are pure-Python or callback-driven
+    work that holds the GIL, so threads fetching and extracting pages in
+    parallel still reduce and scan them one at a time. This pool runs that
+    work in ``workers`` processes (one per core by default), so it scales
+    with cores while the calling threads wait without holding the GIL.
+
+    Pages travel to and from the workers as zlib-compressed UTF-8 bytes, and
+    scan results as plain tuples, so each call pickles a few compact objects
+    rather than large strings. Workers are started with "spawn", which is
+    safe from a process already running dispatcher and crawler threads.
+
+    ``reduce(content)`` matches ``HtmlReducer.reduce``, so the pool can be
+    passed wherever a reducer is expected.
+
+    Attributes:
+        workers (int): Worker processes
+        reducer (HtmlReducer): Reduction run by the workers
+    """
+
+    def __init__(self, workers=None, reducer=DEFAULT_REDUCER):
+        """
+        Args:
+            workers (int, optional): Worker processes. Defaults to the number of cores.
+            reducer (HtmlReducer, optional): Reduction settings, copied into every worker
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.reducer = reducer
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_worker, initargs=(reducer,))
+
+    def reduce(self, content):
+        """
+        Reduce one page in a worker process; blocks the calling thread only.
+
+        Args:
+            content (str): Raw page HTML
+
+        Returns:
+            str: Reduced page content, as ``HtmlReducer.reduce`` returns it
+        """
+        if not content or not content.strip():
+            return ""
+        return unpack(self._executor.submit(_reduce_packed, pack(content)).result())
+
+    def reduce_many(self, contents):
+        """
+        Reduce many pages across all workers.
+
+        Args:
+            contents (Iterable[str]): Raw page HTML
+
+        Returns:
+            list: Reduced content of each page, in input order
+        """
+        contents = [content or "" for content in contents]
+        chunksize = max(1, len(contents) // (self.workers * 4))
+        return [unpack(data) for data in self._executor.map(_reduce_packed, map(pack, contents), chunksize=chunksize)]
+
+    def map_pages(self, function, contents):
+        """
+        Run a page-to-text conversion other than the pool's reducer across all workers.
+
+        Args:
+            function (Callable[[str], str]): Module-level function, so the workers can import it by name
+            contents (Iterable[str]): Raw page HTML
+
+        Returns:
+            list: ``function(content)`` for each page, in input order
+        """
+        contents = [content or "" for content in contents]
+        chunksize = max(1, len(contents) // (self.workers * 4))
+        packed = self._executor.map(_apply_packed, [function] * len(contents), map(pack, contents), chunksize=chunksize)
+        return [unpack(data) for data in packed]
+
+    def scan(self, content, page_url, keywords):
+        """
+        ``html_scan.scan_html`` in a worker process, without link filtering.
+
+        Links are resolved against the page URL but not filtered or
+        canonicalised: the caller's ``accept_link`` usually needs state (robots
+        rules, the crawl's domain) that stays in this process.
+
+        Args:
+            content (str): Page HTML
+            page_url (str): URL of the page, used to resolve relative links
+            keywords (Iterable[str]): Keywords to count
+
+        Returns:
+            PageScan: Absolute links with their anchor text, and per-keyword hit counts
+        """
+        keywords = tuple(keywords)
+        links, hits, text_length = self._executor.submit(_scan_packed, pack(content or ""), page_url,
+                                                         keywords).result()
+        return PageScan(dict(links), dict(zip(_matcher(keywords).keywords, hits)), text_length)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_html_workers():
+    """Return the process-wide HtmlWorkerPool, creating it on first use."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = HtmlWorkerPool()
+        return _shared_pool
+
+
+def configure_html_workers(**kwargs):
+    """
+    Replace the process-wide HtmlWorkerPool, e.g. ``configure_html_workers(workers=4)``.
+
+    Accepts the same keyword arguments as HtmlWorkerPool and returns the new pool.
+    """
+    global _shared_pool
+    pool = HtmlWorkerPool(**kwargs)
+    with _shared_pool_lock:
+        previous, _shared_pool = _shared_pool, pool
+    if previous is not None:
+        previous.close()
+    return pool
+
+
+@atexit.register
+def close_html_workers():
+    global _shared_pool
+    with _shared_pool_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.close()
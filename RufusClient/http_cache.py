@@ -0,0 +1,246 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from requests.structures import CaseInsensitiveDict
+
+from .urls import canonicalize_url
+
+DEFAULT_CACHE_PATH = os.path.join(".rufus_cache", "http_cache.sqlite")
+
+
+def parse_cache_control(value):
+    directives = {}
+    for item in (value or "").split(","):
+        name, _, argument = item.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or True
+    return directives
+
+
+def freshness_deadline(headers, now):
+    """Absolute time until which a response may be served without revalidation, or None."""
+    directives = parse_cache_control(headers.get("Cache-Control"))
+    if "no-cache" in directives or ("must-revalidate" in directives and "max-age" not in directives):
+        return None
+    if "max-age" in directives:
+        try:
+            return now + int(directives["max-age"])
+        except ValueError:
+            return None
+    if headers.get("Expires"):
+        try:
+            return parsedate_to_datetime(headers["Expires"]).timestamp()
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+class CachedResponse:
+    """
+    Response rebuilt from the cache; mirrors the parts of requests.Response the fetch paths use.
+
+    Attributes:
+        from_cache (bool): Always True
+        not_modified (bool): True if the server answered 304 to a conditional request
+    """
+
+    def __init__(self, url, body, status_code, headers, encoding, not_modified=False):
+        self.url = url
+        self.content = body
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.encoding = encoding or "utf-8"
+        self.from_cache = True
+        self.not_modified = not_modified
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def raise_for_status(self):
+        pass
+
+
+class HttpCache:
+    """
+    Persistent HTTP cache with conditional-GET revalidation, keyed by canonical URL.
+
+    Bodies are stored with their ETag / Last-Modified validators in SQLite.
+    Responses still fresh under Cache-Control max-age or Expires are served
+    without touching the network. Stale ones are revalidated with
+    If-None-Match / If-Modified-Since, so an unchanged page costs a 304.
+    ``no-store`` responses are never kept. Entries are evicted least recently
+    used first once the cache exceeds ``max_bytes`` or ``max_entries``.
+
+    Attributes:
+        path (str): SQLite database file
+        max_bytes (int): Total body size budget
+        max_entries (int): Optional bound on the number of cached URLs
+        hits, revalidated, misses (int): Counters for fresh hits, 304s and full downloads
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=512 * 1024 * 1024, max_entries=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fresh_until REAL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                validated REAL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+        self._db.commit()
+
+    def get(self, fetch, url, headers=None):
+        """
+        Serve ``url`` through the cache.
+
+        Args:
+            fetch (callable): ``fetch(url, headers) -> response`` performing the real request
+                              without raising on status
+            url (str): URL to fetch
+            headers (dict, optional): Request headers
+
+        Returns:
+            Response: A CachedResponse for fresh hits and 304s, else the network response
+        """
+        key = canonicalize_url(url)
+        now = time.time()
+        entry = self._load(key)
+        if entry and entry["fresh_until"] is not None and entry["fresh_until"] > now:
+            self._record_hit(key, now)
+            return self._to_response(url, entry)
+
+        request_headers = dict(headers or {})
+        if entry and entry["etag"]:
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = fetch(url, request_headers)
+        if response.status_code == 304 and entry:
+            self._refresh(key, response.headers, now)
+            return self._to_response(url, entry, not_modified=True)
+
+        with self._lock:
+            self.misses += 1
+        if response.status_code == 200:
+            self._store(key, response, now)
+        return response
+
+    def unchanged_since(self, url, modified):
+        """
+        Serve ``url`` from the cache without any request if the copy is newer than ``modified``.
+
+        Used with sitemap <lastmod> dates: a page last downloaded or revalidated
+        after the site says it changed cannot be stale.
+
+        Args:
+            url (str): Page URL
+            modified (float): Unix time the page last changed
+
+        Returns:
+            CachedResponse: The cached page (not_modified=True), or None if it may have changed
+        """
+        key = canonicalize_url(url)
+        with self._lock:
+            row = self._db.execute("SELECT validated FROM entries WHERE url = ?", (key,)).fetchone()
+        if row is None or row[0] is None or row[0] < modified:
+            return None
+        entry = self._load(key)
+        if entry is None:
+            return None
+        self._record_hit(key, time.time())
+        return self._to_response(url, entry, not_modified=True)
+
+    def _store(self, key, response, now):
+        if "no-store" in parse_cache_control(response.headers.get("Cache-Control")):
+            return
+        body = response.content
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, body, response.status_code, json.dumps(dict(response.headers)),
+                 response.encoding or "utf-8", response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                 freshness_deadline(response.headers, now), len(body), now, now))
+            self._evict()
+            self._db.commit()
+
+    def total_bytes(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _load(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, status, headers, encoding, etag, last_modified, fresh_until "
+                "FROM entries WHERE url = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        names = ("body", "status", "headers", "encoding", "etag", "last_modified", "fresh_until")
+        return dict(zip(names, row))
+
+    def _record_hit(self, key, now):
+        with self._lock:
+            self.hits += 1
+            self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (now, key))
+            self._db.commit()
+
+    def _refresh(self, key, headers, now):
+        # A 304 may carry new validators or freshness information
+        with self._lock:
+            self.revalidated += 1
+            self._db.execute(
+                "UPDATE entries SET fresh_until = ?, last_access = ?, validated = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (freshness_deadline(headers, now), now, now, headers.get("ETag"), headers.get("Last-Modified"), key))
+            self._db.commit()
+
+    def _evict(self):
+        total, count = self._db.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries").fetchone()
+        while count > 1 and (total > self.max_bytes or (self.max_entries is not None and count > self.max_entries)):
+            url, size = self._db.execute(
+                "SELECT url, size FROM entries ORDER BY last_access ASC LIMIT 1").fetchone()
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            total -= size
+            count -= 1
+            self.logger.debug(f"Evicted {url} from the HTTP cache.")
+
+    def _to_response(self, url, entry, not_modified=False):
+        return CachedResponse(url, entry["body"], entry["status"], json.loads(entry["headers"]),
+                              entry["encoding"], not_modified=not_modified)
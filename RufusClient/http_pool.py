@@ -0,0 +1,151 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+except ImportError:
+    httpx = None
+
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_HEADERS = {
+    "User-Agent": "RufusBot/1.0",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Connection": "keep-alive",
+}
+
+
+class HttpPool:
+    """
+    Keep-alive HTTP client shared by every static fetch path.
+
+    Wraps a ``requests.Session`` whose adapters keep one connection pool per
+    host, so repeated requests to the same site reuse TCP/TLS connections
+    instead of paying a new handshake per page. With ``http2=True`` an
+    ``httpx.Client`` is used instead (requires ``pip install httpx[http2]``).
+
+    Errors are always raised as ``requests.exceptions.RequestException`` so
+    callers handle both backends the same way.
+
+    Attributes:
+        timeout (float): Default request timeout in seconds
+        http2 (bool): Whether the HTTP/2 backend is active
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, timeout=10, http2=False, headers=None, cache=None):
+        """
+        Args:
+            pool_connections (int, optional): Number of per-host pools to keep. Defaults to 10.
+            pool_maxsize (int, optional): Connections kept alive per host. Defaults to 10.
+            timeout (float, optional): Default timeout in seconds. Defaults to 10.
+            http2 (bool, optional): Use the httpx HTTP/2 backend. Defaults to False.
+            headers (dict, optional): Extra default headers sent with every request
+            cache (HttpCache, optional): Default conditional-GET cache for get()
+
+        Raises:
+            ImportError: If http2 is requested but httpx/h2 are not installed
+        """
+        self.timeout = timeout
+        self.http2 = http2
+        self.cache = cache
+        default_headers = dict(DEFAULT_HEADERS, **(headers or {}))
+
+        if http2:
+            if httpx is None:
+                raise ImportError("HTTP/2 support requires httpx and h2: pip install 'httpx[http2]'")
+            self._client = httpx.Client(
+                http2=True,
+                headers=default_headers,
+                timeout=timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=pool_connections * pool_maxsize,
+                                    max_keepalive_connections=pool_maxsize),
+            )
+        else:
+            self._client = requests.Session()
+            self._client.headers.update(default_headers)
+            adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+            self._client.mount("http://", adapter)
+            self._client.mount("https://", adapter)
+
+    def get(self, url, headers=None, timeout=None, raise_for_status=True, cache=None):
+        """
+        Perform a GET request over the pooled connections.
+
+        Args:
+            url (str): URL to fetch
+            headers (dict, optional): Per-request headers merged over the defaults
+            timeout (float, optional): Overrides the default timeout
+            raise_for_status (bool, optional): Raise on 4xx/5xx. Defaults to True.
+            cache (HttpCache, optional): Cache to serve/revalidate through; defaults to ``self.cache``
+
+        Returns:
+            Response: ``requests.Response``, ``httpx.Response`` or ``CachedResponse`` (same basic
+                      interface: ``status_code``, ``headers``, ``text``, ``content``)
+
+        Raises:
+            requests.exceptions.RequestException: On connection errors, timeouts or bad status
+        """
+        timeout = self.timeout if timeout is None else timeout
+        cache = self.cache if cache is None else cache
+
+        def fetch(url, headers):
+            return self._send(url, headers, timeout)
+
+        if cache is not None:
+            response = cache.get(fetch, url, headers)
+        else:
+            response = fetch(url, headers)
+        if raise_for_status and response.status_code >= 400:
+            if self.http2:
+                try:
+                    response.raise_for_status()
+                except httpx.HTTPStatusError as e:
+                    raise requests.exceptions.HTTPError(str(e)) from e
+            response.raise_for_status()
+        return response
+
+    def _send(self, url, headers, timeout):
+        if not self.http2:
+            return self._client.get(url, headers=headers, timeout=timeout)
+        try:
+            return self._client.get(url, headers=headers, timeout=timeout)
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+    def close(self):
+        self._client.close()
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_http_pool():
+    """Return the process-wide HttpPool, creating it on first use."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = HttpPool()
+        return _shared_pool
+
+
+def configure_http_pool(**kwargs):
+    """
+    Replace the process-wide HttpPool, e.g. ``configure_http_pool(pool_maxsize=32, http2=True)``.
+
+    Accepts the same keyword arguments as HttpPool and returns the new pool.
+    """
+    global _shared_pool
+    pool = HttpPool(**kwargs)
+    with _shared_pool_lock:
+        previous, _shared_pool = _shared_pool, pool
+    if previous is not None:
+        previous.close()
+    return pool
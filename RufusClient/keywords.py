@@ -0,0 +1,123 @@
+import re
+from functools import lru_cache
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+# Function words, plus the instruction verbs prompts are phrased with ("find", "get me", ...)
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+me more most my myself no nor not now of off on once only or other our ours ourselves out over
+own same she should so some such than that the their theirs them themselves then there these they
+this those through to too under until up very was we were what when where which while who whom
+why will with would you your yours yourself yourselves
+find get give show tell list extract collect gather search look fetch scrape need want please
+info information details related regarding
+""".split())
+
+# Inflectional suffixes removed by stem(), longest first
+SUFFIXES = ("ingly", "edly", "ings", "ing", "ied", "ies", "ed", "es", "ly", "s")
+
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    """
+    Light suffix-stripping stemmer: reduces inflected forms of a word to a shared stem.
+
+    "price", "prices" and "pricing" all become "pric"; "plans" and "planning"
+    become "plan". It is deliberately conservative (no derivational suffixes),
+    which is what a relevance filter needs.
+    """
+    word = word.lower()
+    if len(word) <= 3:
+        return word
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word.endswith(("ss", "us", "is")):
+                break
+            word = word[:-len(suffix)]
+            if suffix in ("ies", "ied"):
+                word += "y"
+            elif suffix in ("ing", "ings", "ingly", "ed", "edly") and len(word) > 3 \
+                    and word[-1] == word[-2] and word[-1] not in "aeiouls":
+                word = word[:-1]  # planning -> plann -> plan
+            break
+    if len(word) > 3 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def extract_keywords(prompt):
+    """
+    Turn a user prompt into the keywords a page must mention to be relevant.
+
+    Words are lowercased and stripped of punctuation; stopwords and words that
+    share a stem with an earlier keyword are dropped. If every word is a
+    stopword, the words are kept as they are rather than matching nothing.
+
+    Args:
+        prompt (str): The user's instructions
+
+    Returns:
+        list: Keywords in prompt order
+    """
+    words = WORD_PATTERN.findall(prompt.lower())
+    keywords, stems = [], set()
+    for word in [word for word in words if word not in STOPWORDS] or words:
+        word_stem = stem(word)
+        if word_stem not in stems:
+            stems.add(word_stem)
+            keywords.append(word)
+    return keywords
+
+
+class KeywordMatcher:
+    """
+    Compiled multi-keyword matcher: one scan of a text finds every keyword at once.
+
+    Keywords match whole words by stem, so "pricing" matches "Price" and
+    "prices" but not "prick". Matching is case-insensitive and works on the
+    text as given, without a lowercased copy.
+
+    Attributes:
+        keywords (list): Lowercased keywords, the keys of every count dict
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        self.stems = {}
+        for keyword in self.keywords:
+            self.stems.setdefault(stem(keyword), keyword)
+        # Candidates are words starting with a keyword stem; stem() then confirms them.
+        # Longest stems first so that overlapping alternatives prefer the longer one.
+        alternatives = sorted(self.stems, key=len, reverse=True)
+        self.pattern = re.compile(
+            r"(?<![^\W_])(?:" + "|".join(map(re.escape, alternatives)) + r")[^\W_]*",
+            re.IGNORECASE) if alternatives else None
+
+    def count(self, text, counts=None):
+        """
+        Count keyword occurrences in ``text``.
+
+        Args:
+            text (str): Text to scan
+            counts (dict, optional): Keyword -> count to add to, for accumulating over many text nodes
+
+        Returns:
+            dict: Keyword -> number of occurrences
+        """
+        if counts is None:
+            counts = dict.fromkeys(self.keywords, 0)
+        if self.pattern is not None:
+            for match in self.pattern.finditer(text):
+                keyword = self.stems.get(stem(match.group()))
+                if keyword is not None:
+                    counts[keyword] += 1
+        return counts
+
+    def search(self, text):
+        """Return True if ``text`` mentions any keyword."""
+        if self.pattern is None:
+            return False
+        return any(stem(match.group()) in self.stems for match in self.pattern.finditer(text))
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_LLM_CACHE_PATH = os.path.join(".rufus_cache", "llm_cache.sqlite")
+
+
+def llm_cache_key(provider, model, system_prompt, user_prompt, content, schema=None, temperature=None, **params):
+    """
+    Content address of one LLM call: identical inputs always give the same key.
+
+    Args:
+        provider (str): API provider, e.g. "openai"
+        model (str): Model name
+        system_prompt (str): System message
+        user_prompt (str): User instructions
+        content (str): Page content or data sent with the prompt
+        schema (optional): Structured-output schema: a pydantic model class, a dict or a string
+        temperature (float, optional): Sampling temperature
+        **params: Any other request parameter that changes the answer (max_tokens, ...)
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    if hasattr(schema, "model_json_schema"):
+        schema = schema.model_json_schema()
+    parts = {
+        "provider": provider, "model": model, "system": system_prompt, "prompt": user_prompt,
+        "content": content, "schema": schema, "temperature": temperature, "params": params,
+    }
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Persistent cache of LLM responses, addressed by the hash of everything that shapes the answer.
+
+    A repeat run over unchanged pages with the same prompt, model and settings
+    is answered from SQLite in milliseconds and costs no tokens. Entries older
+    than ``ttl`` are treated as misses and removed. Once the cache exceeds
+    ``max_bytes`` or ``max_entries``, the least recently used entries are evicted.
+    Only successful responses should be stored, so failures are always retried.
+
+    Values are anything JSON-serialisable (strings, dicts, lists).
+
+    Attributes:
+        path (str): SQLite database file
+        ttl (float): Seconds an entry stays valid, or None for no expiry
+        max_bytes (int): Total size budget of the stored responses
+        max_entries (int): Optional bound on the number of entries
+        bypass (bool): Skip lookups (every call is a miss) but still store fresh responses
+        hits, misses (int): Lookup counters
+    """
+
+    def __init__(self, path=DEFAULT_LLM_CACHE_PATH, ttl=7 * 24 * 3600, max_bytes=256 * 1024 * 1024,
+                 max_entries=None, bypass=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._db.commit()
+
+    def get(self, key, bypass=None):
+        """
+        Look up a response.
+
+        Args:
+            key (str): Key from ``llm_cache_key``
+            bypass (bool, optional): Overrides ``self.bypass`` for this lookup
+
+        Returns:
+            The stored value, or None on a miss, an expired entry or a bypassed lookup
+        """
+        if self.bypass if bypass is None else bypass:
+            with self._lock:
+                self.misses += 1
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and row[1] + self.ttl <= now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Store a successful response under ``key``, evicting old entries if over budget."""
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                             (key, data, len(data.encode("utf-8")), now, now))
+            self._evict()
+            self._db.commit()
+
+    def stats(self):
+        """Lookup counters and hit rate since the cache was opened."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def total_bytes(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _evict(self):
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM responses WHERE created <= ?", (time.time() - self.ttl,))
+        total, count = self._db.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses").fetchone()
+        while count > 1 and (total > self.max_bytes or (self.max_entries is not None and count > self.max_entries)):
+            key, size = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC LIMIT 1").fetchone()
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            count -= 1
+            self.logger.debug(f"Evicted {key} from the LLM cache.")
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Return the process-wide LLMCache at the default path, opening it on first use."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMCache()
+        return _shared_cache
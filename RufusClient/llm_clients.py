@@ -0,0 +1,145 @@
+import logging
+import threading
+
+import httpx
+from openai import OpenAI
+
+try:
+    from groq import Groq
+except ImportError:
+    Groq = None
+
+# Generous read timeout (completions are slow), but fail fast when the endpoint is unreachable
+DEFAULT_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=90.0)
+DEFAULT_MAX_RETRIES = 2
+
+PROVIDERS = ("openai", "groq", "gemini")
+
+
+class LLMClientRegistry:
+    """
+    Process-wide cache of LLM API clients, one per (provider, endpoint, API key).
+
+    Every client built by the SDKs owns an HTTP connection pool, so creating one
+    per page or per call pays a new TCP/TLS handshake each time. The registry
+    builds each client once, on a tuned ``httpx.Client`` (keep-alive limits and
+    timeouts), and hands the same thread-safe instance to every caller.
+
+    Supported providers:
+    - ``openai``: ``openai.OpenAI``; any OpenAI-compatible server via ``base_url``
+      (e.g. a local LM Studio endpoint)
+    - ``groq``: ``groq.Groq`` (requires ``pip install groq``)
+    - ``gemini``: the ``google.generativeai`` module, configured once per key.
+      Its configuration is global to the process, so it is only reconfigured
+      when a different key is requested.
+
+    Attributes:
+        timeout (httpx.Timeout): Timeouts applied to every request
+        limits (httpx.Limits): Connection pool limits of every client
+        max_retries (int): SDK-level retries on connection errors and 429/5xx
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, limits=DEFAULT_LIMITS, max_retries=DEFAULT_MAX_RETRIES):
+        self.timeout = timeout
+        self.limits = limits
+        self.max_retries = max_retries
+        self.logger = logging.getLogger(__name__)
+        self._clients = {}
+        self._http_clients = []
+        self._gemini_key = None
+        self._lock = threading.Lock()
+
+    def get(self, provider="openai", api_key=None, base_url=None):
+        """
+        Return the shared client for ``provider``, building it on first use.
+
+        Args:
+            provider (str, optional): One of ``PROVIDERS``. Defaults to "openai".
+            api_key (str, optional): API key; the SDK reads its environment variable when None
+            base_url (str, optional): Endpoint of an OpenAI-compatible server
+
+        Returns:
+            Client for the provider (``OpenAI``, ``Groq`` or the ``google.generativeai`` module)
+
+        Raises:
+            ValueError: If the provider is unknown
+            ImportError: If the provider's SDK is not installed
+        """
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown LLM provider: {provider}")
+        if provider == "gemini":
+            return self._gemini(api_key)
+        key = (provider, base_url, api_key)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = self._build(provider, api_key, base_url)
+                self.logger.info(f"Created shared {provider} client for {base_url or 'the default endpoint'}.")
+            return client
+
+    def _build(self, provider, api_key, base_url):
+        http_client = httpx.Client(timeout=self.timeout, limits=self.limits, follow_redirects=True)
+        self._http_clients.append(http_client)
+        options = dict(api_key=api_key, base_url=base_url, timeout=self.timeout,
+                       max_retries=self.max_retries, http_client=http_client)
+        if provider == "openai":
+            return OpenAI(**options)
+        if Groq is None:
+            raise ImportError("The Groq provider requires the groq package: pip install groq")
+        return Groq(**options)
+
+    def _gemini(self, api_key):
+        import google.generativeai as genai
+
+        with self._lock:
+            if api_key != self._gemini_key:
+                genai.configure(api_key=api_key)
+                self._gemini_key = api_key
+        return genai
+
+    def __len__(self):
+        return len(self._clients)
+
+    def close(self):
+        """Close every client's connection pool and forget the clients."""
+        with self._lock:
+            http_clients, self._http_clients = self._http_clients, []
+            self._clients.clear()
+            self._gemini_key = None
+        for http_client in http_clients:
+            http_client.close()
+
+
+_shared_registry = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_llm_registry():
+    """Return the process-wide LLMClientRegistry, creating it on first use."""
+    global _shared_registry
+    with _shared_registry_lock:
+        if _shared_registry is None:
+            _shared_registry = LLMClientRegistry()
+        return _shared_registry
+
+
+def get_llm_client(provider="openai", api_key=None, base_url=None):
+    """Shared client for (provider, endpoint, key); see ``LLMClientRegistry.get``."""
+    return get_llm_registry().get(provider, api_key, base_url)
+
+
+def configure_llm_clients(**kwargs):
+    """
+    Replace the process-wide registry, e.g. ``configure_llm_clients(timeout=httpx.Timeout(30.0))``.
+
+    Accepts the same keyword arguments as LLMClientRegistry and returns the new registry.
+    Clients handed out by the previous registry are closed.
+    """
+    global _shared_registry
+    registry = LLMClientRegistry(**kwargs)
+    with _shared_registry_lock:
+        previous, _shared_registry = _shared_registry, registry
+    if previous is not None:
+        previous.close()
+    return registry
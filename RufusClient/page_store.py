@@ -0,0 +1,96 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class PageStore:
+    """
+    Bounded URL -> HTML store filled by the Crawler and read back by RufusClient.
+
+    The most recently stored pages are kept in memory. Once the in-memory
+    total exceeds ``max_memory_bytes`` the least recently used pages are
+    written to a spill directory on disk and read back on demand, so a large
+    crawl never has to hold every page in RAM nor download it twice.
+
+    Attributes:
+        max_memory_bytes (int): Upper bound for HTML held in memory
+        spill_dir (str): Directory used for pages evicted from memory
+    """
+
+    def __init__(self, max_memory_bytes=64 * 1024 * 1024, spill_dir=None):
+        """
+        Args:
+            max_memory_bytes (int, optional): In-memory budget in bytes. Defaults to 64 MiB.
+            spill_dir (str, optional): Spill directory. A temporary directory is
+                                       created (and removed by close()) when omitted.
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_dir = spill_dir
+        self._owns_spill_dir = spill_dir is None
+        self._memory = OrderedDict()  # url -> (content, size)
+        self._memory_bytes = 0
+        self._spilled = {}  # url -> file path
+        self._lock = threading.Lock()
+
+    def put(self, url, content):
+        data = content.encode("utf-8")
+        with self._lock:
+            self._discard(url)
+            self._memory[url] = (content, len(data))
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+                self._spill_oldest()
+
+    def get(self, url, default=None):
+        with self._lock:
+            if url in self._memory:
+                self._memory.move_to_end(url)
+                return self._memory[url][0]
+            path = self._spilled.get(url)
+            if path is None:
+                return default
+            # Read under the lock: discard() or close() could otherwise remove the file mid-read
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+
+    def __contains__(self, url):
+        with self._lock:
+            return url in self._memory or url in self._spilled
+
+    def __len__(self):
+        with self._lock:
+            return len(self._memory) + len(self._spilled)
+
+    def close(self):
+        """Drop every stored page and remove the spill directory if we created it."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for path in self._spilled.values():
+                if os.path.exists(path):
+                    os.remove(path)
+            self._spilled.clear()
+            if self._owns_spill_dir and self.spill_dir:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+                self.spill_dir = None
+
+    def _discard(self, url):
+        if url in self._memory:
+            self._memory_bytes -= self._memory.pop(url)[1]
+        path = self._spilled.pop(url, None)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def _spill_oldest(self):
+        url, (content, size) = self._memory.popitem(last=False)
+        self._memory_bytes -= size
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="rufus_pages_")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        self._spilled[url] = path
@@ -4,6 +4,17 @@ from openai import OpenAI, APIConnectionError, RateLimitError, APIStatusError
 
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .chunking import split_into_chunks
+from .reducer import DEFAULT_REDUCER
+from .llm_cache import llm_cache_key
+from .llm_clients import get_llm_client
+from .ranking import PassageRanking
+from .tokens import count_tokens
+
+SYSTEM_PROMPT = "You are a helpful assistant and a part of RAG application."
 
 class Parser:
     """
@@ -17,10 +28,23 @@ class Parser:
         client (OpenAI): Configured OpenAI client for API interactions
         content (str): Raw HTML or text content to be parsed
         user_prompt (str): Specific search query guiding content extraction
+        reducer (HtmlReducer): Pre-LLM reduction applied to the content, or None to send it as is
+        token_report (dict): Input tokens of the page before and after reduction, after passage
+                             selection (if enabled), and the number of chunks it was split into
+        chunk_tokens (int): Token budget of each chunk sent to the LLM
+        cache (LLMCache): Response cache consulted before every call, or None
+        dispatcher (LLMDispatcher): Rate-limit-aware scheduler the calls go through, or None
+        top_k (int): Passages of the page sent to the LLM, or None to send the whole page
+        passage_budget (int): Token budget of the selected passages, or None
+        ranking (PassageRanking): Crawl-wide passage ranking the selection is taken from, or None
+        failures (int): Chunks whose extraction failed (API error), as opposed to chunks
+                        where nothing relevant was found
         logger (logging.Logger): Logging utility for tracking parsing activities
     """
     
-    def __init__(self, content, user_prompt, api_key):
+    def __init__(self, content, user_prompt, api_key, reducer=DEFAULT_REDUCER, model="chatgpt-4o-latest",
+                 chunk_tokens=6000, max_workers=4, cache=None, dispatcher=None, top_k=None,
+                 passage_budget=None, ranking=None, page_key=None):
         """
         Initialize the Parser with content, user prompt, and OpenAI configuration.
 
@@ -28,26 +52,101 @@ class Parser:
             content (str): Raw web content to be parsed
             user_prompt (str): User-defined search query
             api_key (str): OpenAI API authentication key
+            reducer (HtmlReducer, optional): Strips non-content markup and converts the page to
+                                             compact markdown before the call (an HtmlWorkerPool
+                                             does it in a worker process). None disables it.
+            model (str, optional): Model used for extraction. Defaults to chatgpt-4o-latest.
+            chunk_tokens (int, optional): Pages longer than this many tokens are split into chunks
+                                          that are extracted concurrently. Defaults to 6000.
+            max_workers (int, optional): Chunks extracted at the same time. Defaults to 4.
+            cache (LLMCache, optional): Answers chunks already extracted with the same prompt
+                                        and model from the cache instead of calling the API
+            dispatcher (LLMDispatcher, optional): Paces the calls under the provider's rate limits
+                                                  and retries throttled ones instead of dropping them
+            top_k (int, optional): Rank the page's passages against the prompt with BM25 and send
+                                   only the best ``top_k`` of them. None sends the whole page.
+            passage_budget (int, optional): Also cap the selected passages at this many tokens
+            ranking (PassageRanking, optional): Ranking fitted over every page of the crawl, so
+                                                term rarity is measured crawl-wide. Without one,
+                                                the page is ranked on its own.
+            page_key (optional): Key of this page in ``ranking`` (the client uses the URL)
 
         Setup:
-        - Initializes OpenAI client
+        - Uses the shared OpenAI client for this key, so pages reuse its connections
         - Configures logging for error tracking and debugging
         """
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_llm_client("openai", api_key)
         
         self.content = content
         self.user_prompt = user_prompt
+        self.reducer = reducer
+        self.model = model
+        self.chunk_tokens = chunk_tokens
+        self.max_workers = max_workers
+        self.cache = cache
+        self.dispatcher = dispatcher
+        self.top_k = top_k
+        self.passage_budget = passage_budget
+        self.ranking = ranking
+        self.page_key = page_key
+        self.token_report = None
+        self.failures = 0
+        self._failures_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
         logging.basicConfig(level=logging.INFO)
 
+    def reduce_content(self):
+        """
+        Run the reduction pipeline on the page and record the token saving.
+
+        Returns:
+            str: Content to send to the LLM
+        """
+        reduced = self.reducer.reduce(self.content) if self.reducer is not None else self.content
+        self.token_report = {
+            "tokens_before": count_tokens(self.content, self.model),
+            "tokens_after": count_tokens(reduced, self.model),
+        }
+        self.logger.info(f"Page reduced from {self.token_report['tokens_before']} "
+                         f"to {self.token_report['tokens_after']} tokens.")
+        return reduced
+
+    def select_passages(self, content):
+        """
+        Keep only the passages of the reduced page that best match the prompt.
+
+        A no-op unless ``top_k`` or ``passage_budget`` is set. Uses the shared
+        ranking when it covers this page, else ranks the page on its own.
+
+        Args:
+            content (str): Reduced page content
+
+        Returns:
+            str: Selected passages in document order
+        """
+        if self.top_k is None and self.passage_budget is None:
+            return content
+        ranking = self.ranking
+        if ranking is None or self.page_key not in ranking:
+            ranking = PassageRanking(self.user_prompt, {self.page_key: content}, model=self.model)
+        selected = ranking.select_text(self.page_key, self.top_k, self.passage_budget)
+        self.token_report["tokens_selected"] = count_tokens(selected, self.model)
+        self.logger.info(f"Selected {self.token_report['tokens_selected']} of "
+                         f"{self.token_report['tokens_after']} tokens by passage ranking.")
+        return selected
+
     def extract_relevant_sections(self):
         """
         Intelligently extract content sections most relevant to the user's prompt.
 
         Advanced AI-powered extraction process:
+        - Reduces the page, optionally keeps only its best-ranked passages
+          (``top_k``), then splits it into token-budgeted chunks on
+          structural boundaries (headings, paragraphs, lines)
+        - Extracts every chunk concurrently (map) and joins the partial
+          extractions in document order (reduce), so a long page costs about
+          as long as its slowest chunk and no part of it is cut off
         - Uses OpenAI's language model for contextual understanding
-        - Dynamically identifies and extracts pertinent information
-        - Handles various API interaction scenarios
 
         Returns:
             str: Extracted and refined content sections
@@ -55,37 +154,117 @@ class Parser:
         Error Handling:
         - Gracefully manages API connection issues
         - Logs detailed error information
-        - Provides fallback mechanisms for API failures
+        - A failed chunk contributes nothing; the other chunks are still used
+        """
+        return self.extract_chunks(self.prepare_chunks())
+
+    def extract_chunks(self, chunks):
+        """
+        Extract prepared chunks concurrently and merge the results in document order.
+
+        Args:
+            chunks (list): Output of ``prepare_chunks``
+
+        Returns:
+            str: Extracted content
+        """
+        if len(chunks) <= 1:
+            return self.extract_chunk(chunks[0]) if chunks else ""
+
+        self.logger.info(f"Extracting {len(chunks)} chunks concurrently.")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+            partials = list(executor.map(self.extract_chunk, chunks))
+        return self.merge(partials)
+
+    def prepare_chunks(self):
+        """
+        Reduce the page and split it into the chunks sent to the LLM.
+
+        Returns:
+            list: Chunks in document order; empty if the content could not be prepared
+        """
+        try:
+            content = self.select_passages(self.reduce_content())
+            chunks = split_into_chunks(content, self.chunk_tokens, self.model)
+        except Exception as e:
+            self.logger.error(f"Unexpected error while preparing content: {e}")
+            self.record_failure()
+            return []
+        self.token_report["chunks"] = len(chunks)
+        return chunks
+
+    @property
+    def complete(self):
+        """True if every chunk was extracted; an empty result then means nothing was relevant."""
+        return self.failures == 0
+
+    def record_failure(self):
+        with self._failures_lock:
+            self.failures += 1
+
+    @staticmethod
+    def merge(partials):
+        """Join per-chunk extractions in document order, skipping empty ones."""
+        return "\n\n".join(partial for partial in partials if partial)
+
+    def chunk_request(self, content):
+        """
+        Chat completion request that extracts the relevant sections of one chunk.
+
+        Args:
+            content (str): Reduced page content, or one chunk of it
+
+        Returns:
+            dict: Request body (model, messages, sampling settings)
+        """
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"Given the following page content, identify and extract the sections that are relevant to the user's prompt gather .\n\nUser Prompt: \"{self.user_prompt}\"\n\nPage Content:\n{content}"}
+        ]
+        return dict(model=self.model, messages=messages, max_tokens=1000, temperature=0.5, n=1)
+
+    def cache_key(self, content):
+        return llm_cache_key("openai", self.model, SYSTEM_PROMPT, self.user_prompt, content,
+                             temperature=0.5, max_tokens=1000)
+
+    def extract_chunk(self, content):
+        """
+        Extract the sections of one chunk that are relevant to the user's prompt.
+
+        Args:
+            content (str): Reduced page content, or one chunk of it
+
+        Returns:
+            str: Extracted text, or an empty string if the call failed (counted in ``failures``)
         """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache_key(content)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
         try:
-            messages = [
-                {"role": "system", "content": "You are a helpful assistant and a part of RAG application."},
-                {"role": "user", "content": f"Given the following HTML content, identify and extract the sections that are relevant to the user's prompt gather .\n\nUser Prompt: \"{self.user_prompt}\"\n\nHTML Content:\n{self.content}"}
-            ]
-
-            response = self.client.chat.completions.create(
-                model="chatgpt-4o-latest",
-                messages=messages,
-                max_tokens=1000,
-                temperature=0.5,
-                n=1
-            )
+            request = self.chunk_request(content)
+            if self.dispatcher is not None:
+                response = self.dispatcher.chat(self.client, **request)
+            else:
+                response = self.client.chat.completions.create(**request)
 
             extracted_text = response.choices[0].message.content.strip()
+            if cache_key is not None:
+                self.cache.set(cache_key, extracted_text)
             return extracted_text
 
         except APIConnectionError as e:
             self.logger.error(f"API Connection Error: {e}")
-            return ""
         except RateLimitError as e:
             self.logger.error(f"Rate Limit Error: {e}")
-            return ""
         except APIStatusError as e:
             self.logger.error(f"API Status Error: {e}")
-            return ""
         except Exception as e:
             self.logger.error(f"Unexpected error during extraction: {e}")
-            return ""
+        self.record_failure()
+        return ""
 
     def parse(self):
         """
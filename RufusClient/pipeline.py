@@ -0,0 +1,124 @@
+import logging
+import queue
+import threading
+
+_DONE = object()  # End-of-stream marker, one per worker of the next stage
+
+
+class Stage:
+    """
+    One step of a PagePipeline: ``function`` applied to every item by ``workers`` threads.
+
+    The function returns the item for the next stage, or None to drop it
+    (a page that is a duplicate, irrelevant or failed).
+
+    Attributes:
+        name (str): Label used in logs and stats
+        function (callable): ``function(item)`` -> next item or None
+        workers (int): Threads running the stage
+    """
+
+    def __init__(self, name, function, workers=1):
+        self.name = name
+        self.function = function
+        self.workers = workers
+
+
+class PagePipeline:
+    """
+    Streams items from a producer through concurrent stages joined by bounded queues.
+
+    The producer (the crawl) runs in the calling thread and hands each item
+    to ``emit`` as soon as it has it, so the first page is being extracted
+    while later ones are still being fetched. Every queue holds at most
+    ``queue_size`` items: a stage that falls behind blocks the one before it,
+    back to the crawl itself, so memory stays bounded however large the site
+    is and end-to-end time approaches that of the slowest stage rather than
+    the sum of all of them.
+
+    An exception raised by a stage for one item is logged and the item
+    dropped; the other items still flow. An exception raised by the producer
+    stops the pipeline once the items already emitted have drained, and is
+    re-raised.
+
+    Attributes:
+        stages (list): Stage objects, in order
+        queue_size (int): Capacity of each queue between stages
+        outputs (list): What the last stage returned, in completion order
+        stats (dict): Stage name -> {"processed", "dropped", "failed", "max_queued"}
+    """
+
+    def __init__(self, stages, queue_size=16):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.outputs = []
+        self.stats = {stage.name: dict(processed=0, dropped=0, failed=0, max_queued=0) for stage in stages}
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    def run(self, produce):
+        """
+        Run ``produce(emit)`` and stream everything it emits through the stages.
+
+        Args:
+            produce (callable): Called with ``emit``; calls ``emit(item)`` for every item.
+                                ``emit`` blocks while the first queue is full.
+
+        Returns:
+            list: ``outputs``
+        """
+        self.outputs = []
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+        for index, stage in enumerate(self.stages):
+            downstream = queues[index + 1] if index + 1 < len(queues) else None
+            for number in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(stage, queues[index], downstream),
+                                          name=f"pipeline-{stage.name}-{number}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        def emit(item):
+            self._put(self.stages[0], queues[0], item)
+
+        try:
+            produce(emit)
+        finally:
+            # Close each stage once the one before it has finished, so nothing in flight is lost
+            start = 0
+            for index, stage in enumerate(self.stages):
+                for _ in range(stage.workers):
+                    queues[index].put(_DONE)
+                for thread in threads[start:start + stage.workers]:
+                    thread.join()
+                start += stage.workers
+        return self.outputs
+
+    def _put(self, stage, target, item):
+        target.put(item)
+        with self._lock:
+            stats = self.stats[stage.name]
+            stats["max_queued"] = max(stats["max_queued"], target.qsize())
+
+    def _work(self, stage, source, downstream):
+        stats = self.stats[stage.name]
+        while True:
+            item = source.get()
+            if item is _DONE:
+                return
+            try:
+                result = stage.function(item)
+            except Exception as e:
+                self.logger.error(f"Pipeline stage {stage.name} failed: {e}")
+                with self._lock:
+                    stats["failed"] += 1
+                continue
+            with self._lock:
+                stats["processed" if result is not None else "dropped"] += 1
+            if result is None:
+                continue
+            if downstream is not None:
+                self._put(self.stages[self.stages.index(stage) + 1], downstream, result)
+            else:
+                with self._lock:
+                    self.outputs.append(result)
@@ -0,0 +1,147 @@
+import numpy as np
+
+from .chunking import split_into_chunks
+from .keywords import WORD_PATTERN, extract_keywords, stem
+from .tokens import DEFAULT_MODEL, count_tokens, input_cost
+
+DEFAULT_PASSAGE_TOKENS = 200
+REPORT_KS = (1, 3, 5, 10)  # Passage counts compared by ``PassageRanking.cost_report``
+PASSAGE_SEPARATOR = "\n\n"
+
+
+class PassageRanking:
+    """
+    Local BM25 ranking of page passages against the user's prompt.
+
+    Every document (the reduced markdown of a page) is split into passages of
+    about ``passage_tokens`` tokens on structural boundaries. The passages of
+    all documents form one corpus, so term rarity (IDF) and the average passage
+    length are measured over the whole crawl, and all passages are scored in a
+    single vectorised NumPy pass over a term-frequency matrix that only has
+    columns for the prompt's terms. Words are compared by stem, like the
+    crawler's keyword matcher.
+
+    ``select`` then picks the best passages of one page within a passage count
+    and/or token budget, so only those are sent to the LLM.
+
+    Attributes:
+        terms (list): Stems of the prompt keywords, the columns of the matrix
+        passages (list): (document key, passage text, tokens) in corpus order
+        scores (numpy.ndarray): BM25 score of every passage
+        model (str): Model whose tokenizer measures passages and budgets
+    """
+
+    def __init__(self, query, documents, passage_tokens=DEFAULT_PASSAGE_TOKENS, k1=1.5, b=0.75,
+                 model=DEFAULT_MODEL):
+        """
+        Split the documents into passages and score them.
+
+        Args:
+            query (str): The user's prompt
+            documents (dict): Document key (e.g. the page URL) -> text
+            passage_tokens (int, optional): Token budget of one passage. Defaults to 200.
+            k1 (float, optional): BM25 term-frequency saturation. Defaults to 1.5.
+            b (float, optional): BM25 passage-length normalisation. Defaults to 0.75.
+            model (str, optional): Model whose tokenizer counts tokens
+        """
+        self.model = model
+        self.terms = list(dict.fromkeys(stem(keyword) for keyword in extract_keywords(query)))
+        self.passages = []
+        self._by_document = {}
+        for key, text in documents.items():
+            start = len(self.passages)
+            for passage in split_into_chunks(text or "", passage_tokens, model):
+                self.passages.append((key, passage, count_tokens(passage, model)))
+            self._by_document[key] = np.arange(start, len(self.passages))
+        self.scores = self._score(k1, b)
+
+    def _score(self, k1, b):
+        if not self.passages or not self.terms:
+            return np.zeros(len(self.passages))
+        columns = {term: column for column, term in enumerate(self.terms)}
+        lengths = np.zeros(len(self.passages))
+        rows, cols = [], []
+        for row, (_, passage, _) in enumerate(self.passages):
+            words = WORD_PATTERN.findall(passage)
+            lengths[row] = len(words)
+            for word in words:
+                column = columns.get(stem(word))
+                if column is not None:
+                    rows.append(row)
+                    cols.append(column)
+
+        # Sparse (row, column) occurrences folded into a dense passages x terms count matrix
+        count, width = len(self.passages), len(self.terms)
+        cells = np.asarray(rows, dtype=np.intp) * width + np.asarray(cols, dtype=np.intp)
+        frequencies = np.bincount(cells, minlength=count * width).reshape(count, width).astype(float)
+        document_frequency = np.count_nonzero(frequencies, axis=0)
+        idf = np.log1p((count - document_frequency + 0.5) / (document_frequency + 0.5))
+        norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+        return (idf * frequencies * (k1 + 1) / (frequencies + norm[:, None])).sum(axis=1)
+
+    def __contains__(self, key):
+        return key in self._by_document
+
+    def select(self, key, k=None, token_budget=None):
+        """
+        Best passages of one document, in document order.
+
+        Passages are taken by descending score; one that would overflow the
+        token budget is skipped in favour of smaller ones. Passages sharing no
+        term with the prompt are never selected, unless none does, in which
+        case the document's leading passages are used.
+
+        Args:
+            key: Document key
+            k (int, optional): Maximum number of passages; None for no limit
+            token_budget (int, optional): Maximum tokens of the selection; None for no limit
+
+        Returns:
+            list: Indices into ``passages``
+        """
+        indices = self._by_document[key]
+        relevant = indices[self.scores[indices] > 0]
+        if len(relevant):
+            candidates = relevant[np.argsort(-self.scores[relevant], kind="stable")]
+        else:
+            candidates = indices
+        chosen, used = [], 0
+        for index in candidates:
+            if k is not None and len(chosen) >= k:
+                break
+            tokens = self.passages[index][2] + (1 if chosen else 0)
+            if token_budget is not None and used + tokens > token_budget:
+                continue
+            chosen.append(int(index))
+            used += tokens
+        return sorted(chosen)
+
+    def select_text(self, key, k=None, token_budget=None):
+        """The text of ``select(key, k, token_budget)``, passages separated by blank lines."""
+        return PASSAGE_SEPARATOR.join(self.passages[index][1] for index in self.select(key, k, token_budget))
+
+    def cost_report(self, key, ks=REPORT_KS, token_budget=None):
+        """
+        Input tokens and cost of one document at several passage counts, for tuning ``k``.
+
+        Args:
+            key: Document key
+            ks (Iterable[int], optional): Passage counts to compare
+            token_budget (int, optional): Token budget applied at every count
+
+        Returns:
+            dict: k -> {"passages", "tokens", "cost"}, plus "all" for the whole document
+                  without ranking. Cost is in US dollars, None for a model without a known price.
+        """
+        report = {}
+        for k in (*ks, "all"):
+            if k == "all":
+                text = PASSAGE_SEPARATOR.join(self.passages[index][1] for index in self._by_document[key])
+                passages = len(self._by_document[key])
+            else:
+                selected = self.select(key, k, token_budget)
+                text = PASSAGE_SEPARATOR.join(self.passages[index][1] for index in selected)
+                passages = len(selected)
+            tokens = count_tokens(text, self.model)
+            report[k] = {"passages": passages, "tokens": tokens, "cost": input_cost(tokens, self.model)}
+        return report
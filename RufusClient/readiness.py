@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from collections import deque
+
+# Installed once per document: tracks structural DOM changes (added elements) and in-flight
+# fetch/XHR calls, then reports how long the page has been quiet. Attribute and text changes
+# are ignored, so carousels, clocks and CSS animations do not keep a loaded page "busy".
+PROBE_SCRIPT = """
+if (!window.__rufusProbe) {
+    const probe = window.__rufusProbe = {inflight: 0, lastChange: performance.now()};
+    const touch = () => { probe.lastChange = performance.now(); };
+    new MutationObserver(records => {
+        if (records.some(record => Array.from(record.addedNodes).some(node => node.nodeType === 1))) touch();
+    }).observe(document, {childList: true, subtree: true});
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function() {
+            probe.inflight++; touch();
+            return originalFetch.apply(this, arguments).finally(() => { probe.inflight--; touch(); });
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        probe.inflight++; touch();
+        this.addEventListener('loadend', () => { probe.inflight--; touch(); });
+        return originalSend.apply(this, arguments);
+    };
+}
+const probe = window.__rufusProbe;
+let lastResource = 0;
+for (const entry of performance.getEntriesByType('resource')) lastResource = Math.max(lastResource, entry.responseEnd);
+return {
+    readyState: document.readyState,
+    inflight: probe.inflight,
+    quietFor: performance.now() - Math.max(probe.lastChange, lastResource),
+    height: document.body ? document.body.scrollHeight : 0
+};
+"""
+
+# Scrolling counts as a change so the page gets a full quiet period to react to it
+SCROLL_SCRIPT = """
+window.scrollTo(0, document.body.scrollHeight);
+if (window.__rufusProbe) window.__rufusProbe.lastChange = performance.now();
+"""
+
+
+class PageReadiness:
+    """
+    Waits for a Selenium page to be ready using real signals instead of fixed sleeps.
+
+    A page is ready once the document has loaded, no fetch/XHR request is in
+    flight, and no element has been added nor network request finished for
+    ``quiet_period`` seconds. For infinite-scroll pages the engine keeps
+    scrolling to the bottom until the scroll height stops growing. Every wait
+    is bounded by a hard ``deadline``. The latest waits are kept in
+    ``records``; totals over every page are kept as plain counters, so a
+    long-lived instance does not grow with the pages it has seen.
+
+    Attributes:
+        deadline (float): Maximum seconds spent waiting on one page
+        quiet_period (float): Seconds without DOM/network activity that count as settled
+        max_scrolls (int): Upper bound on infinite-scroll steps
+        records (deque): One dict per page (url, waited, scrolls, timed_out) for the last ``max_records`` pages
+        pages, timeouts (int): Pages waited on, and how many of them hit the deadline
+        waited (float): Total seconds spent waiting, over all pages
+    """
+
+    def __init__(self, deadline=10.0, quiet_period=0.5, poll_interval=0.1, max_scrolls=10,
+                 clock=time.monotonic, sleep=time.sleep, max_records=1000):
+        self.deadline = deadline
+        self.quiet_period = quiet_period
+        self.poll_interval = poll_interval
+        self.max_scrolls = max_scrolls
+        self.clock = clock
+        self.sleep = sleep
+        self.records = deque(maxlen=max_records)
+        self.pages = 0
+        self.timeouts = 0
+        self.waited = 0.0
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    def wait(self, driver, url=None, scroll=True):
+        """
+        Block until the page loaded in ``driver`` is ready (or the deadline passes).
+
+        Args:
+            driver (WebDriver): Browser that has already navigated to the page
+            url (str, optional): URL used to label the record
+            scroll (bool, optional): Scroll to the bottom until no new content arrives. Defaults to True.
+
+        Returns:
+            dict: The record of this wait (url, waited, scrolls, timed_out)
+        """
+        start = self.clock()
+        deadline = start + self.deadline
+        state, timed_out = self._wait_quiet(driver, deadline)
+
+        scrolls = 0
+        if scroll:
+            height = state.get("height", 0)
+            while not timed_out and scrolls < self.max_scrolls:
+                driver.execute_script(SCROLL_SCRIPT)
+                scrolls += 1
+                state, timed_out = self._wait_quiet(driver, deadline)
+                if state.get("height", 0) <= height:
+                    break  # No new content arrived after the last scroll
+                height = state.get("height", 0)
+
+        record = {"url": url, "waited": self.clock() - start, "scrolls": scrolls, "timed_out": timed_out}
+        with self._lock:
+            self.records.append(record)
+            self.pages += 1
+            self.timeouts += timed_out
+            self.waited += record["waited"]
+        self.logger.info(f"Page ready after {record['waited']:.2f}s ({scrolls} scrolls"
+                         f"{', deadline hit' if timed_out else ''}): {url}")
+        return record
+
+    def total_wait(self):
+        with self._lock:
+            return self.waited
+
+    def is_ready(self, state):
+        return (state.get("readyState") == "complete"
+                and not state.get("inflight")
+                and state.get("quietFor", 0) >= self.quiet_period * 1000)
+
+    def _wait_quiet(self, driver, deadline):
+        while True:
+            state = driver.execute_script(PROBE_SCRIPT) or {}
+            if self.is_ready(state):
+                return state, False
+            if self.clock() >= deadline:
+                return state, True
+            self.sleep(self.poll_interval)
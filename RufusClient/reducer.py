@@ -0,0 +1,116 @@
+import re
+
+import html2text
+from lxml import etree, html as lxml_html
+
+# Elements that never carry content worth sending to the LLM
+NON_CONTENT_TAGS = ("script", "style", "noscript", "template", "svg", "canvas", "iframe", "object", "embed",
+                    "link", "meta", "head", "input", "select", "textarea")
+
+# Attributes that carry meaning (link targets, image text, table layout); all others are dropped
+SEMANTIC_ATTRIBUTES = frozenset({"href", "src", "alt", "title", "colspan", "rowspan", "datetime"})
+
+# lxml refuses str input that declares its own encoding
+XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+HIDDEN_XPATH = ('//*[@hidden or @aria-hidden="true" or '
+                'contains(translate(@style, " ", ""), "display:none") or '
+                'contains(translate(@style, " ", ""), "visibility:hidden")]')
+
+
+class HtmlReducer:
+    """
+    Shrinks a page to the part worth paying LLM input tokens for.
+
+    Pipeline (each step configurable):
+    1. drop non-content elements (scripts, styles, inline SVG, form fields, ...), comments and hidden elements;
+       the ``<title>`` text is kept as the first paragraph of the body
+    2. drop every attribute except the semantic ones, and inline ``data:`` URIs
+    3. convert to compact markdown (or keep the cleaned HTML)
+    4. strip trailing whitespace and collapse runs of blank lines
+
+    Attributes:
+        strip_tags (tuple): Elements removed with their content
+        keep_attributes (frozenset): Attributes kept on the remaining elements
+        markdown (bool): Convert to markdown instead of returning cleaned HTML
+        keep_links (bool): Keep link targets in the markdown
+        keep_hidden (bool): Keep elements marked hidden / display:none
+    """
+
+    def __init__(self, strip_tags=NON_CONTENT_TAGS, keep_attributes=SEMANTIC_ATTRIBUTES, markdown=True,
+                 keep_links=True, keep_hidden=False):
+        self.strip_tags = tuple(strip_tags)
+        self.keep_attributes = frozenset(keep_attributes)
+        self.markdown = markdown
+        self.keep_links = keep_links
+        self.keep_hidden = keep_hidden
+
+    def reduce(self, content):
+        """
+        Args:
+            content (str): Raw page HTML
+
+        Returns:
+            str: Reduced page content (markdown or HTML)
+        """
+        if not content or not content.strip():
+            return ""
+        try:
+            document = lxml_html.fromstring(XML_DECLARATION.sub("", content, count=1))
+        except (etree.ParserError, ValueError):
+            return collapse_whitespace(content)
+
+        title = document.findtext("head/title")
+        etree.strip_elements(document, etree.Comment, etree.ProcessingInstruction, *self.strip_tags,
+                             with_tail=False)
+        if not self.keep_hidden:
+            for element in document.xpath(HIDDEN_XPATH):
+                if element.getparent() is not None:
+                    element.drop_tree()
+        for element in document.iter():
+            if not isinstance(element.tag, str):
+                continue
+            for name, value in list(element.attrib.items()):
+                if name not in self.keep_attributes or value.startswith("data:"):
+                    del element.attrib[name]
+        for image in document.xpath("//img[not(@src)]"):
+            # Inline images lose their data: URI; their alt text is all that is left to say
+            if image.getparent() is None:
+                continue
+            image.tail = f"{image.get('alt', '')} {image.tail or ''}"
+            image.drop_tree()
+        if title and title.strip() and "head" in self.strip_tags:
+            self.keep_title(document, title.strip())
+
+        cleaned = lxml_html.tostring(document, encoding="unicode")
+        if self.markdown:
+            cleaned = self.to_markdown(cleaned)
+        return collapse_whitespace(cleaned)
+
+    @staticmethod
+    def keep_title(document, title):
+        # The title often names the product or page better than any heading, and costs a handful of tokens
+        body = document.find("body")
+        target = body if body is not None else document
+        paragraph = lxml_html.Element("p")
+        paragraph.text = title
+        paragraph.tail, target.text = target.text, None
+        target.insert(0, paragraph)
+
+    def to_markdown(self, cleaned_html):
+        converter = html2text.HTML2Text()
+        converter.body_width = 0  # No hard wrapping: line breaks cost tokens
+        converter.ignore_links = not self.keep_links
+        converter.images_to_alt = True
+        converter.ignore_emphasis = True
+        converter.unicode_snob = True
+        return converter.handle(cleaned_html)
+
+
+def collapse_whitespace(text):
+    """Strip trailing whitespace and collapse blank-line runs; leading indentation is markdown structure and stays."""
+    text = "\n".join(line.rstrip() for line in text.splitlines())
+    return re.sub(r"\n{3,}", "\n\n", text).strip("\n")
+
+
+DEFAULT_REDUCER = HtmlReducer()
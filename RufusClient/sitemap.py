@@ -0,0 +1,155 @@
+import gzip
+import io
+import logging
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+from lxml import etree
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def parse_lastmod(value):
+    """
+    Parse a sitemap <lastmod> (W3C datetime: "2024-05-01", "2024-05-01T10:00:00+02:00", ...).
+
+    Returns:
+        datetime: Timezone-aware datetime (UTC if the value has no offset), or None if unparseable
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def iter_sitemap(content):
+    """
+    Stream the entries of a sitemap or sitemap index without building the whole tree.
+
+    Gzipped sitemaps (``.xml.gz``) are decompressed on the fly. A truncated or
+    malformed document yields the entries read before the error.
+
+    Args:
+        content (bytes): Sitemap document as downloaded
+
+    Yields:
+        tuple: (kind, loc, lastmod) where kind is "url" for pages and "sitemap" for nested sitemaps
+    """
+    source = io.BytesIO(content)
+    if content[:2] == GZIP_MAGIC:
+        source = gzip.GzipFile(fileobj=source)
+    loc = lastmod = None
+    try:
+        for _, element in etree.iterparse(source, events=("end",), resolve_entities=False, no_network=True):
+            tag = etree.QName(element).localname if isinstance(element.tag, str) else None
+            if tag == "loc":
+                loc = (element.text or "").strip()
+            elif tag == "lastmod":
+                lastmod = parse_lastmod(element.text)
+            elif tag in ("url", "sitemap"):
+                if loc:
+                    yield tag, loc, lastmod
+                loc = lastmod = None
+                element.clear()  # Keep memory flat on sitemaps with tens of thousands of entries
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+    except (etree.XMLSyntaxError, OSError, EOFError) as e:
+        logging.getLogger(__name__).warning(f"Stopped reading a malformed sitemap: {e}")
+
+
+class SiteSeeder:
+    """
+    Reads robots.txt and sitemaps to seed a crawl frontier before any page is fetched.
+
+    robots.txt is downloaded once per host and provides the crawl-delay, the
+    disallow rules and the sitemap locations (falling back to /sitemap.xml).
+    Sitemap indexes are followed recursively, each sitemap fetched at most once.
+
+    Attributes:
+        http (HttpPool): Pool used for robots.txt and sitemap requests
+        user_agent (str): Agent name matched against robots.txt groups
+        max_sitemaps (int): Upper bound on sitemap documents fetched per host
+        max_urls (int): Upper bound on page entries yielded per host
+    """
+
+    def __init__(self, http, user_agent, max_sitemaps=50, max_urls=50_000, timeout=10):
+        self.http = http
+        self.user_agent = user_agent
+        self.max_sitemaps = max_sitemaps
+        self.max_urls = max_urls
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self._robots = {}
+
+    def robots(self, url):
+        """Parsed robots.txt of ``url``'s host, fetched on first use and cached."""
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        if host not in self._robots:
+            parser = RobotFileParser(f"{host}/robots.txt")
+            try:
+                response = self.http.get(parser.url, headers={"User-Agent": self.user_agent},
+                                         timeout=self.timeout, raise_for_status=False)
+                if response.status_code in (401, 403):
+                    parser.disallow_all = True
+                elif response.status_code >= 400:
+                    parser.allow_all = True
+                else:
+                    parser.parse(response.text.splitlines())
+            except requests.exceptions.RequestException as e:
+                self.logger.warning(f"Could not read {parser.url}: {e}")
+                parser.allow_all = True
+            self._robots[host] = parser
+        return self._robots[host]
+
+    def can_fetch(self, url):
+        return self.robots(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        """Seconds to wait between requests to ``url``'s host, or None."""
+        robots = self.robots(url)
+        delay = robots.crawl_delay(self.user_agent)
+        if delay is None and robots.request_rate(self.user_agent):
+            rate = robots.request_rate(self.user_agent)
+            delay = rate.seconds / rate.requests
+        return float(delay) if delay else None
+
+    def sitemap_urls(self, url):
+        """Sitemaps advertised in robots.txt, or the conventional /sitemap.xml."""
+        return self.robots(url).site_maps() or [urljoin(url, "/sitemap.xml")]
+
+    def entries(self, url):
+        """
+        Walk every sitemap of ``url``'s host, following nested indexes.
+
+        Yields:
+            tuple: (page_url, lastmod) with lastmod a datetime or None
+        """
+        pending = list(self.sitemap_urls(url))
+        fetched = set()
+        yielded = 0
+        while pending and len(fetched) < self.max_sitemaps:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in fetched:
+                continue
+            fetched.add(sitemap_url)
+            try:
+                response = self.http.get(sitemap_url, headers={"User-Agent": self.user_agent},
+                                         timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                self.logger.info(f"No sitemap at {sitemap_url}: {e}")
+                continue
+            for kind, loc, lastmod in iter_sitemap(response.content):
+                if kind == "sitemap":
+                    pending.append(loc)
+                    continue
+                yield loc, lastmod
+                yielded += 1
+                if yielded >= self.max_urls:
+                    return
+        self.logger.info(f"Read {len(fetched)} sitemap(s), {yielded} entries for {url}")
@@ -0,0 +1,111 @@
+import json
+import logging
+import os
+
+from .checkpoint import DEFAULT_CHECKPOINT_DIR, checkpoint_path
+
+STATE_VERSION = 1
+
+
+def synthesis_state_path(url, user_prompt, directory=DEFAULT_CHECKPOINT_DIR):
+    """Synthesis state file for one (start URL, prompt) run, next to the run's checkpoint."""
+    return os.path.splitext(checkpoint_path(url, user_prompt, directory))[0] + ".synthesis.json"
+
+
+class SynthesisState:
+    """
+    The last synthesized document of a run, with the provenance needed to update it.
+
+    Page extractions are synthesized in groups. The state keeps, for every
+    group, the sources (page URLs) it was built from and its partial document,
+    the content hash of every source, the merged partial documents of the
+    upper levels keyed by their inputs, and the final document. A later run
+    keeps the groups whose sources are all unchanged and re-synthesizes only
+    the sources that were added or changed, plus the surviving sources of
+    groups that lost a changed or removed page.
+
+    The state is rewritten atomically (temporary file, then rename), so a run
+    killed while saving leaves the previous state intact. A state written for
+    another prompt or model is ignored.
+
+    Attributes:
+        path (str): JSON file the state is kept in
+        sources (dict): Source -> content hash of its extraction
+        groups (list): {"sources": [...], "document": ...} in synthesis order
+        merges (dict): Input hash -> merged document, for the merge levels
+        document: Final document of the last run, or None
+    """
+
+    def __init__(self, path, user_prompt=None, model=None):
+        self.path = path
+        self.user_prompt = user_prompt
+        self.model = model
+        self.sources = {}
+        self.groups = []
+        self.merges = {}
+        self.document = None
+        self.logger = logging.getLogger(__name__)
+        self.load()
+
+    def load(self):
+        """Read the saved state, if there is one for this prompt and model."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable synthesis state {self.path}: {e}")
+            return
+        if (saved.get("version"), saved.get("prompt"), saved.get("model")) != \
+                (STATE_VERSION, self.user_prompt, self.model):
+            self.logger.info("Synthesis state was written for another prompt or model; starting over.")
+            return
+        self.sources = saved["sources"]
+        self.groups = saved["groups"]
+        self.merges = saved["merges"]
+        self.document = saved["document"]
+
+    def plan(self, hashes):
+        """
+        Compare the current extractions with the saved ones.
+
+        Args:
+            hashes (dict): Source -> content hash of its current extraction, in order
+
+        Returns:
+            tuple: (kept, dirty, removed): the saved groups that can be reused as they are,
+                   the sources to re-synthesize (in the order of ``hashes``) and the
+                   sources that are gone
+        """
+        changed = {source for source, digest in hashes.items() if self.sources.get(source) != digest}
+        removed = [source for source in self.sources if source not in hashes]
+        stale = changed.union(removed)
+        kept, dirty = [], set(changed)
+        for group in self.groups:
+            if stale.intersection(group["sources"]):
+                dirty.update(source for source in group["sources"] if source in hashes)
+            else:
+                kept.append(group)
+        return kept, [source for source in hashes if source in dirty], removed
+
+    def update(self, hashes, groups, merges, document):
+        """Replace the state with the result of a run and save it."""
+        covered = {source for group in groups for source in group["sources"]}
+        # Sources whose synthesis failed are left out, so the next run retries them
+        self.sources = {source: digest for source, digest in hashes.items() if source in covered}
+        self.groups = groups
+        self.merges = merges
+        self.document = document
+        self.save()
+
+    def save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        state = {"version": STATE_VERSION, "prompt": self.user_prompt, "model": self.model,
+                 "sources": self.sources, "groups": self.groups, "merges": self.merges,
+                 "document": self.document}
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temporary, self.path)
@@ -1,8 +1,20 @@
 import openai
 from openai import OpenAI, APIConnectionError, RateLimitError, APIStatusError
 import json
+import hashlib
 import logging
+import threading
 import time 
+from concurrent.futures import ThreadPoolExecutor
+
+from .checkpoint import content_hash
+from .chunking import split_into_chunks
+from .llm_cache import llm_cache_key
+from .dispatcher import PRIORITY_HIGH
+from .llm_clients import get_llm_client
+from .tokens import count_tokens
+
+SYSTEM_PROMPT = "You are a helpful assistant."
 
 class Synthesizer:
     """
@@ -14,34 +26,66 @@ class Synthesizer:
     - Structure information based on user prompts
     - Handle complex data transformation scenarios
 
+    Synthesis is a tree reduction, so crawls of any size fit the context
+    window: page extractions are packed into token-budgeted batches that are
+    structured concurrently, and the partial documents are merged the same
+    way, level by level, until one document remains. Latency grows with the
+    logarithm of the number of pages.
+
     Attributes:
         client (OpenAI): Configured OpenAI client for API interactions
         extracted_data (dict): Raw data extracted from web sources
         user_prompt (str): Original user query guiding synthesis
         model (str): Specific AI model used for synthesis
+        cache (LLMCache): Response cache consulted before calling the API, or None
+        dispatcher (LLMDispatcher): Rate-limit-aware scheduler the calls go through, or None
+        batch_tokens (int): Input token budget of each call
+        max_tokens (int): Output token limit of each call
+        levels (int): Levels of the last synthesis (1 when everything fit in one call)
+        calls (int): LLM calls made by the last synthesis (cache and state hits excluded)
+        report (dict): Sources reused, re-synthesized and removed by the last incremental synthesis
         logger (logging.Logger): Logging utility for tracking synthesis activities
     """
     
-    def __init__(self, extracted_data, user_prompt, api_key, model="chatgpt-4o-latest"):
+    def __init__(self, extracted_data, user_prompt, api_key, model="chatgpt-4o-latest", cache=None,
+                 dispatcher=None, batch_tokens=8000, max_tokens=4000, max_workers=4):
         """
         Initialize the Synthesizer with extraction results and configuration.
 
         Args:
-            extracted_data (dict): Collected data from web extraction
+            extracted_data (dict): Collected data from web extraction; the items of its
+                                   ``extracted_content`` list (one per page) are batched
             user_prompt (str): Original search query or topic
             api_key (str): OpenAI API authentication key
             model (str, optional): Specific AI model for synthesis. 
                                    Defaults to latest ChatGPT model.
+            cache (LLMCache, optional): Returns the stored synthesis when the same data was
+                                        already synthesized with the same prompt and model
+            dispatcher (LLMDispatcher, optional): Paces the calls under the provider's rate limits;
+                                                  they are queued ahead of page extractions
+            batch_tokens (int, optional): Input tokens of data per call. Defaults to 8000.
+            max_tokens (int, optional): Output tokens per call. Defaults to 4000.
+            max_workers (int, optional): Calls of one level made at the same time. Defaults to 4.
 
         Setup:
-        - Configures OpenAI client
+        - Uses the shared OpenAI client for this key, so calls reuse its connections
         - Initializes logging for tracking and debugging
         """
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_llm_client("openai", api_key)
         
         self.extracted_data = extracted_data
         self.user_prompt = user_prompt
         self.model = model
+        self.cache = cache
+        self.dispatcher = dispatcher
+        self.batch_tokens = batch_tokens
+        self.max_tokens = max_tokens
+        self.max_workers = max_workers
+        self.levels = 0
+        self.calls = 0
+        self.report = None
+        self.merges = {}  # Merge-level input hash -> document, for the last synthesis
+        self._calls_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
         logging.basicConfig(level=logging.INFO)
     
@@ -51,65 +95,328 @@ class Synthesizer:
 
         Advanced Synthesis Workflow:
         1. Validate input data
-        2. Prepare AI-guided synthesis prompt
-        3. Perform AI-powered data transformation
-        4. Handle JSON parsing and error scenarios
+        2. Pack the page extractions into token-budgeted batches
+        3. Structure every batch concurrently (map)
+        4. Merge the partial documents in batches, level by level, until one remains (reduce)
+        5. Handle JSON parsing and error scenarios
 
         Returns:
             dict: Structured and synthesized data
                   - Structured JSON if successful parsing
                   - Raw output if JSON parsing fails
-                  - Empty dict if no data or max retries reached
+                  - Empty dict if no data or every call failed
 
         Key Features:
         - Exponential backoff for rate limit handling
-        - Robust error management
-        - Flexible output formatting
+        - Identical calls are answered from the response cache, if one is set
+        - A failed batch is left out; the rest are still merged
         """
+        self.levels = self.calls = 0
         if not self.extracted_data:
             self.logger.warning("No data extracted to synthesize.")
             return {}
 
+        items = self.leaf_items()
+        if not items:
+            self.logger.warning("No data extracted to synthesize.")
+            return {}
+        return self.reduce(items) or {}
+
+    def synthesize_incremental(self, extractions, state):
+        """
+        Update the document of a previous run instead of synthesizing from scratch.
+
+        Groups of the previous run whose sources are all unchanged keep their
+        partial documents. Only added and changed extractions, plus the other
+        sources of groups that contained a changed or removed one, are
+        structured again; the merge levels are then recomputed, reusing every
+        merge whose inputs did not change. A re-crawl of a mostly static site
+        costs a few calls instead of a full synthesis, and none if nothing changed.
+
+        Args:
+            extractions (dict): Source (page URL) -> extracted text, in crawl order
+            state (SynthesisState): The previous run's state; updated and saved
+
+        Returns:
+            dict: Structured and synthesized data, like ``synthesize``
+        """
+        self.levels = self.calls = 0
+        self.merges = {}
+        hashes = {source: content_hash(text) for source, text in extractions.items() if text}
+        groups, dirty, removed = state.plan(hashes)
+
+        units = [(source, part) for source in dirty for part in self.split_item(extractions[source])]
+        batches = self.pack(units, measure=lambda unit: unit[1]) if units else []
+        if batches:
+            self.levels += 1
+            self.logger.info(f"Synthesis level {self.levels}: re-synthesizing {len(dirty)} of {len(hashes)} "
+                             f"source(s) in {len(batches)} call(s).")
+            documents = self.map([[part for _, part in batch] for batch in batches], merging=False)
+            for batch, document in zip(batches, documents):
+                if document:
+                    groups.append({"sources": list(dict.fromkeys(source for source, _ in batch)),
+                                   "document": document})
+        self.report = {"sources": len(hashes), "reused": len(hashes) - len(dirty),
+                       "resynthesized": len(dirty), "removed": len(removed)}
+
+        if groups:
+            document = self.reduce([group["document"] for group in groups], merging=True, memo=state.merges) or {}
+        else:
+            document = {}
+        self.report["calls"] = self.calls
+        self.logger.info(f"Incremental synthesis: {self.report}.")
+        state.update(hashes, groups, self.merges, document)
+        return document
+
+    def stream(self):
+        """
+        Start a synthesis fed one extraction at a time, for pipelines that extract while crawling.
+
+        Returns:
+            SynthesisStream: Call ``add(extraction)`` for every page, then ``finish()``
+        """
+        self.levels = self.calls = 0
+        return SynthesisStream(self)
+
+    def reduce(self, items, merging=False, memo=None):
+        """
+        Tree reduction: structure (or merge) items in batches, level by level, until one document remains.
+
+        Args:
+            items (list): Page extractions, or partial documents when ``merging``
+            merging (bool, optional): Whether the items are already structured documents
+            memo (dict, optional): Merged documents of a previous run by input hash; a merge
+                                   whose inputs are in it is not called again
+
+        Returns:
+            The final document, or None if every call failed
+        """
+        while True:
+            if merging and len(items) == 1:
+                return items[0]
+            self.levels += 1
+            batches = self.pack(items)
+            self.logger.info(f"Synthesis level {self.levels}: {len(items)} item(s) in {len(batches)} call(s).")
+            if len(batches) == 1:
+                return self.call(batches[0], merging, memo)
+            documents = self.map(batches, merging, memo)
+            items, merging = [document for document in documents if document], True
+            if not items:
+                self.logger.error("Every synthesis call failed.")
+                return None
+
+    def map(self, batches, merging, memo=None):
+        """Run the calls of one level concurrently; results are in batch order."""
+        if len(batches) == 1:
+            return [self.call(batches[0], merging, memo)]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            return list(executor.map(lambda batch: self.call(batch, merging, memo), batches))
+
+    def leaf_items(self):
+        """
+        The units of data the first level batches: one per page extraction.
+
+        Returns:
+            list: Items of ``extracted_content`` (or of a list), else the data as a single item;
+                  text items longer than a batch are split into parts
+        """
+        data = self.extracted_data
+        if isinstance(data, dict) and isinstance(data.get("extracted_content"), list):
+            data = data["extracted_content"]
+        return [part for item in (data if isinstance(data, list) else [data]) if item
+                for part in self.split_item(item)]
+
+    def split_item(self, item):
+        """Split a text item longer than one batch into parts on structural boundaries."""
+        if isinstance(item, str) and count_tokens(item, self.model) > self.batch_tokens:
+            return split_into_chunks(item, self.batch_tokens, self.model)
+        return [item]
+
+    def pack(self, items, measure=None):
+        """
+        Group items, in order, into batches of at most ``batch_tokens`` tokens.
+
+        An item larger than the budget gets a batch of its own. If no two items
+        fit together, they are paired anyway, so every level shrinks the number
+        of documents and the reduction terminates.
+
+        Args:
+            items (list): Items to group
+            measure (callable, optional): Maps an item to the data it contributes to the prompt
+
+        Returns:
+            list: Lists of items
+        """
+        batches, size = [], 0
+        for item in items:
+            data = measure(item) if measure is not None else item
+            tokens = count_tokens(json.dumps(data, ensure_ascii=False), self.model)
+            if batches and size + tokens <= self.batch_tokens:
+                batches[-1].append(item)
+                size += tokens
+            else:
+                batches.append([item])
+                size = tokens
+        if 1 < len(items) == len(batches):
+            batches = [items[i:i + 2] for i in range(0, len(items), 2)]
+        return batches
+
+    def request(self, batch, merging):
+        """
+        Chat completion request that structures one batch of page extractions,
+        or merges one batch of partial documents.
+
+        Returns:
+            dict: Request body (model, messages, sampling settings)
+        """
+        data = json.dumps(batch if len(batch) > 1 or merging else batch[0], ensure_ascii=False)
+        if merging:
+            instruction = (f"Merge the following partial JSON documents, built from different pages for the "
+                           f"prompt '{self.user_prompt}', into one JSON document with the same structure. "
+                           f"Combine matching entries and drop duplicates. Respond with JSON only.")
+        else:
+            instruction = (f"Organize the following data in a structured JSON format based on the prompt "
+                           f"'{self.user_prompt}'. Respond with JSON only.")
         messages = [
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": f"Organize the following data in structered format based on the prompt'{self.user_prompt}': {json.dumps(self.extracted_data)}"}
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"{instruction}\n\n{data}"}
         ]
+        return dict(model=self.model, messages=messages, max_tokens=self.max_tokens, temperature=0.3, n=1)
 
-        retries = 3
-        for attempt in range(retries):
-            try:
-                response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages, 
-                max_tokens=500,
-                temperature=0.3,
-                n=1
-            )
-                self.logger.info(f"API Request: {messages}")
-                self.logger.info(f"API Response: {response}")
+    def call(self, batch, merging=False, memo=None):
+        """
+        Structure or merge one batch.
 
-                synthesized_text = response.choices[0].message.content.strip()
+        Args:
+            batch (list): Page extractions, or partial documents when ``merging``
+            merging (bool, optional): Whether the batch is merged rather than structured
+            memo (dict, optional): Previous merge results by input hash, see ``reduce``
 
-                
-                try:
-                    synthesized_text = synthesized_text.replace('\n', ' ').strip()
+        Returns:
+            dict: The parsed JSON document, ``{"raw_output": text}`` if the answer
+                  is not JSON, or None if the call failed
+        """
+        memo_key = None
+        if merging and memo is not None:
+            canonical = json.dumps(batch, sort_keys=True, ensure_ascii=False)
+            memo_key = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+            if memo_key in memo:
+                self.merges[memo_key] = memo[memo_key]
+                return memo[memo_key]
+        document = self.complete(batch, merging)
+        if memo_key is not None and document is not None:
+            self.merges[memo_key] = document
+        return document
+
+    def complete(self, batch, merging):
+        """Make the call for one batch (or answer it from the response cache) and parse the answer."""
+        request = self.request(batch, merging)
+        cache_key = synthesized_text = None
+        if self.cache is not None:
+            cache_key = llm_cache_key("openai", self.model, SYSTEM_PROMPT, self.user_prompt,
+                                      request["messages"][-1]["content"], temperature=0.3,
+                                      max_tokens=self.max_tokens)
+            synthesized_text = self.cache.get(cache_key)
 
-                    structured_data = json.loads(synthesized_text)
-                    return structured_data
-                except json.JSONDecodeError as e:
-                    self.log_json_error(synthesized_text, e)
-                    return {"raw_output": synthesized_text} 
+        retries = 3
+        for attempt in range(retries):
+            try:
+                if synthesized_text is None:
+                    with self._calls_lock:
+                        self.calls += 1
+                    if self.dispatcher is not None:
+                        response = self.dispatcher.chat(self.client, priority=PRIORITY_HIGH, **request)
+                    else:
+                        response = self.client.chat.completions.create(**request)
+                    self.logger.debug(f"API Response: {response}")
 
+                    synthesized_text = response.choices[0].message.content.strip()
+                    if cache_key is not None:
+                        self.cache.set(cache_key, synthesized_text)
+                return self.parse_document(synthesized_text)
 
             except RateLimitError as e:
                 self.logger.warning(f"Rate limit reached. Attempt {attempt + 1} of {retries}.")
-                time.sleep(2 ** attempt)  
+                time.sleep(2 ** attempt)
+            except (APIConnectionError, APIStatusError) as e:
+                self.logger.error(f"Synthesis call failed: {e}")
+                return None
 
         self.logger.error("Max retries reached. Unable to synthesize.")
-        return {}
-    
+        return None
+
+    def parse_document(self, synthesized_text):
+        """Parse a model answer as JSON, tolerating a markdown code fence around it."""
+        text = synthesized_text.strip()
+        if text.startswith("```"):
+            text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+        try:
+            return json.loads(text.replace("\n", " ").strip())
+        except json.JSONDecodeError as e:
+            self.log_json_error(synthesized_text, e)
+            return {"raw_output": synthesized_text}
+
     def log_json_error(self, synthesized_text, error):
         self.logger.error("Failed to parse synthesized text into JSON.")
         self.logger.error(f"JSONDecodeError: {error}")  
         self.logger.error(f"Synthesized Text: {synthesized_text}")  
         self.logger.error("Please check the format of the synthesized text for any issues.")
+
+
+class SynthesisStream:
+    """
+    Tree-reduce synthesis whose first level runs while extractions are still arriving.
+
+    Extractions are packed into batches as they come; each batch that fills
+    up is structured right away in the background, so when the last page is
+    extracted only the last batch and the merge levels remain. Items are
+    synthesized in arrival order. A stream that never fills a batch makes the
+    same single call as ``Synthesizer.synthesize``.
+    """
+
+    def __init__(self, synthesizer):
+        self.synthesizer = synthesizer
+        self.batch = []
+        self.size = 0
+        self.futures = []
+        self.executor = ThreadPoolExecutor(max_workers=synthesizer.max_workers, thread_name_prefix="synthesis")
+        self._lock = threading.Lock()
+
+    def add(self, item):
+        """Queue one extraction; starts structuring a batch once it is full."""
+        synthesizer = self.synthesizer
+        for part in synthesizer.split_item(item) if item else []:
+            tokens = count_tokens(json.dumps(part, ensure_ascii=False), synthesizer.model)
+            with self._lock:
+                if self.batch and self.size + tokens > synthesizer.batch_tokens:
+                    self._flush()
+                self.batch.append(part)
+                self.size += tokens
+
+    def _flush(self):
+        self.futures.append(self.executor.submit(self.synthesizer.call, self.batch, False))
+        self.batch, self.size = [], 0
+
+    def finish(self):
+        """
+        Structure what is left and merge every batch's document.
+
+        Returns:
+            dict: Structured and synthesized data, like ``Synthesizer.synthesize``
+        """
+        synthesizer = self.synthesizer
+        with self._lock:
+            if self.batch:
+                self._flush()
+        documents = [future.result() for future in self.futures]
+        self.executor.shutdown()
+        if not documents:
+            synthesizer.logger.warning("No data extracted to synthesize.")
+            return {}
+        synthesizer.levels = 1
+        synthesizer.logger.info(f"Synthesis level 1: {len(documents)} call(s) made while extracting.")
+        documents = [document for document in documents if document]
+        if not documents:
+            synthesizer.logger.error("Every synthesis call failed.")
+            return {}
+        return synthesizer.reduce(documents, merging=True) or {}
@@ -0,0 +1,51 @@
+import logging
+import math
+from functools import lru_cache
+
+import tiktoken
+
+DEFAULT_MODEL = "chatgpt-4o-latest"
+FALLBACK_ENCODING = "o200k_base"
+CHARS_PER_TOKEN = 4  # Rough average for English text, used only when no encoding can be loaded
+
+
+@lru_cache(maxsize=None)
+def get_encoder(model=DEFAULT_MODEL):
+    """
+    Return the tiktoken encoder for ``model``, loaded once per process.
+
+    Unknown models use o200k_base. Returns None if the encoding files cannot be
+    loaded (tiktoken downloads them on first use), in which case counts are estimated.
+    """
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"No tiktoken encoding for {model} ({e}); estimating token counts.")
+        return None
+
+
+def count_tokens(text, model=DEFAULT_MODEL):
+    """Number of tokens ``text`` costs as ``model`` input (estimated if no encoder is available)."""
+    if not text:
+        return 0
+    encoder = get_encoder(model)
+    if encoder is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+# US dollars per million input tokens
+INPUT_PRICES = {
+    "chatgpt-4o-latest": 5.00,
+    "gpt-4o": 2.50,
+    "gpt-4o-mini": 0.15,
+}
+
+
+def input_cost(tokens, model=DEFAULT_MODEL):
+    """Price in US dollars of ``tokens`` input tokens for ``model``, or None if its price is unknown."""
+    price = INPUT_PRICES.get(model)
+    return None if price is None else tokens * price / 1_000_000
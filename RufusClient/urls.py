@@ -0,0 +1,149 @@
+import hashlib
+import math
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit
+
+# Query parameters that identify a visit rather than a page
+DEFAULT_TRACKING_PARAMS = frozenset({
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ref_src", "phpsessid", "jsessionid",
+})
+DEFAULT_TRACKING_PREFIXES = ("utm_",)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url, drop_params=DEFAULT_TRACKING_PARAMS, drop_prefixes=DEFAULT_TRACKING_PREFIXES):
+    """
+    Reduce the different spellings of a page's URL to one canonical form.
+
+    - lowercases the scheme and host and removes default ports
+    - removes the fragment and a trailing slash (except for the root path)
+    - drops tracking/session query parameters (case-insensitive) and sorts the rest
+
+    Paths and query values keep their case, since servers may treat them as distinct.
+
+    Args:
+        url (str): Absolute URL
+        drop_params (Iterable[str], optional): Parameter names to remove
+        drop_prefixes (tuple, optional): Parameter name prefixes to remove (e.g. "utm_")
+
+    Returns:
+        str: Canonical URL
+    """
+    scheme, netloc, path, query, _ = urlsplit(url.strip())
+    scheme = scheme.lower()
+    userinfo, at, host = netloc.rpartition("@")
+    host = host.lower()
+    default_port = DEFAULT_PORTS.get(scheme)
+    if default_port and host.endswith(f":{default_port}"):
+        host = host[:-len(str(default_port)) - 1]
+    netloc = userinfo + at + host
+
+    if not path:
+        path = "/"
+    elif len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+
+    if query:
+        drop_params = _lowercased(frozenset(drop_params))
+        drop_prefixes = tuple(drop_prefixes)
+        kept = []
+        for pair in query.split("&"):
+            name = pair.partition("=")[0].lower()
+            if pair and name not in drop_params and not name.startswith(drop_prefixes):
+                kept.append(pair)
+        query = "&".join(sorted(kept))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+@lru_cache(maxsize=32)
+def _lowercased(names):
+    return frozenset(name.lower() for name in names)
+
+
+def url_fingerprint(url, canonicalize=canonicalize_url):
+    """64-bit fingerprint of the canonical form of ``url``."""
+    digest = hashlib.blake2b(canonicalize(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class FingerprintSet:
+    """
+    Exact seen-set that stores 64-bit fingerprints of canonical URLs instead of the URL strings.
+
+    URLs that canonicalise to the same form are the same member. Collisions are
+    possible in principle (about 1 in 2**64 per pair) and negligible in practice.
+    """
+
+    def __init__(self, canonicalize=canonicalize_url):
+        self.canonicalize = canonicalize
+        self._fingerprints = set()
+
+    def add(self, url):
+        """Add ``url``; return True if it was not already present."""
+        fingerprint = url_fingerprint(url, self.canonicalize)
+        if fingerprint in self._fingerprints:
+            return False
+        self._fingerprints.add(fingerprint)
+        return True
+
+    def __contains__(self, url):
+        return url_fingerprint(url, self.canonicalize) in self._fingerprints
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+
+class BloomFilter:
+    """
+    Probabilistic seen-set for very large crawls with a fixed memory footprint.
+
+    Never reports a seen URL as unseen. It may report an unseen URL as seen
+    with probability about ``error_rate`` while holding up to ``capacity`` URLs;
+    for a crawler that means a few pages are skipped, never fetched twice.
+
+    Attributes:
+        capacity (int): Expected number of distinct URLs
+        error_rate (float): Target false-positive probability at capacity
+        num_bits (int): Size of the bit array
+        num_hashes (int): Bits set per URL
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=1e-4, canonicalize=canonicalize_url):
+        self.canonicalize = canonicalize
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, url):
+        # Kirsch-Mitzenmacher double hashing from one 128-bit digest
+        digest = hashlib.blake2b(self.canonicalize(url).encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * second) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, url):
+        """Add ``url``; return True if it was (probably) not already present."""
+        new = False
+        for position in self._positions(url):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self._count += 1
+        return new
+
+    def __contains__(self, url):
+        for position in self._positions(url):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self):
+        return self._count
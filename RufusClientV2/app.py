@@ -7,11 +7,13 @@ import json
 from datetime import datetime
 from scraper import (
     fetch_html_selenium,
+    fetch_html_static,
     save_raw_data,
     format_data,
     save_formatted_data,
     calculate_price,
     html_to_markdown_with_readability,
+    html_to_markdown_many,
     create_dynamic_listing_model,
     create_listings_container_model,
     scrape_url,
@@ -91,6 +93,15 @@ else:
     # Inform the user
     st.sidebar.info("Pagination and Attended Mode are disabled when multiple URLs are entered.")
 
+# Static fetch skips the browser for pages that do not need JavaScript
+static_fetch = st.sidebar.toggle("Static Fetch (no browser)", disabled=attended_mode)
+
+# Repeat runs on unchanged pages are answered from the LLM response cache at no token cost
+use_llm_cache = st.sidebar.toggle("Use LLM Response Cache", value=True)
+
+# Many-URL runs can convert their pages to markdown in parallel worker processes
+use_html_workers = st.sidebar.toggle("Convert Pages in Worker Processes")
+
 st.sidebar.markdown("---")
 
 
@@ -109,6 +120,9 @@ if st.sidebar.button("LAUNCH SCRAPER", type="primary"):
         st.session_state['attended_mode'] = attended_mode
         st.session_state['use_pagination'] = use_pagination
         st.session_state['pagination_details'] = pagination_details
+        st.session_state['static_fetch'] = static_fetch
+        st.session_state['use_llm_cache'] = use_llm_cache
+        st.session_state['use_html_workers'] = use_html_workers
         st.session_state['scraping_state'] = 'waiting' if attended_mode else 'scraping'
 
 # Scraping logic
@@ -152,7 +166,8 @@ elif st.session_state['scraping_state'] == 'scraping':
             # Detect pagination if enabled
             if st.session_state['use_pagination']:
                 pagination_data, token_counts, pagination_price = detect_pagination_elements(
-                    current_url, st.session_state['pagination_details'], st.session_state['model_selection'], markdown
+                    current_url, st.session_state['pagination_details'], st.session_state['model_selection'], markdown,
+                    use_cache=st.session_state['use_llm_cache']
                 )
                 # Check if pagination_data is a dict or a model with 'page_urls' attribute
                 if isinstance(pagination_data, dict):
@@ -172,7 +187,8 @@ elif st.session_state['scraping_state'] == 'scraping':
                 DynamicListingsContainer = create_listings_container_model(DynamicListingModel)
                 # Format data
                 formatted_data, token_counts = format_data(
-                    markdown, DynamicListingsContainer, DynamicListingModel, st.session_state['model_selection']
+                    markdown, DynamicListingsContainer, DynamicListingModel, st.session_state['model_selection'],
+                    use_cache=st.session_state['use_llm_cache']
                 )
                 input_tokens, output_tokens, cost = calculate_price(token_counts, st.session_state['model_selection'])
                 total_input_tokens += input_tokens
@@ -183,16 +199,21 @@ elif st.session_state['scraping_state'] == 'scraping':
                 all_data.append(formatted_data)
         else:
             # Non-attended mode or driver not available
-            for i, url in enumerate(st.session_state['urls'], start=1):
-                # Fetch HTML
-                raw_html = fetch_html_selenium(url, attended_mode=False)
-                markdown = html_to_markdown_with_readability(raw_html)
+            # Fetch HTML
+            if st.session_state.get('static_fetch'):
+                raw_htmls = [fetch_html_static(url) for url in st.session_state['urls']]
+            else:
+                raw_htmls = [fetch_html_selenium(url, attended_mode=False) for url in st.session_state['urls']]
+            # Convert all pages together, in the HTML worker processes if enabled
+            markdowns = html_to_markdown_many(raw_htmls, use_workers=st.session_state.get('use_html_workers', False))
+            for i, (url, markdown) in enumerate(zip(st.session_state['urls'], markdowns), start=1):
                 save_raw_data(markdown, output_folder, f'rawData_{i}.md')
 
                 # Detect pagination if enabled and only for the first URL
                 if st.session_state['use_pagination'] and i == 1:
                     pagination_data, token_counts, pagination_price = detect_pagination_elements(
-                        url, st.session_state['pagination_details'], st.session_state['model_selection'], markdown
+                        url, st.session_state['pagination_details'], st.session_state['model_selection'], markdown,
+                        use_cache=st.session_state['use_llm_cache']
                     )
                     # Check if pagination_data is a dict or a model with 'page_urls' attribute
                     if isinstance(pagination_data, dict):
@@ -212,7 +233,8 @@ elif st.session_state['scraping_state'] == 'scraping':
                     DynamicListingsContainer = create_listings_container_model(DynamicListingModel)
                     # Format data
                     formatted_data, token_counts = format_data(
-                        markdown, DynamicListingsContainer, DynamicListingModel, st.session_state['model_selection']
+                        markdown, DynamicListingsContainer, DynamicListingModel, st.session_state['model_selection'],
+                        use_cache=st.session_state['use_llm_cache']
                     )
                     input_tokens, output_tokens, cost = calculate_price(token_counts, st.session_state['model_selection'])
                     total_input_tokens += input_tokens
@@ -87,6 +87,18 @@ PRICING = {
     # Add other models and their prices here if needed
 }
 
+# Batch API jobs are billed at half the prices above
+BATCH_PRICE_FACTOR = 0.5
+
+# API provider behind each model, part of the LLM response cache key
+MODEL_PROVIDERS = {
+    "gpt-4o-mini": "openai",
+    "gpt-4o-2024-08-06": "openai",
+    "gemini-1.5-flash": "gemini",
+    "Llama3.1 8B": "lm-studio",
+    "Groq Llama3.1 70b": "groq",
+}
+
 # Timeout settings for web scraping
 TIMEOUT_SETTINGS = {
     "page_load": 30,
@@ -0,0 +1,49 @@
+"""
+HTML to markdown conversion for scraped pages.
+
+Kept apart from scraper.py, which imports Streamlit, Selenium and the LLM
+SDKs, so the HTML worker processes can import these functions cheaply.
+"""
+import html2text
+from bs4 import BeautifulSoup
+
+# Below this many pages, starting worker processes costs more than it saves
+MIN_POOL_PAGES = 4
+
+
+def clean_html(html_content):
+    soup = BeautifulSoup(html_content, 'html.parser')
+    
+    # Remove headers and footers based on common HTML tags or classes
+    for element in soup.find_all(['header', 'footer']):
+        element.decompose()  # Remove these tags and their content
+
+    return str(soup)
+
+
+def html_to_markdown_with_readability(html_content):
+
+    
+    cleaned_html = clean_html(html_content)  
+    
+    # Convert to markdown
+    markdown_converter = html2text.HTML2Text()
+    markdown_converter.ignore_links = False
+    markdown_content = markdown_converter.handle(cleaned_html)
+    
+    return markdown_content
+
+
+def html_to_markdown_many(html_contents, use_workers=False):
+    """
+    Convert several pages to markdown, in input order.
+
+    With ``use_workers`` and at least MIN_POOL_PAGES pages, the conversions run
+    across the RufusClient HTML worker processes; otherwise they run here.
+    """
+    html_contents = list(html_contents)
+    if not use_workers or len(html_contents) < MIN_POOL_PAGES:
+        return [html_to_markdown_with_readability(html_content) for html_content in html_contents]
+    # Imported here, not through shared.py, so neither this module nor the workers load Selenium or the LLM SDKs
+    from RufusClient.html_workers import get_html_workers
+    return get_html_workers().map_pages(html_to_markdown_with_readability, html_contents)
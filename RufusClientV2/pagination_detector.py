@@ -5,16 +5,12 @@ import json
 from typing import List, Dict, Tuple, Union
 from pydantic import BaseModel, Field, ValidationError
 
-import tiktoken
 from dotenv import load_dotenv
 
-from openai import OpenAI
-import google.generativeai as genai
-from groq import Groq
-
 
 from api_management import get_api_key
-from assets import PROMPT_PAGINATION, PRICING, LLAMA_MODEL_FULLNAME, GROQ_LLAMA_MODEL_FULLNAME
+from shared import get_encoder, get_llm_client, get_llm_cache, llm_cache_key, dispatch_call, is_retryable, count_tokens
+from assets import PROMPT_PAGINATION, PRICING, LLAMA_MODEL_FULLNAME, GROQ_LLAMA_MODEL_FULLNAME, MODEL_PROVIDERS
 
 load_dotenv()
 import logging
@@ -41,7 +37,40 @@ def calculate_pagination_price(token_counts: Dict[str, int], model: str) -> floa
     
     return input_price + output_price
 
-def detect_pagination_elements(url: str, indications: str, selected_model: str, markdown_content: str) -> Tuple[Union[PaginationData, Dict, str], Dict, float]:
+def detect_pagination_elements(url: str, indications: str, selected_model: str, markdown_content: str,
+                               use_cache: bool = True) -> Tuple[Union[PaginationData, Dict, str], Dict, float]:
+    """
+    Extract pagination elements, answering repeat requests from the LLM response cache.
+
+    A cached answer costs no tokens, so its token counts and price are zero. With
+    ``use_cache=False`` the model is always called (the fresh answer is still stored).
+    Calls go through the provider's dispatcher, which keeps them under its rate
+    limits and retries throttled ones; calls to a local model run directly.
+    """
+    provider = MODEL_PROVIDERS.get(selected_model)
+    cache = get_llm_cache()
+    cache_key = llm_cache_key(provider, selected_model, PROMPT_PAGINATION,
+                              f"{url}\n{indications}", markdown_content, schema=PaginationData)
+    cached = cache.get(cache_key, bypass=not use_cache)
+    if cached is not None:
+        pagination_data = PaginationData.model_validate(cached["data"]) if cached["parsed"] else cached["data"]
+        return pagination_data, {"input_tokens": 0, "output_tokens": 0}, 0.0
+
+    try:
+        pagination_data, token_counts, pagination_price = dispatch_call(
+            provider, lambda: request_pagination_elements(url, indications, selected_model, markdown_content),
+            tokens=count_tokens(PROMPT_PAGINATION + markdown_content, selected_model))
+    except Exception as e:
+        logging.error(f"An error occurred in detect_pagination_elements: {e}")
+        return PaginationData(page_urls=[]), {"input_tokens": 0, "output_tokens": 0}, 0.0
+    # Failed calls come back as an empty default with no tokens used; only real answers are kept
+    if token_counts.get("input_tokens"):
+        parsed = isinstance(pagination_data, PaginationData)
+        cache.set(cache_key, {"parsed": parsed,
+                              "data": pagination_data.model_dump() if parsed else pagination_data})
+    return pagination_data, token_counts, pagination_price
+
+def request_pagination_elements(url: str, indications: str, selected_model: str, markdown_content: str) -> Tuple[Union[PaginationData, Dict, str], Dict, float]:
     try:
         """
         Uses AI models to analyze markdown content and extract pagination elements.
@@ -61,7 +90,7 @@ def detect_pagination_elements(url: str, indications: str, selected_model: str,
 
         if selected_model in ["gpt-4o-mini", "gpt-4o-2024-08-06"]:
             # Use OpenAI API
-            client = OpenAI(api_key=get_api_key('OPENAI_API_KEY'))
+            client = get_llm_client("openai", get_api_key('OPENAI_API_KEY'))
             completion = client.beta.chat.completions.parse(
                 model=selected_model,
                 messages=[
@@ -75,7 +104,7 @@ def detect_pagination_elements(url: str, indications: str, selected_model: str,
             parsed_response = completion.choices[0].message.parsed
 
             # Calculate tokens using tiktoken
-            encoder = tiktoken.encoding_for_model(selected_model)
+            encoder = get_encoder(selected_model)
             input_token_count = len(encoder.encode(markdown_content))
             output_token_count = len(encoder.encode(json.dumps(parsed_response.dict())))
             token_counts = {
@@ -90,7 +119,7 @@ def detect_pagination_elements(url: str, indications: str, selected_model: str,
 
         elif selected_model == "gemini-1.5-flash":
             # Use Google Gemini API
-            genai.configure(api_key=get_api_key("GOOGLE_API_KEY"))
+            genai = get_llm_client("gemini", get_api_key("GOOGLE_API_KEY"))
             model = genai.GenerativeModel(
                 'gemini-1.5-flash',
                 generation_config={
@@ -133,9 +162,8 @@ def detect_pagination_elements(url: str, indications: str, selected_model: str,
 
         elif selected_model == "Llama3.1 8B":
             # Use Llama model via OpenAI API pointing to local server
-            openai.api_key = "lm-studio"
-            openai.api_base = "http://localhost:1234/v1"
-            response = openai.ChatCompletion.create(
+            client = get_llm_client("openai", "lm-studio", base_url="http://localhost:1234/v1")
+            response = client.chat.completions.create(
                 model=LLAMA_MODEL_FULLNAME,
                 messages=[
                     {"role": "system", "content": prompt_pagination},
@@ -143,7 +171,7 @@ def detect_pagination_elements(url: str, indications: str, selected_model: str,
                 ],
                 temperature=0.7,
             )
-            response_content = response['choices'][0]['message']['content'].strip()
+            response_content = response.choices[0].message.content.strip()
             # Try to parse the JSON
             try:
                 pagination_data = json.loads(response_content)
@@ -151,8 +179,8 @@ def detect_pagination_elements(url: str, indications: str, selected_model: str,
                 pagination_data = {"next_buttons": [], "page_urls": []}
             # Token counts
             token_counts = {
-                "input_tokens": response['usage']['prompt_tokens'],
-                "output_tokens": response['usage']['completion_tokens']
+                "input_tokens": response.usage.prompt_tokens,
+                "output_tokens": response.usage.completion_tokens
             }
             # Calculate the price
             pagination_price = calculate_pagination_price(token_counts, selected_model)
@@ -161,7 +189,7 @@ def detect_pagination_elements(url: str, indications: str, selected_model: str,
 
         elif selected_model == "Groq Llama3.1 70b":
             # Use Groq client
-            client = Groq(api_key=get_api_key("GROQ_API_KEY"))
+            client = get_llm_client("groq", get_api_key("GROQ_API_KEY"))
             response = client.chat.completions.create(
                 model=GROQ_LLAMA_MODEL_FULLNAME,
                 messages=[
@@ -195,6 +223,8 @@ def detect_pagination_elements(url: str, indications: str, selected_model: str,
             raise ValueError(f"Unsupported model: {selected_model}")
 
     except Exception as e:
+        if is_retryable(e):
+            raise  # Throttled or transient: the dispatcher retries the call
         logging.error(f"An error occurred in detect_pagination_elements: {e}")
         # Return default values if an error occurs
         return PaginationData(page_urls=[]), {"input_tokens": 0, "output_tokens": 0}, 0.0
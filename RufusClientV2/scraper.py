@@ -7,10 +7,7 @@ from datetime import datetime
 from typing import List, Dict, Type
 
 import pandas as pd
-from bs4 import BeautifulSoup
-from pydantic import BaseModel, Field, create_model
-import html2text
-import tiktoken
+from pydantic import BaseModel, Field, ValidationError, create_model
 import streamlit as st
 
 from dotenv import load_dotenv
@@ -24,15 +21,21 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
 
-from openai import OpenAI
 import google.generativeai as genai
-from groq import Groq
 
 from api_management import get_api_key
-from assets import USER_AGENTS,PRICING,HEADLESS_OPTIONS,SYSTEM_MESSAGE,USER_MESSAGE,LLAMA_MODEL_FULLNAME,GROQ_LLAMA_MODEL_FULLNAME,HEADLESS_OPTIONS_DOCKER
+from html_markdown import html_to_markdown_with_readability, html_to_markdown_many
+from shared import get_http_pool, get_browser_pool, create_chrome_driver, PageReadiness, HttpCache, get_encoder, get_llm_client, get_llm_cache, llm_cache_key, dispatch_call, count_tokens, BatchRunner, completion_text
+from assets import USER_AGENTS,PRICING,HEADLESS_OPTIONS,SYSTEM_MESSAGE,USER_MESSAGE,LLAMA_MODEL_FULLNAME,GROQ_LLAMA_MODEL_FULLNAME,HEADLESS_OPTIONS_DOCKER,MODEL_PROVIDERS,BATCH_PRICE_FACTOR
 load_dotenv()
 
 
+# Conditional-GET cache shared by static fetches, so repeat runs cost a 304 for unchanged pages
+HTTP_CACHE = HttpCache(os.path.join('output', '.cache', 'http_cache.sqlite'))
+
+# Waits on real page-readiness signals; PAGE_READINESS keeps the time spent on recent pages and in total
+PAGE_READINESS = PageReadiness()
+
 # Set up the Chrome WebDriver options
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 model = genai.GenerativeModel("gemini-1.5-flash")
@@ -48,82 +51,55 @@ def is_running_in_docker():
     except Exception:
         return False
 
-def setup_selenium(attended_mode=False):
-    options = Options()
-    service = Service(ChromeDriverManager().install())
-
+def selenium_options():
     # Apply headless options based on whether the code is running in Docker
     if is_running_in_docker():
         # Running inside Docker, use Docker-specific headless options
-        for option in HEADLESS_OPTIONS_DOCKER:
-            options.add_argument(option)
-    else:
-        # Not running inside Docker, use the normal headless options
-        for option in HEADLESS_OPTIONS:
-            options.add_argument(option)
+        return HEADLESS_OPTIONS_DOCKER
+    # Not running inside Docker, use the normal headless options
+    return HEADLESS_OPTIONS
+
 
-    # Initialize the WebDriver
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+def setup_selenium(attended_mode=False):
+    # A dedicated browser, e.g. the one the user drives in attended mode
+    return create_chrome_driver(selenium_options())
 
 
 
 
 def fetch_html_selenium(url, attended_mode=False, driver=None):
     if driver is None:
-        driver = setup_selenium(attended_mode)
-        should_quit = True
-        if not attended_mode:
-            driver.get(url)
-    else:
-        should_quit = False
-        # Do not navigate to the URL if in attended mode and driver is already initialized
-        if not attended_mode:
-            driver.get(url)
+        # Lease a warm browser from the shared pool instead of starting Chrome per page
+        with get_browser_pool(selenium_options()).lease() as pooled_driver:
+            return read_page_html(pooled_driver, url, attended_mode)
+    # Do not navigate to the URL if in attended mode and driver is already initialized
+    return read_page_html(driver, url, attended_mode)
 
-    try:
-        if not attended_mode:
-            # Add more realistic actions like scrolling
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(random.uniform(1.1, 1.8))
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/1.2);")
-            time.sleep(random.uniform(1.1, 1.8))
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/1);")
-            time.sleep(random.uniform(1.1, 1.8))
-        # Get the page source from the current page
-        html = driver.page_source
-        return html
-    finally:
-        if should_quit:
-            driver.quit()
-
-
-
-
-def clean_html(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Remove headers and footers based on common HTML tags or classes
-    for element in soup.find_all(['header', 'footer']):
-        element.decompose()  # Remove these tags and their content
 
-    return str(soup)
+def read_page_html(driver, url, attended_mode=False):
+    if not attended_mode:
+        driver.get(url)
+        # Scroll like a reader, moving on as soon as the page stops changing
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
+        PAGE_READINESS.wait(driver, url)
+    # Get the page source from the current page
+    return driver.page_source
 
 
-def html_to_markdown_with_readability(html_content):
 
-    
-    cleaned_html = clean_html(html_content)  
-    
-    # Convert to markdown
-    markdown_converter = html2text.HTML2Text()
-    markdown_converter.ignore_links = False
-    markdown_content = markdown_converter.handle(cleaned_html)
-    
-    return markdown_content
+
+def fetch_html_static(url):
+    """
+    Fetch a page without a browser over the shared keep-alive connection pool.
+
+    Much cheaper than fetch_html_selenium for pages that do not need JavaScript.
+    Unchanged pages are revalidated through HTTP_CACHE instead of downloaded again.
+    Raises requests.exceptions.RequestException on network errors or bad status.
+    """
+    response = get_http_pool().get(url, headers={"User-Agent": random.choice(USER_AGENTS)}, cache=HTTP_CACHE)
+    return response.text
 
 
-    
 def save_raw_data(raw_data: str, output_folder: str, file_name: str):
     """Save raw markdown data to the specified output folder."""
     os.makedirs(output_folder, exist_ok=True)
@@ -196,7 +172,7 @@ def create_listings_container_model(listing_model: Type[BaseModel]) -> Type[Base
 
 
 def trim_to_token_limit(text, model, max_tokens=120000):
-    encoder = tiktoken.encoding_for_model(model)
+    encoder = get_encoder(model)  # Loaded once per model, not on every call
     tokens = encoder.encode(text)
     if len(tokens) > max_tokens:
         trimmed_text = encoder.decode(tokens[:max_tokens])
@@ -241,12 +217,40 @@ def generate_system_message(listing_model: BaseModel) -> str:
 
 
 
-def format_data(data, DynamicListingsContainer, DynamicListingModel, selected_model):
+def format_data(data, DynamicListingsContainer, DynamicListingModel, selected_model, use_cache=True):
+    """
+    Extract the listings from ``data``, answering repeat requests from the LLM response cache.
+
+    A cached answer costs no tokens, so its token counts are zero. With
+    ``use_cache=False`` the model is always called (the fresh answer is still stored).
+    Calls go through the provider's dispatcher, which keeps them under its rate
+    limits and retries throttled ones; calls to a local model run directly.
+    """
+    provider = MODEL_PROVIDERS.get(selected_model)
+    cache = get_llm_cache()
+    cache_key = llm_cache_key(provider, selected_model, SYSTEM_MESSAGE,
+                              USER_MESSAGE, data, schema=DynamicListingsContainer)
+    cached = cache.get(cache_key, bypass=not use_cache)
+    if cached is not None:
+        formatted_data = cached["data"]
+        if cached["parsed"]:
+            formatted_data = DynamicListingsContainer.model_validate(formatted_data)
+        return formatted_data, {"input_tokens": 0, "output_tokens": 0}
+
+    formatted_data, token_counts = dispatch_call(
+        provider, lambda: request_formatted_data(data, DynamicListingsContainer, DynamicListingModel, selected_model),
+        tokens=count_tokens(SYSTEM_MESSAGE + USER_MESSAGE + data, selected_model))
+    parsed = hasattr(formatted_data, "model_dump")
+    cache.set(cache_key, {"parsed": parsed, "data": formatted_data.model_dump() if parsed else formatted_data})
+    return formatted_data, token_counts
+
+
+def request_formatted_data(data, DynamicListingsContainer, DynamicListingModel, selected_model):
     token_counts = {}
     
     if selected_model in ["gpt-4o-mini", "gpt-4o-2024-08-06"]:
         # Use OpenAI API
-        client = OpenAI(api_key=get_api_key('OPENAI_API_KEY'))
+        client = get_llm_client("openai", get_api_key('OPENAI_API_KEY'))
         completion = client.beta.chat.completions.parse(
             model=selected_model,
             messages=[
@@ -256,7 +260,7 @@ def format_data(data, DynamicListingsContainer, DynamicListingModel, selected_mo
             response_format=DynamicListingsContainer
         )
         # Calculate tokens using tiktoken
-        encoder = tiktoken.encoding_for_model(selected_model)
+        encoder = get_encoder(selected_model)
         input_token_count = len(encoder.encode(USER_MESSAGE + data))
         output_token_count = len(encoder.encode(json.dumps(completion.choices[0].message.parsed.dict())))
         token_counts = {
@@ -267,7 +271,7 @@ def format_data(data, DynamicListingsContainer, DynamicListingModel, selected_mo
 
     elif selected_model == "gemini-1.5-flash":
         # Use Google Gemini API
-        genai.configure(api_key=get_api_key("GOOGLE_API_KEY"))
+        genai = get_llm_client("gemini", get_api_key("GOOGLE_API_KEY"))
         model = genai.GenerativeModel('gemini-1.5-flash',
                 generation_config={
                     "response_mime_type": "application/json",
@@ -291,7 +295,7 @@ def format_data(data, DynamicListingsContainer, DynamicListingModel, selected_mo
         sys_message = generate_system_message(DynamicListingModel)
         # print(SYSTEM_MESSAGE)
         # Point to the local server
-        client = OpenAI(base_url="http://localhost:1234/v1", api_key="lm-studio")
+        client = get_llm_client("openai", "lm-studio", base_url="http://localhost:1234/v1")
 
         completion = client.chat.completions.create(
             model=LLAMA_MODEL_FULLNAME, #change this if needed (use a better model)
@@ -322,7 +326,7 @@ def format_data(data, DynamicListingsContainer, DynamicListingModel, selected_mo
         sys_message = generate_system_message(DynamicListingModel)
         # print(SYSTEM_MESSAGE)
         # Point to the local server
-        client = Groq(api_key=get_api_key("GROQ_API_KEY"),)
+        client = get_llm_client("groq", get_api_key("GROQ_API_KEY"))
 
         completion = client.chat.completions.create(
         messages=[
@@ -350,6 +354,70 @@ def format_data(data, DynamicListingsContainer, DynamicListingModel, selected_mo
 
 
 
+def format_data_batch(pages, DynamicListingsContainer, selected_model, output_folder, runner=None):
+    """
+    Extract the listings of many pages in one OpenAI Batch API job instead of one call per page.
+
+    Batch jobs cost half as much and finish within 24 hours, which suits bulk
+    runs that do not need an answer right away. Requests that fail are
+    resubmitted by the runner. Each page's listings are saved as
+    sorted_data_{i}.json / .xlsx in ``output_folder``, like the interactive path.
+
+    Args:
+        pages (list): Markdown of each page; page i (from 1) is saved as sorted_data_{i}
+        DynamicListingsContainer (Type[BaseModel]): Schema of the answer
+        selected_model (str): An OpenAI model
+        output_folder (str): Where the per-page files are written
+        runner (BatchRunner, optional): Defaults to the OpenAI Batch API with OPENAI_API_KEY
+
+    Returns:
+        list: (formatted_data, token_counts) per page, or None for a page that kept failing
+              or whose answer did not match the schema
+    """
+    if MODEL_PROVIDERS.get(selected_model) != "openai":
+        raise ValueError(f"Batch mode needs an OpenAI model, not {selected_model}")
+    response_format = {
+        "type": "json_schema",
+        "json_schema": {"name": DynamicListingsContainer.__name__,
+                        "schema": DynamicListingsContainer.model_json_schema()},
+    }
+    requests = {
+        f"page-{i}": {
+            "model": selected_model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_MESSAGE},
+                {"role": "user", "content": USER_MESSAGE + data},
+            ],
+            "response_format": response_format,
+        }
+        for i, data in enumerate(pages, start=1)
+    }
+    runner = runner or BatchRunner(get_llm_client("openai", get_api_key('OPENAI_API_KEY')))
+    responses = runner.run(requests)
+
+    results = []
+    for i in range(1, len(pages) + 1):
+        body = responses.get(f"page-{i}")
+        if body is None:
+            print(f"Batch extraction failed for page {i}: {runner.failures.get(f'page-{i}')}")
+            results.append(None)
+            continue
+        try:
+            formatted_data = DynamicListingsContainer.model_validate_json(completion_text(body))
+        except ValidationError as e:
+            # One malformed answer must not cost the pages after it
+            print(f"Batch extraction for page {i} does not match the schema: {e}")
+            results.append(None)
+            continue
+        token_counts = {
+            "input_tokens": body["usage"]["prompt_tokens"],
+            "output_tokens": body["usage"]["completion_tokens"]
+        }
+        save_formatted_data(formatted_data, output_folder, f'sorted_data_{i}.json', f'sorted_data_{i}.xlsx')
+        results.append((formatted_data, token_counts))
+    return results
+
+
 def save_formatted_data(formatted_data, output_folder: str, json_file_name: str, excel_file_name: str):
     """Save formatted data as JSON and Excel in the specified output folder."""
     os.makedirs(output_folder, exist_ok=True)
@@ -394,7 +462,7 @@ def save_formatted_data(formatted_data, output_folder: str, json_file_name: str,
         print(f"Error creating DataFrame or saving Excel: {str(e)}")
         return None
 
-def calculate_price(token_counts, model):
+def calculate_price(token_counts, model, batch=False):
     input_token_count = token_counts.get("input_tokens", 0)
     output_token_count = token_counts.get("output_tokens", 0)
     
@@ -402,6 +470,8 @@ def calculate_price(token_counts, model):
     input_cost = input_token_count * PRICING[model]["input"]
     output_cost = output_token_count * PRICING[model]["output"]
     total_cost = input_cost + output_cost
+    if batch:
+        total_cost *= BATCH_PRICE_FACTOR
     
     return input_token_count, output_token_count, total_cost
 
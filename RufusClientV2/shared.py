@@ -0,0 +1,24 @@
+"""
+Bridge to the RufusClient package so the Streamlit app reuses its shared
+connection pools and helpers instead of keeping a second copy of them.
+
+`streamlit run app.py` only puts this folder on sys.path, so the repository
+root is added here before importing from RufusClient.
+"""
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+from RufusClient.http_pool import get_http_pool  # noqa: E402
+from RufusClient.http_cache import HttpCache  # noqa: E402
+from RufusClient.browser_pool import get_browser_pool, create_chrome_driver  # noqa: E402
+from RufusClient.readiness import PageReadiness  # noqa: E402
+from RufusClient.tokens import get_encoder, count_tokens  # noqa: E402
+from RufusClient.llm_clients import get_llm_client  # noqa: E402
+from RufusClient.llm_cache import get_llm_cache, llm_cache_key  # noqa: E402
+from RufusClient.dispatcher import dispatch_call, is_retryable  # noqa: E402
+from RufusClient.batch import BatchRunner, completion_text  # noqa: E402
+from RufusClient.html_workers import get_html_workers  # noqa: E402
@@ -0,0 +1,46 @@
+"""
+LLM input tokens per page: raw HTML vs cleaned HTML vs the default reduced markdown.
+
+Runs over the saved pages in benchmarks/fixtures (or any HTML files given).
+Run from the repository root:
+
+    python -m benchmarks.bench_html_reduction [files ...]
+"""
+import argparse
+import glob
+import os
+import time
+
+from RufusClient.reducer import HtmlReducer
+from RufusClient.tokens import count_tokens, get_encoder
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "*.html")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*")
+    args = parser.parse_args()
+
+    if get_encoder() is None:
+        print("tiktoken encoding unavailable: token counts are estimated from characters")
+    reducers = (("cleaned HTML", HtmlReducer(markdown=False)), ("markdown", HtmlReducer()))
+    print(f"{'page':<20} {'raw':>8} {'cleaned HTML':>14} {'markdown':>10} {'cut':>6} {'ms':>6}")
+    totals = [0, 0, 0]
+    for path in args.files or sorted(glob.glob(FIXTURES)):
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+        counts = [count_tokens(content)]
+        for _, reducer in reducers:
+            start = time.perf_counter()
+            reduced = reducer.reduce(content)
+            elapsed = time.perf_counter() - start
+            counts.append(count_tokens(reduced))
+        totals = [total + count for total, count in zip(totals, counts)]
+        print(f"{os.path.basename(path):<20} {counts[0]:>8} {counts[1]:>14} {counts[2]:>10} "
+              f"{counts[0] / max(counts[2], 1):>5.1f}x {elapsed * 1000:>6.1f}")
+    print(f"{'total':<20} {totals[0]:>8} {totals[1]:>14} {totals[2]:>10} {totals[0] / max(totals[2], 1):>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+CPU stage throughput (reduce to markdown + link scan) in threads vs an HtmlWorkerPool.
+
+Repeats the saved pages in benchmarks/fixtures (or any HTML files given)
+into a corpus and pushes it through the CPU-bound HTML work, first in a
+thread pool, where the GIL serialises it, then in worker pools of 1, 2, 4,
+... processes up to the core count. Also prints how many bytes cross the
+process boundary per page compared with the raw HTML.
+Run from the repository root:
+
+    python -m benchmarks.bench_html_workers [--pages 200] [--max-workers N] [files ...]
+"""
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from RufusClient.html_scan import scan_html
+from RufusClient.html_workers import HtmlWorkerPool, pack
+from RufusClient.reducer import DEFAULT_REDUCER
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "*.html")
+KEYWORDS = ["pricing", "plans", "price"]
+URL = "https://example.com/page"
+
+
+def in_process(page):
+    scan_html(page, URL, KEYWORDS)
+    return DEFAULT_REDUCER.reduce(page)
+
+
+def run(corpus, threads, pool=None):
+    def process(page):
+        if pool is None:
+            return in_process(page)
+        pool.scan(page, URL, KEYWORDS)
+        return pool.reduce(page)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for _ in executor.map(process, corpus):
+            pass
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.files or sorted(glob.glob(FIXTURES)):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    corpus = [pages[i % len(pages)] for i in range(args.pages)]
+    raw = sum(len(page.encode("utf-8")) for page in pages)
+    packed = sum(len(pack(page)) for page in pages)
+    print(f"{len(corpus)} pages, {os.cpu_count()} core(s); "
+          f"{raw / len(pages) / 1024:.0f} KiB raw -> {packed / len(pages) / 1024:.0f} KiB sent per page\n")
+
+    counts = [1]
+    while counts[-1] * 2 <= args.max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.max_workers:
+        counts.append(args.max_workers)
+
+    baseline = run(corpus, threads=1)
+    print(f"{'in-process, 1 thread':<26}{baseline:8.1f} pages/s")
+    threaded = run(corpus, threads=args.max_workers * 2)
+    print(f"{f'in-process, {args.max_workers * 2} threads':<26}{threaded:8.1f} pages/s  ({threaded / baseline:.2f}x)")
+    for workers in counts:
+        with HtmlWorkerPool(workers=workers) as pool:
+            run(corpus[:workers * 2], threads=workers * 2, pool=pool)  # Start the workers
+            rate = run(corpus, threads=workers * 2, pool=pool)
+        print(f"{f'HtmlWorkerPool, {workers} worker(s)':<26}{rate:8.1f} pages/s  ({rate / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Requests/second of the static fetch path against a local keep-alive server,
+before (module-level requests.get per page) and after (shared HttpPool).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_http_pool [--requests 500] [--threads 8]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from RufusClient.http_pool import HttpPool
+from tests.site_server import LocalSite
+
+PAGE = "<html><body>" + "<p>pricing plans and features</p>" * 200 + "</body></html>"
+
+
+def run(fetch, urls, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for _ in executor.map(fetch, urls):
+            pass
+    return len(urls) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    with LocalSite({"/": PAGE}) as site:
+        urls = [site.url("/")] * args.requests
+        headers = {"User-Agent": "RufusBot/1.0"}
+
+        before = run(lambda url: requests.get(url, headers=headers, timeout=10).text, urls, args.threads)
+
+        pool = HttpPool(pool_maxsize=args.threads)
+        after = run(lambda url: pool.get(url, headers=headers).text, urls, args.threads)
+        pool.close()
+
+    print(f"requests.get per page : {before:8.1f} req/s")
+    print(f"shared HttpPool       : {after:8.1f} req/s  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Per-page cost of link extraction plus the relevance check: BeautifulSoup + lowercased page copy vs one lxml scan.
+
+Runs over the saved pages in benchmarks/fixtures (or any HTML files given).
+Run from the repository root:
+
+    python -m benchmarks.bench_link_extraction [--repeat 20] [files ...]
+"""
+import argparse
+import glob
+import os
+import time
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from RufusClient import html_scan
+from RufusClient.crawler import Crawler
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "*.html")
+
+
+def previous_scan(crawler, content, page_url):
+    # The crawler's former hot path: a full soup, the base URL re-parsed per link,
+    # and a lowercased copy of the whole document per keyword
+    links = set()
+    for a_tag in BeautifulSoup(content, "html.parser").find_all("a", href=True):
+        full_url = urljoin(page_url, a_tag["href"])
+        parsed = urlparse(full_url)
+        if bool(parsed.netloc) and bool(parsed.scheme) and parsed.netloc == urlparse(crawler.base_url).netloc:
+            links.add(crawler.canonicalize(full_url))
+    relevant = any(keyword.lower() in content.lower() for keyword in crawler.keywords)
+    return links, relevant
+
+
+def current_scan(crawler, content, page_url):
+    scan = crawler.scan_page(content, page_url)
+    return set(scan.links), scan.relevant
+
+
+def measure(scan, crawler, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        html_scan._resolve.cache_clear()  # Each round sees the pages cold, as a first crawl would
+        for content in pages:
+            result = scan(crawler, content, crawler.base_url)
+    return (time.perf_counter() - start) / (repeat * len(pages)), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("files", nargs="*")
+    args = parser.parse_args()
+
+    paths = args.files or sorted(glob.glob(FIXTURES))
+    pages = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    crawler = Crawler("https://www.example.edu/", "Find tuition and scholarship deadlines", max_depth=1)
+    try:
+        size = sum(len(page) for page in pages) / len(pages)
+        print(f"{len(pages)} pages, {size / 1024:.0f} KiB on average, {args.repeat} repeats")
+        baseline = None
+        for name, scan in (("BeautifulSoup + lower()", previous_scan), ("lxml single-pass scan", current_scan)):
+            per_page, (links, relevant) = measure(scan, crawler, pages, args.repeat)
+            baseline = baseline or per_page
+            print(f"{name:<26} {per_page * 1000:8.2f} ms/page  {baseline / per_page:5.1f}x  "
+                  f"({len(links)} links, relevant={relevant} on the last page)")
+    finally:
+        crawler.pages.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+LLM calls/second and TCP connections against a local OpenAI-compatible server,
+before (a new OpenAI() client per call) and after (shared LLMClientRegistry).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_llm_clients [--calls 300] [--threads 4]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+
+from RufusClient.llm_clients import LLMClientRegistry
+from tests.llm_server import FakeLLMServer
+
+MESSAGES = [{"role": "user", "content": "Extract the pricing tiers. " * 50}]
+
+
+def run(server, get_client, calls, threads):
+    connections = server.connections
+
+    def call(_):
+        client = get_client()
+        client.chat.completions.create(model="fake", messages=MESSAGES)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for _ in executor.map(call, range(calls)):
+            pass
+    return calls / (time.perf_counter() - start), server.connections - connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    with FakeLLMServer() as server:
+        before, before_connections = run(
+            server, lambda: OpenAI(api_key="bench", base_url=server.base_url), args.calls, args.threads)
+
+        registry = LLMClientRegistry()
+        after, after_connections = run(
+            server, lambda: registry.get("openai", "bench", base_url=server.base_url), args.calls, args.threads)
+        registry.close()
+
+    print(f"new OpenAI() per call : {before:8.1f} calls/s  {before_connections:5d} connections")
+    print(f"shared client registry: {after:8.1f} calls/s  {after_connections:5d} connections  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
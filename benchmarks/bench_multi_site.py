@@ -0,0 +1,75 @@
+"""
+Wall time to scrape N sites: one scrape() after another vs scrape_many().
+
+Serves N copies of a small pricing site and an OpenAI-compatible endpoint
+locally, both with a per-request delay, and scrapes every site first
+sequentially and then with RufusClient.scrape_many, which crawls the sites
+concurrently over the shared HTTP pool and LLM dispatcher. Both runs share
+the given RPM/TPM limits, which bound how far concurrency can go.
+Run from the repository root:
+
+    python -m benchmarks.bench_multi_site [--sites 8] [--page-delay 0.05] [--llm-delay 0.2] [--tpm 2000000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from contextlib import ExitStack
+
+from RufusClient.client import RufusClient
+from RufusClient.dispatcher import LLMDispatcher
+from tests.llm_server import FakeLLMServer
+from tests.site_server import LocalSite
+from tests.test_crawler import pricing_site
+
+
+def responder(request):
+    return json.dumps({"pricing": request["messages"][-1]["content"][-40:]})
+
+
+def run(client, urls, concurrent):
+    start = time.perf_counter()
+    if concurrent:
+        results = dict(client.scrape_many(urls, max_sites=len(urls)))
+    else:
+        results = {url: client.scrape(url) for url in urls}
+    failed = sum(isinstance(result, Exception) for result in results.values())
+    return time.perf_counter() - start, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", type=int, default=8)
+    parser.add_argument("--page-delay", type=float, default=0.05)
+    parser.add_argument("--llm-delay", type=float, default=0.2)
+    parser.add_argument("--rpm", type=int, default=10_000, help="LLM requests per minute allowed")
+    parser.add_argument("--tpm", type=int, default=2_000_000, help="LLM tokens per minute allowed")
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        server = stack.enter_context(FakeLLMServer(responder=responder, delay=args.llm_delay))
+        sites = [stack.enter_context(LocalSite(pricing_site(), delay=args.page_delay)) for _ in range(args.sites)]
+        urls = [site.url("/") for site in sites]
+        os.environ.setdefault("OPENAI_API_KEY", "bench")
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+
+        timings = {}
+        for concurrent in (False, True):
+            # A fresh checkpoint and cache directory, so neither run resumes the other
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+            dispatcher = LLMDispatcher(args.rpm, args.tpm, max_concurrency=32)
+            client = RufusClient(user_prompt="pricing", max_depth=1, checkpoint_dir=directory,
+                                 llm_dispatcher=dispatcher)
+            timings[concurrent] = run(client, urls, concurrent)
+            dispatcher.close()
+
+    sequential, concurrent = timings[False][0], timings[True][0]
+    print(f"{args.sites} sites, {args.page_delay * 1000:.0f} ms per page, {args.llm_delay * 1000:.0f} ms per LLM call, "
+          f"{args.rpm} RPM / {args.tpm} TPM")
+    print(f"sequential scrape(): {sequential:7.2f} s  ({timings[False][1]} failed)")
+    print(f"scrape_many()      : {concurrent:7.2f} s  ({timings[True][1]} failed)  ({sequential / concurrent:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+LLM input tokens and cost per page when only the top-k BM25 passages are sent.
+
+Reduces the saved pages in benchmarks/fixtures (or any HTML files given),
+ranks all their passages against the prompt at once and prints each page's
+input tokens at several k, next to the whole reduced page.
+Run from the repository root:
+
+    python -m benchmarks.bench_passage_ranking [--prompt PROMPT] [--budget TOKENS] [files ...]
+"""
+import argparse
+import glob
+import os
+import time
+
+from RufusClient.ranking import REPORT_KS, PassageRanking
+from RufusClient.reducer import HtmlReducer
+from RufusClient.tokens import DEFAULT_MODEL, get_encoder, input_cost
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "*.html")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--prompt", default="pricing plans and product prices")
+    parser.add_argument("--budget", type=int, default=None, help="token budget per page")
+    args = parser.parse_args()
+
+    if get_encoder() is None:
+        print("tiktoken encoding unavailable: token counts are estimated from characters")
+    reducer = HtmlReducer()
+    documents = {}
+    for path in args.files or sorted(glob.glob(FIXTURES)):
+        with open(path, encoding="utf-8") as f:
+            documents[os.path.basename(path)] = reducer.reduce(f.read())
+
+    start = time.perf_counter()
+    ranking = PassageRanking(args.prompt, documents)
+    elapsed = time.perf_counter() - start
+    print(f"Ranked {len(ranking.passages)} passages of {len(documents)} pages in {elapsed * 1000:.1f} ms "
+          f"for {args.prompt!r}\n")
+
+    columns = [*REPORT_KS, "all"]
+    print(f"{'page':<20}" + "".join(f"{f'k={k}':>9}" for k in columns))
+    totals = dict.fromkeys(columns, 0)
+    for name in documents:
+        report = ranking.cost_report(name, token_budget=args.budget)
+        for k in columns:
+            totals[k] += report[k]["tokens"]
+        print(f"{name:<20}" + "".join(f"{report[k]['tokens']:>9}" for k in columns))
+    print(f"{'total tokens':<20}" + "".join(f"{totals[k]:>9}" for k in columns))
+    print(f"{'cost ($)':<20}" + "".join(f"{input_cost(totals[k], DEFAULT_MODEL):>9.4f}" for k in columns))
+
+
+if __name__ == "__main__":
+    main()
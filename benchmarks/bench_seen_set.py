@@ -0,0 +1,63 @@
+"""
+Memory of the crawler's seen-set: a set of raw URL strings vs FingerprintSet vs BloomFilter.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_seen_set [--urls 100000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from RufusClient.urls import FingerprintSet, BloomFilter
+
+
+def synthetic_urls(count):
+    for i in range(count):
+        yield f"https://shop.example.com/catalogue/category-{i % 97}/product-{i}?colour=blue&size={i % 7}"
+
+
+def fill(build, count):
+    structure = build()
+    for url in synthetic_urls(count):
+        structure.add(url)
+    return structure
+
+
+def measure(build, count):
+    # Timed without tracemalloc, which slows allocation-heavy code down several-fold
+    start = time.perf_counter()
+    fill(build, count)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    structure = fill(build, count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return structure, current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--urls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = [
+        ("set of URL strings", set),
+        ("FingerprintSet", FingerprintSet),
+        ("BloomFilter (p=1e-4)", lambda: BloomFilter(capacity=args.urls, error_rate=1e-4)),
+    ]
+    print(f"{args.urls:,} distinct URLs")
+    baseline = None
+    for name, build in rows:
+        structure, size, elapsed = measure(build, args.urls)
+        baseline = baseline or size
+        print(f"{name:22s}: {size / 1024 / 1024:8.1f} MiB  {size / args.urls:6.1f} B/url  "
+              f"({baseline / size:4.1f}x smaller)  {elapsed:5.1f}s")
+        if isinstance(structure, BloomFilter):
+            probes = 20_000
+            false_positives = sum(f"https://other.example.com/{i}" in structure for i in range(probes))
+            print(f"{'':22s}  measured false-positive rate: {false_positives / probes:.5f}")
+
+
+if __name__ == "__main__":
+    main()
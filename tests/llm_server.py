@@ -0,0 +1,229 @@
+import json
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def echo(request):
+    """Default responder: answers with the last user message."""
+    return request["messages"][-1]["content"]
+
+
+class FakeLLMServer:
+    """
+    Local OpenAI-compatible chat completions endpoint used by tests and benchmarks.
+
+    Answers ``POST /v1/chat/completions`` with a completion built by
+    ``responder`` and counts the requests and TCP connections it receives,
+    so tests can assert how many calls and handshakes a component made.
+
+    With ``limit`` set it throttles like a provider: more than ``limit``
+    requests within any ``window`` seconds are answered 429 with
+    Retry-After headers, and counted in ``throttled``.
+
+    It also implements the Batch API (``/v1/files``, ``/v1/batches``): a
+    batch reports "in_progress" for ``batch_polls`` status checks, then
+    "completed" with an output file of responder answers. Requests whose
+    custom_id is in ``batch_failures`` fail (error file) the first time they
+    are submitted.
+
+    Args:
+        responder (callable, optional): ``responder(request_json)`` returning the reply text
+        delay (float, optional): Seconds to sleep before answering each request
+        limit (int, optional): Requests accepted per window
+        window (float, optional): Length of the rate-limit window in seconds
+        batch_polls (int, optional): Status checks a batch stays in progress for
+        batch_failures (Iterable[str], optional): custom_ids that fail on their first submission
+    """
+
+    def __init__(self, responder=echo, delay=0.0, limit=None, window=1.0, batch_polls=1, batch_failures=()):
+        self.responder = responder
+        self.delay = delay
+        self.limit = limit
+        self.window = window
+        self.batch_polls = batch_polls
+        self.batch_failures = set(batch_failures)
+        self.requests = []
+        self.accepted = []  # Monotonic times of the requests let through
+        self.throttled = 0
+        self.connections = 0
+        self.files = {}  # file id -> bytes
+        self.batches = {}  # batch id -> batch object
+        self.submitted = []  # custom_ids of every submitted batch, in order
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path == "/v1/files":
+                    self.send_json(200, server.upload(self.headers.get("Content-Type", ""), body))
+                    return
+                request = json.loads(body or b"{}")
+                if self.path == "/v1/batches":
+                    self.send_json(200, server.create_batch(request))
+                    return
+                with server._lock:
+                    server.requests.append(request)
+                    wait = server.admit()
+                if wait is not None:
+                    self.send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                                   {"retry-after-ms": str(int(wait * 1000)), "retry-after": str(max(1, round(wait)))})
+                    return
+                if server.delay:
+                    time.sleep(server.delay)
+                if self.path == "/v1/chat/completions":
+                    self.send_json(200, server.completion(request))
+                else:
+                    self.send_json(404, {"error": {"message": f"No route for {self.path}"}})
+
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")
+                if parts[:2] == ["v1", "batches"] and len(parts) == 3 and parts[2] in server.batches:
+                    self.send_json(200, server.poll_batch(parts[2]))
+                elif parts[:2] == ["v1", "files"] and len(parts) == 4 and parts[2] in server.files:
+                    data = server.files[parts[2]]
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/octet-stream")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                else:
+                    self.send_json(404, {"error": {"message": f"No route for {self.path}"}})
+
+            def send_json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def admit(self):
+        """Record a request; return None if it is within the limit, else seconds until it would be."""
+        now = time.monotonic()
+        if self.limit is not None:
+            self.accepted = [accepted for accepted in self.accepted if accepted > now - self.window]
+            if len(self.accepted) >= self.limit:
+                self.throttled += 1
+                return self.accepted[0] + self.window - now
+        self.accepted.append(now)
+        return None
+
+    def completion(self, request):
+        content = self.responder(request)
+        prompt_tokens = sum(len(str(message.get("content", ""))) // 4 for message in request.get("messages", []))
+        return {
+            "id": f"chatcmpl-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                      "total_tokens": prompt_tokens + len(content) // 4},
+        }
+
+    def store_file(self, data, filename, purpose):
+        with self._lock:
+            file_id = f"file-{len(self.files) + 1}"
+            self.files[file_id] = data
+        return {"id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+                "filename": filename, "purpose": purpose, "status": "processed"}
+
+    def upload(self, content_type, body):
+        message = BytesParser(policy=default_policy).parsebytes(
+            b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body)
+        fields, data, filename = {}, b"", "upload.jsonl"
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if name == "file":
+                data = part.get_payload(decode=True)
+                filename = part.get_filename() or filename
+            else:
+                fields[name] = part.get_content().strip()
+        return self.store_file(data, filename, fields.get("purpose", "batch"))
+
+    def create_batch(self, request):
+        with self._lock:
+            batch_id = f"batch-{len(self.batches) + 1}"
+            self.batches[batch_id] = {
+                "id": batch_id, "object": "batch", "endpoint": request["endpoint"],
+                "input_file_id": request["input_file_id"], "completion_window": request["completion_window"],
+                "status": "validating", "created_at": int(time.time()), "polls": 0,
+                "output_file_id": None, "error_file_id": None,
+                "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            }
+        return self.public(self.batches[batch_id])
+
+    def poll_batch(self, batch_id):
+        batch = self.batches[batch_id]
+        if batch["status"] != "completed":
+            batch["polls"] += 1
+            if batch["polls"] <= self.batch_polls:
+                batch["status"] = "in_progress"
+            else:
+                self.run_batch(batch)
+        return self.public(batch)
+
+    def run_batch(self, batch):
+        outputs, errors = [], []
+        for line in self.files[batch["input_file_id"]].decode("utf-8").splitlines():
+            item = json.loads(line)
+            custom_id = item["custom_id"]
+            self.submitted.append(custom_id)
+            record = {"id": f"req-{len(self.submitted)}", "custom_id": custom_id, "error": None}
+            if custom_id in self.batch_failures:
+                self.batch_failures.discard(custom_id)
+                record["response"] = {"status_code": 500, "body": {"error": {"message": "server error"}}}
+                errors.append(record)
+            else:
+                record["response"] = {"status_code": 200, "body": self.completion(item["body"])}
+                outputs.append(record)
+        if outputs:
+            batch["output_file_id"] = self.store_jsonl(outputs)["id"]
+        if errors:
+            batch["error_file_id"] = self.store_jsonl(errors)["id"]
+        batch["request_counts"] = {"total": len(outputs) + len(errors), "completed": len(outputs),
+                                   "failed": len(errors)}
+        batch["status"] = "completed"
+
+    def store_jsonl(self, records):
+        data = "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+        return self.store_file(data, "results.jsonl", "batch_output")
+
+    @staticmethod
+    def public(batch):
+        return {name: value for name, value in batch.items() if name != "polls"}
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
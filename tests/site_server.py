@@ -0,0 +1,112 @@
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LocalSite:
+    """
+    Tiny threaded HTTP server used by the test suite instead of live websites.
+
+    Serves a fixed mapping of paths to HTML bodies and counts the requests it
+    receives and the TCP connections it accepts, so tests can assert how many
+    network round trips a component made. ``max_in_flight`` is the largest
+    number of requests it was answering at once.
+
+    Args:
+        pages (dict): Mapping of request path (e.g. "/docs") to HTML body (str) or raw bytes
+        delay (float, optional): Seconds to sleep before answering each request
+        etag (bool, optional): Send ETags and answer matching If-None-Match with 304
+        headers (dict, optional): Extra headers sent with every 200 response
+        redirects (dict, optional): Mapping of request path to the path it is moved (301) to
+    """
+
+    def __init__(self, pages, delay=0.0, etag=False, headers=None, redirects=None):
+        self.pages = pages
+        self.delay = delay
+        self.etag = etag
+        self.headers = headers or {}
+        self.redirects = redirects or {}
+        self.hits = []
+        self.statuses = []
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # Avoid 40ms delayed-ACK stalls on keep-alive connections
+
+            def setup(self):
+                super().setup()
+                with site._lock:
+                    site.connections += 1
+
+            def do_GET(self):
+                with site._lock:
+                    site.hits.append(self.path)
+                    site.in_flight += 1
+                    site.max_in_flight = max(site.max_in_flight, site.in_flight)
+                try:
+                    self.respond()
+                finally:
+                    with site._lock:
+                        site.in_flight -= 1
+
+            def respond(self):
+                if site.delay:
+                    time.sleep(site.delay)
+                if self.path in site.redirects:
+                    site.statuses.append(301)
+                    self.send_response(301)
+                    self.send_header("Location", site.redirects[self.path])
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = site.pages.get(self.path)
+                if body is None:
+                    site.statuses.append(404)
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                payload = body if isinstance(body, bytes) else body.encode("utf-8")
+                etag = '"%s"' % hashlib.sha1(payload).hexdigest()
+                if site.etag and self.headers.get("If-None-Match") == etag:
+                    site.statuses.append(304)
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                site.statuses.append(200)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                if site.etag:
+                    self.send_header("ETag", etag)
+                for name, value in site.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path="/"):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from RufusClient.batch import BatchRunner, completion_text, read_batch_results, write_batch_file
+from RufusClient.client import RufusClient
+from RufusClient.llm_clients import LLMClientRegistry
+from tests.llm_server import FakeLLMServer
+from tests.site_server import LocalSite
+from tests.test_crawler import pricing_site
+
+
+def request(text):
+    return {"model": "fake", "messages": [{"role": "user", "content": text}]}
+
+
+class TestBatchFiles(unittest.TestCase):
+    def test_write_and_read(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_batch_file({"a": request("A"), "b": request("B")}, os.path.join(directory, "in.jsonl"))
+            with open(path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+        self.assertEqual([line["custom_id"] for line in lines], ["a", "b"])
+        self.assertEqual(lines[0]["url"], "/v1/chat/completions")
+        self.assertEqual(lines[0]["body"], request("A"))
+
+        output = "\n".join(json.dumps(record) for record in [
+            {"custom_id": "a", "response": {"status_code": 200, "body": {"choices": [{"message": {"content": " A "}}]}}},
+            {"custom_id": "b", "response": {"status_code": 500, "body": {"error": "boom"}}},
+            {"custom_id": "c", "response": None, "error": {"code": "expired"}},
+        ])
+        results = list(read_batch_results(output))
+        self.assertEqual(completion_text(results[0][1]), "A")
+        self.assertEqual([(custom_id, body) for custom_id, body, _ in results[1:]], [("b", None), ("c", None)])
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.registry = LLMClientRegistry()
+        self.addCleanup(self.registry.close)
+
+    def runner(self, server, **kwargs):
+        client = self.registry.get("openai", "test_api_key", base_url=server.base_url)
+        return BatchRunner(client, directory=self.directory, poll_interval=0.01, **kwargs)
+
+    def test_results_map_back_and_failures_are_resubmitted(self):
+        with FakeLLMServer(batch_polls=2, batch_failures={"page-1"}) as server:
+            runner = self.runner(server)
+            results = runner.run({f"page-{i}": request(f"text {i}") for i in range(3)})
+        self.assertEqual({custom_id: completion_text(body) for custom_id, body in results.items()},
+                         {"page-0": "text 0", "page-1": "text 1", "page-2": "text 2"})
+        self.assertEqual(runner.failures, {})
+        self.assertEqual(server.submitted, ["page-0", "page-1", "page-2", "page-1"])
+        self.assertEqual(len(server.batches), 2)
+        self.assertEqual(os.listdir(self.directory), [])  # Input files are removed once read
+
+    def test_gives_up_after_max_attempts(self):
+        with FakeLLMServer(batch_failures={"page-1"}) as server:
+            runner = self.runner(server, max_attempts=1)
+            results = runner.run({f"page-{i}": request(f"text {i}") for i in range(2)})
+        self.assertEqual(list(results), ["page-0"])
+        self.assertEqual(list(runner.failures), ["page-1"])
+
+
+class TestBatchScrape(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(os.environ, {"OPENAI_API_KEY": "test_api_key"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.registry = LLMClientRegistry()
+        self.addCleanup(self.registry.close)
+
+    @patch("RufusClient.client.Synthesizer")
+    def test_scrape_extracts_every_page_in_one_batch(self, mock_synthesizer):
+        mock_synthesizer.return_value.synthesize.return_value = {"pricing": []}
+        responder = lambda request: request["messages"][-1]["content"].rsplit("\n", 1)[-1]
+        with LocalSite(pricing_site()) as site, FakeLLMServer(responder=responder) as server:
+            runner = BatchRunner(self.registry.get("openai", "test_api_key", base_url=server.base_url),
+                                 directory=self.directory, poll_interval=0.01)
+            client = RufusClient(user_prompt="pricing", max_depth=1, batch_runner=runner,
+                                 checkpoint_dir=self.directory)
+            result = client.scrape(site.url("/"), batch=True)
+
+        self.assertEqual(result, {"pricing": []})
+        self.assertEqual(len(server.batches), 1)
+        self.assertEqual(len(server.submitted), 3)
+        self.assertEqual(server.requests, [])  # No interactive calls
+        aggregated = mock_synthesizer.call_args[0][0]["extracted_content"]
+        self.assertEqual(len(aggregated), 3)
+        self.assertTrue(all("pricing" in extraction for extraction in aggregated))
+
+
+if __name__ == "__main__":
+    unittest.main()
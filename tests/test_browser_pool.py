@@ -0,0 +1,119 @@
+import threading
+import unittest
+from RufusClient.browser_pool import BrowserPool
+
+
+class FakeDriver:
+    """Stands in for a Chrome WebDriver; the heap grows by ``leak`` bytes per page."""
+
+    def __init__(self, options, leak=0):
+        self.options = options
+        self.leak = leak
+        self.heap = 1_000_000
+        self.alive = True
+        self.quit_called = False
+
+    def get(self, url):
+        self.heap += self.leak
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("session deleted")
+        if "usedJSHeapSize" in script:
+            return self.heap
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+class TestBrowserPool(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+
+    def factory(self, leak=0):
+        def create(options):
+            driver = FakeDriver(options, leak)
+            self.created.append(driver)
+            return driver
+        return create
+
+    def test_reuses_browsers_between_leases(self):
+        pool = BrowserPool(size=2, driver_factory=self.factory())
+        for _ in range(5):
+            with pool.lease() as driver:
+                driver.get("https://a.example/")
+        self.assertEqual(len(self.created), 1)
+        pool.close()
+        self.assertTrue(self.created[0].quit_called)
+
+    def test_is_bounded_and_leases_are_exclusive(self):
+        pool = BrowserPool(size=2, max_pages_per_browser=1000, driver_factory=self.factory())
+        in_use, peak, lock = set(), [0], threading.Lock()
+
+        def worker():
+            for _ in range(20):
+                with pool.lease() as driver:
+                    with lock:
+                        self.assertNotIn(driver, in_use)
+                        in_use.add(driver)
+                        peak[0] = max(peak[0], len(in_use))
+                    with lock:
+                        in_use.discard(driver)
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(len(self.created), 2)
+        self.assertLessEqual(peak[0], 2)
+
+    def test_lease_times_out_when_exhausted(self):
+        pool = BrowserPool(size=1, driver_factory=self.factory())
+        with pool.lease():
+            with self.assertRaises(TimeoutError):
+                with pool.lease(timeout=0.05):
+                    pass
+
+    def test_closed_pool_starts_no_browser(self):
+        pool = BrowserPool(size=2, driver_factory=self.factory())
+        pool.close()
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+        self.assertEqual(self.created, [])
+
+    def test_warm_start(self):
+        pool = BrowserPool(size=3, warm=2, driver_factory=self.factory())
+        self.assertEqual(len(self.created), 2)
+        with pool.lease(), pool.lease():
+            pass
+        self.assertEqual(len(self.created), 2)
+
+    def test_recycles_after_max_pages(self):
+        pool = BrowserPool(size=1, max_pages_per_browser=3, driver_factory=self.factory())
+        for _ in range(7):
+            with pool.lease():
+                pass
+        self.assertEqual(len(self.created), 3)
+        self.assertTrue(self.created[0].quit_called)
+
+    def test_recycles_on_memory_growth(self):
+        pool = BrowserPool(size=1, max_memory_growth_mb=1, driver_factory=self.factory(leak=600_000))
+        for _ in range(3):
+            with pool.lease() as driver:
+                driver.get("https://a.example/")
+        self.assertEqual(len(self.created), 2)
+
+    def test_replaces_unhealthy_browser(self):
+        pool = BrowserPool(size=1, driver_factory=self.factory())
+        with pool.lease() as driver:
+            pass
+        driver.alive = False
+        with pool.lease() as replacement:
+            self.assertIsNot(replacement, driver)
+        self.assertTrue(driver.quit_called)
+
+
+if __name__ == "__main__":
+    unittest.main()
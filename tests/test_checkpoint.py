@@ -0,0 +1,177 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from RufusClient.checkpoint import CrawlCheckpoint, checkpoint_path
+from RufusClient.client import RufusClient
+from RufusClient.crawler import Crawler
+from RufusClient.dispatcher import LLMDispatcher
+from openai import OpenAI
+from tests.llm_server import FakeLLMServer
+from tests.test_crawler import pricing_site
+from tests.site_server import LocalSite
+
+
+class Interrupted(Exception):
+    pass
+
+
+class TestCrawlCheckpoint(unittest.TestCase):
+    """
+    Offline tests for crash-safe checkpoints and resumed crawls.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "run.sqlite")
+
+    def test_record_and_load(self):
+        checkpoint = CrawlCheckpoint(self.path)
+        self.assertIsNone(checkpoint.load())
+        checkpoint.record_page("https://a.example/", "<p>pricing</p>", True,
+                               [("https://a.example/b", 1, None), ("https://a.example/c", 1, 2.5)])
+        checkpoint.record_page("https://a.example/b", "<p>nothing</p>", False)
+        checkpoint.record_extraction("https://a.example/", "pricing")
+        checkpoint.close()
+
+        reopened = CrawlCheckpoint(self.path)
+        state = reopened.load()
+        self.assertEqual(state["fetched"], ["https://a.example/", "https://a.example/b"])
+        self.assertEqual(state["visited"], ["https://a.example/"])
+        self.assertEqual(state["frontier"], [("https://a.example/c", 1, 2.5)])
+        self.assertEqual(reopened.page("https://a.example/"), "<p>pricing</p>")
+        self.assertIsNone(reopened.page("https://a.example/b"))
+        self.assertEqual(reopened.extraction("https://a.example/"), "pricing")
+        reopened.reset()
+        self.assertIsNone(reopened.load())
+        reopened.close()
+
+    def test_interrupted_crawl_resumes_without_refetching(self):
+        with LocalSite(pricing_site()) as site:
+            expected = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2).crawl()
+            site.hits.clear()
+
+            checkpoint = CrawlCheckpoint(self.path)
+            crawler = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2, checkpoint=checkpoint)
+            fetch = crawler.fetch
+
+            def crashing_fetch(url):
+                if len(site.hits) == 4:
+                    raise Interrupted()
+                return fetch(url)
+
+            crawler.fetch = crashing_fetch
+            with self.assertRaises(Interrupted):
+                crawler.crawl()
+            checkpoint.close()
+
+            checkpoint = CrawlCheckpoint(self.path)
+            resumed = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2, checkpoint=checkpoint)
+            visited = resumed.crawl()
+            checkpoint.close()
+
+        self.assertEqual(visited, expected)
+        self.assertEqual(len(site.hits), len(set(site.hits)))
+        self.assertEqual(len(site.hits), len(expected))
+
+    def test_interrupted_best_first_crawl_resumes_with_acrawl(self):
+        with LocalSite(pricing_site()) as site:
+            expected = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2,
+                               strategy="best_first").crawl()
+            site.hits.clear()
+
+            checkpoint = CrawlCheckpoint(self.path)
+            crawler = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2, checkpoint=checkpoint,
+                              strategy="best_first", max_pages=3)
+            crawler.crawl()
+            checkpoint.close()
+
+            checkpoint = CrawlCheckpoint(self.path)
+            resumed = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2, checkpoint=checkpoint,
+                              strategy="best_first")
+            visited = asyncio.run(resumed.acrawl())
+            checkpoint.close()
+
+        self.assertEqual(visited, expected)
+        self.assertEqual(len(site.hits), len(set(site.hits)))
+
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "test_api_key"})
+    @patch("RufusClient.client.Synthesizer")
+    @patch("RufusClient.client.Parser")
+    def test_scrape_resume_skips_fetches_and_llm_calls(self, mock_parser, mock_synthesizer):
+        mock_parser.return_value.parse.return_value = {"extracted_content": "pricing"}
+        mock_synthesizer.return_value.synthesize.side_effect = [Interrupted(), {"pricing": []}]
+        client = RufusClient(user_prompt="pricing", max_depth=1, checkpoint_dir=self.directory.name)
+
+        with LocalSite(pricing_site()) as site:
+            with self.assertRaises(Interrupted):
+                client.scrape(site.url("/"))
+            hits, parses = len(site.hits), mock_parser.call_count
+            result = client.scrape(site.url("/"), resume=True)
+
+        self.assertEqual(result, {"pricing": []})
+        self.assertEqual(len(site.hits), hits)
+        self.assertEqual(mock_parser.call_count, parses)
+        aggregated = mock_synthesizer.call_args[0][0]
+        self.assertEqual(aggregated["extracted_content"], ["pricing"] * parses)
+
+
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "test_api_key"})
+    @patch("RufusClient.client.Synthesizer")
+    def test_failed_extractions_are_retried_on_resume(self, mock_synthesizer):
+        mock_synthesizer.return_value.synthesize.side_effect = [Interrupted(), {"pricing": []}]
+        llm_down = True
+
+        def responder(request):
+            if llm_down:
+                raise ConnectionError("provider down")  # The server drops the connection
+            return "pricing"
+
+        dispatcher = LLMDispatcher(max_retries=0)
+        self.addCleanup(dispatcher.close)
+        client = RufusClient(user_prompt="pricing", max_depth=1, checkpoint_dir=self.directory.name,
+                             llm_dispatcher=dispatcher)
+        with FakeLLMServer(responder=responder) as server, LocalSite(pricing_site()) as site:
+            llm = OpenAI(api_key="test_api_key", base_url=server.base_url)
+            with patch("RufusClient.parser.get_llm_client", return_value=llm):
+                with self.assertRaises(Interrupted):
+                    client.scrape(site.url("/"))
+                failed_calls = len(server.requests)
+                llm_down = False
+                client.scrape(site.url("/"), resume=True)
+
+        self.assertGreater(failed_calls, 0)
+        self.assertEqual(len(server.requests), failed_calls * 2)
+        aggregated = mock_synthesizer.call_args[0][0]
+        self.assertEqual(aggregated["extracted_content"], ["pricing"] * failed_calls)
+
+
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "test_api_key"})
+    @patch("RufusClient.client.Synthesizer")
+    @patch("RufusClient.client.Parser")
+    def test_completed_scrape_deletes_its_checkpoint(self, mock_parser, mock_synthesizer):
+        mock_parser.return_value.parse.return_value = {"extracted_content": "pricing"}
+        mock_synthesizer.return_value.synthesize.return_value = {"pricing": []}
+        client = RufusClient(user_prompt="pricing", max_depth=1, checkpoint_dir=self.directory.name)
+        with LocalSite(pricing_site()) as site:
+            client.scrape(site.url("/"))
+            path = checkpoint_path(site.url("/"), "pricing", self.directory.name)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "test_api_key"})
+    @patch("RufusClient.client.Synthesizer")
+    @patch("RufusClient.client.Parser")
+    def test_checkpoints_can_be_disabled(self, mock_parser, mock_synthesizer):
+        mock_parser.return_value.parse.return_value = {"extracted_content": "pricing"}
+        mock_synthesizer.return_value.synthesize.return_value = {"pricing": []}
+        client = RufusClient(user_prompt="pricing", max_depth=1, checkpoint_dir=None)
+        with LocalSite(pricing_site()) as site:
+            self.assertEqual(client.scrape(site.url("/")), {"pricing": []})
+            with self.assertRaises(ValueError):
+                client.scrape(site.url("/"), resume=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
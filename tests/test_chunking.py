@@ -0,0 +1,85 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from RufusClient.chunking import split_into_chunks
+from RufusClient.parser import Parser
+from RufusClient.tokens import count_tokens
+
+SECTIONS = "\n\n".join(f"## Section {i}\n\n" + "\n\n".join(f"Paragraph {i}.{j} about pricing tier {j}." * 5
+                                                              for j in range(6)) for i in range(8))
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions: echoes each chunk's first line after a delay."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def create(self, model, messages, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        content = messages[-1]["content"].split("Page Content:\n", 1)[1]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content.splitlines()[0]))])
+
+
+class TestChunking(unittest.TestCase):
+    def test_short_text_is_one_chunk(self):
+        self.assertEqual(split_into_chunks("## A\n\nshort", 100), ["## A\n\nshort"])
+        self.assertEqual(split_into_chunks("", 100), [])
+
+    def test_chunks_respect_budget_and_sections(self):
+        chunks = split_into_chunks(SECTIONS, 400)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(count_tokens(chunk), 400)
+        self.assertTrue(all(chunk.startswith("## Section") for chunk in chunks))
+        self.assertEqual("".join(chunks).replace("\n", ""), SECTIONS.replace("\n", ""))
+
+    def test_oversized_block_is_split(self):
+        text = "word " * 2000
+        chunks = split_into_chunks(text, 300)
+        self.assertTrue(all(count_tokens(chunk) <= 300 for chunk in chunks))
+        self.assertEqual("".join(chunks).split(), text.split())
+
+
+class TestParserMapReduce(unittest.TestCase):
+    def parser(self, content, completions, **kwargs):
+        parser = Parser(content, "pricing", "test_api_key", reducer=None, **kwargs)
+        parser.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return parser
+
+    def test_long_page_chunks_are_extracted_concurrently_in_order(self):
+        completions = FakeCompletions(delay=0.2)
+        parser = self.parser(SECTIONS, completions, chunk_tokens=400, max_workers=8)
+        start = time.perf_counter()
+        extracted = parser.extract_relevant_sections()
+        elapsed = time.perf_counter() - start
+
+        chunks = parser.token_report["chunks"]
+        self.assertGreater(chunks, 2)
+        self.assertEqual(completions.calls, chunks)
+        self.assertGreater(completions.max_in_flight, 1)
+        self.assertLess(elapsed, 0.2 * chunks / 2)
+        headings = [line for line in extracted.splitlines() if line]
+        self.assertEqual(headings, sorted(headings, key=lambda line: int(line.split()[-1])))
+
+    def test_short_page_is_one_call(self):
+        completions = FakeCompletions(delay=0)
+        parser = self.parser("<p>pricing</p>", completions)
+        self.assertEqual(parser.parse(), {"extracted_content": "<p>pricing</p>"})
+        self.assertEqual(completions.calls, 1)
+        self.assertEqual(parser.token_report["chunks"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from RufusClient.client import RufusClient
+from RufusClient.synthesis_state import synthesis_state_path
+from tests.test_crawler import pricing_site
+from tests.site_server import LocalSite
+
+
+class TestRufusClientScrape(unittest.TestCase):
+    """
+    Offline tests for RufusClient.scrape with the LLM stages mocked out.
+    """
+    def setUp(self):
+        patcher = patch.dict(os.environ, {"OPENAI_API_KEY": "test_api_key"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("RufusClient.client.Synthesizer")
+    @patch("RufusClient.client.Parser")
+    def test_scrape_fetches_each_page_once(self, mock_parser, mock_synthesizer):
+        mock_parser.return_value.parse.return_value = {"extracted_content": "pricing"}
+        mock_synthesizer.return_value.synthesize.return_value = {"pricing": []}
+
+        with LocalSite(pricing_site()) as site:
+            result = RufusClient(user_prompt="pricing", max_depth=1).scrape(site.url("/"))
+
+        self.assertEqual(result, {"pricing": []})
+        self.assertEqual(len(site.hits), len(set(site.hits)))
+        self.assertEqual(mock_parser.call_count, 3)
+
+    @patch("RufusClient.client.Synthesizer")
+    @patch("RufusClient.client.Parser")
+    def test_incremental_scrape_updates_the_saved_synthesis(self, mock_parser, mock_synthesizer):
+        mock_parser.return_value.parse.return_value = {"extracted_content": "pricing"}
+        mock_synthesizer.return_value.model = "chatgpt-4o-latest"
+        mock_synthesizer.return_value.synthesize_incremental.return_value = {"pricing": []}
+
+        with tempfile.TemporaryDirectory() as directory, LocalSite(pricing_site()) as site:
+            client = RufusClient(user_prompt="pricing", max_depth=1, checkpoint_dir=directory,
+                                 incremental_synthesis=True)
+            self.assertEqual(client.scrape(site.url("/")), {"pricing": []})
+
+            extractions, state = mock_synthesizer.return_value.synthesize_incremental.call_args.args
+            self.assertEqual(len(extractions), 3)
+            self.assertEqual(state.path, synthesis_state_path(site.url("/"), "pricing", directory))
+        mock_synthesizer.return_value.synthesize.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,24 @@
+import asyncio
 import unittest
 from RufusClient.crawler import Crawler
+from RufusClient.frontier import Frontier, score_link
+from tests.site_server import LocalSite
+
+
+def pricing_site():
+    """
+    A small site where every page mentions pricing and links deeper,
+    plus one irrelevant link and one off-site link that must be ignored.
+    """
+    pages = {"/": '<a href="/pricing/a">a</a><a href="/pricing/b">b</a><a href="/about">about</a>'
+                  '<a href="https://example.com/pricing">x</a> pricing'}
+    for name in "ab":
+        pages[f"/pricing/{name}"] = "".join(
+            f'<a href="/pricing/{name}{i}">{name}{i}</a>' for i in range(4)) + f" pricing {name}"
+        for i in range(4):
+            pages[f"/pricing/{name}{i}"] = f'<a href="/pricing/{name}{i}/deep">deep</a> pricing {name}{i}'
+    pages["/about"] = "about us, pricing"
+    return pages
 
 class TestCrawler(unittest.TestCase):
     """
@@ -95,5 +114,130 @@ class TestCrawler(unittest.TestCase):
         crawled_urls = self.crawler.crawl()
         self.assertGreater(len(crawled_urls), 1) 
 
+
+class TestAsyncCrawl(unittest.TestCase):
+    """
+    Offline tests for Crawler.acrawl against a local HTTP server.
+    """
+    def test_acrawl_matches_crawl(self):
+        with LocalSite(pricing_site()) as site:
+            serial = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2).crawl()
+            concurrent = asyncio.run(
+                Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2).acrawl())
+        self.assertEqual(serial, concurrent)
+        self.assertEqual(len(concurrent), 11)
+        self.assertNotIn(site.url("/about"), concurrent)
+
+    def test_acrawl_is_concurrent(self):
+        with LocalSite(pricing_site(), delay=0.2) as site:
+            crawler = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2)
+            visited = asyncio.run(crawler.acrawl(max_concurrency=8, per_host_concurrency=8))
+        self.assertEqual(len(visited), 11)
+        # The delay keeps each request open long enough for the rest of its level to arrive
+        self.assertGreater(site.max_in_flight, 1)
+        self.assertLessEqual(site.max_in_flight, 8)
+
+
+class TestLinkResolution(unittest.TestCase):
+    """
+    Offline tests for how crawl() resolves, fetches and de-duplicates links.
+    """
+    def test_url_variants_are_fetched_once(self):
+        pages = {"/": '<a href="/pricing">a</a><a href="/pricing/">b</a><a href="/pricing#faq">c</a>'
+                      '<a href="/pricing?utm_source=home">d</a> pricing',
+                 "/pricing": "pricing"}
+        with LocalSite(pages) as site:
+            visited = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2).crawl()
+        self.assertEqual(visited, {site.url("/"), site.url("/pricing")})
+        self.assertEqual(site.hits, ["/", "/pricing"])
+
+    def test_links_resolve_against_the_page_and_markup_is_not_content(self):
+        pages = {"/": '<a href="/docs/pricing">plans</a> pricing',
+                 "/docs/pricing": '<a href="pricing-tiers">tiers</a><a href="pricing-old">old</a> pricing',
+                 "/docs/pricing-tiers": "pricing tiers",
+                 "/docs/pricing-old": '<div class="pricing">retired</div><script>var pricing;</script>'}
+        with LocalSite(pages) as site:
+            visited = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=3).crawl()
+        # "pricing-tiers" is relative to /docs/pricing (the page), not to the site root
+        self.assertIn(site.url("/docs/pricing-tiers"), visited)
+        self.assertNotIn(site.url("/docs/pricing-old"), visited)
+        self.assertIn("/docs/pricing-old", site.hits)
+
+    def test_directory_pages_are_fetched_as_linked(self):
+        pages = {"/": '<a href="/pricing/">docs</a> pricing',
+                 "/pricing/": '<a href="plans">plans</a> pricing',
+                 "/pricing/plans": "pricing plans"}
+        with LocalSite(pages) as site:
+            visited = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2).crawl()
+        self.assertEqual(site.hits, ["/", "/pricing/", "/pricing/plans"])
+        self.assertEqual(site.statuses, [200, 200, 200])
+        self.assertEqual(visited, {site.url("/"), site.url("/pricing/"), site.url("/pricing/plans")})
+
+    def test_links_resolve_against_the_redirect_target(self):
+        pages = {"/": '<a href="/pricing">docs</a> pricing',
+                 "/pricing/": '<a href="plans">plans</a> pricing',
+                 "/pricing/plans": "pricing plans"}
+        with LocalSite(pages, redirects={"/pricing": "/pricing/"}) as site:
+            visited = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2).crawl()
+        self.assertIn(site.url("/pricing/plans"), visited)
+        self.assertNotIn("/plans", site.hits)
+
+
+class TestBestFirstCrawl(unittest.TestCase):
+    """
+    Offline tests for the scored priority frontier and crawl budgets.
+    """
+    pages = {
+        "/": '<a href="/blog/pricing-history">History</a>'
+             '<a href="/company/pricing">Company</a>'
+             '<a href="/plans">Pricing plans</a>'
+             '<a href="/careers">Jobs</a> pricing plans',
+        "/blog/pricing-history": "pricing",
+        "/company/pricing": "pricing",
+        "/plans": "pricing plans",
+        "/careers": "pricing",
+    }
+
+    def test_score_link(self):
+        keywords = ["pricing", "plans"]
+        self.assertEqual(score_link(keywords, "https://a.example/careers", "Jobs", 1.0), 0.0)
+        self.assertGreater(score_link(keywords, "https://a.example/plans", "Pricing plans"),
+                           score_link(keywords, "https://a.example/company/pricing", "Company"))
+
+    def test_frontier_pops_highest_score_first(self):
+        frontier = Frontier()
+        frontier.push("low", 1, 1.0)
+        frontier.push("high", 1, 5.0)
+        frontier.push("tie", 1, 1.0)
+        self.assertEqual([frontier.pop()[0] for _ in range(3)], ["high", "low", "tie"])
+
+    def test_page_budget_keeps_most_promising_pages(self):
+        with LocalSite(self.pages) as site:
+            crawler = Crawler(base_url=site.url("/"), user_prompt="pricing plans", max_depth=2,
+                              strategy="best_first", max_pages=2)
+            visited = crawler.crawl()
+        self.assertEqual(visited, {site.url("/"), site.url("/plans")})
+        self.assertEqual(len(site.hits), 2)
+
+    def test_unbudgeted_crawl_skips_links_without_keywords(self):
+        with LocalSite(self.pages) as site:
+            crawler = Crawler(base_url=site.url("/"), user_prompt="pricing plans", max_depth=2,
+                              strategy="best_first")
+            visited = crawler.crawl()
+        self.assertEqual(len(visited), 4)
+        self.assertNotIn(site.url("/careers"), visited)
+
+    def test_acrawl_drains_the_scored_frontier(self):
+        with LocalSite(self.pages) as site:
+            budgeted = Crawler(base_url=site.url("/"), user_prompt="pricing plans", max_depth=2,
+                               strategy="best_first", max_pages=2)
+            self.assertEqual(asyncio.run(budgeted.acrawl()), {site.url("/"), site.url("/plans")})
+            self.assertEqual(len(site.hits), 2)
+            expected = Crawler(base_url=site.url("/"), user_prompt="pricing plans", max_depth=2,
+                               strategy="best_first").crawl()
+            crawler = Crawler(base_url=site.url("/"), user_prompt="pricing plans", max_depth=2,
+                              strategy="best_first")
+            self.assertEqual(asyncio.run(crawler.acrawl()), expected)
+
 if __name__ == "__main__":
     unittest.main()
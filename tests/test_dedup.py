@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from RufusClient.client import RufusClient
+from RufusClient.dedup import MinHasher, NearDuplicateIndex, jaccard, shingles
+from tests.site_server import LocalSite
+
+ARTICLE = " ".join(f"Paragraph {i} explains the pricing of plan {i} and what it includes for teams." for i in range(40))
+OTHER = " ".join(f"Section {i} lists open positions in office {i} with salary bands and benefits." for i in range(40))
+
+
+class TestMinHash(unittest.TestCase):
+    def test_shingles(self):
+        self.assertEqual(shingles("A b, c d"), {"a b c", "b c d"})
+        self.assertEqual(shingles("Hi there"), {"hi there"})
+        self.assertEqual(shingles("  "), set())
+
+    def test_similarity_estimates(self):
+        hasher = MinHasher()
+        signature = hasher.signature(ARTICLE)
+        self.assertEqual(jaccard(signature, hasher.signature(ARTICLE)), 1.0)
+        self.assertGreater(jaccard(signature, hasher.signature(ARTICLE + " Printed on 2024-05-01.")), 0.9)
+        self.assertLess(jaccard(signature, hasher.signature(OTHER)), 0.2)
+        self.assertIsNone(hasher.signature(""))
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    def test_clusters_exact_and_near_duplicates(self):
+        index = NearDuplicateIndex()
+        self.assertIsNone(index.add("/a", ARTICLE))
+        self.assertEqual(index.add("/a?print=1", "  " + ARTICLE.replace(". ", ".\n")), "/a")
+        self.assertEqual(index.add("/a?sort=desc", ARTICLE + " Sorted by newest."), "/a")
+        self.assertIsNone(index.add("/jobs", OTHER))
+        self.assertIsNone(index.add("/empty", ""))
+        self.assertEqual(index.clusters(), {"/a": ["/a?print=1", "/a?sort=desc"]})
+
+    def test_threshold(self):
+        half = ARTICLE[:len(ARTICLE) // 2] + OTHER[len(OTHER) // 2:]
+        strict, loose = NearDuplicateIndex(threshold=0.9), NearDuplicateIndex(threshold=0.2)
+        for index in (strict, loose):
+            index.add("/a", ARTICLE)
+        self.assertIsNone(strict.add("/b", half))
+        self.assertEqual(loose.add("/b", half), "/a")
+
+class TestScrapeSkipsDuplicates(unittest.TestCase):
+    """
+    Offline test: only one page per duplicate group reaches the Parser.
+    """
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "test_api_key"})
+    @patch("RufusClient.client.Synthesizer")
+    @patch("RufusClient.client.Parser")
+    def test_scrape_parses_one_page_per_group(self, mock_parser, mock_synthesizer):
+        mock_parser.return_value.parse.return_value = {"extracted_content": "pricing"}
+        pages = {
+            "/": '<a href="/pricing">Pricing</a><a href="/pricing?view=print">Print</a>'
+                 '<a href="/pricing?sort=desc">Newest</a><a href="/pricing-jobs">Jobs</a> pricing',
+            "/pricing": f"<nav>Home</nav><p>{ARTICLE}</p>",
+            "/pricing?view=print": f"<p>{ARTICLE}</p>",
+            "/pricing?sort=desc": f"<nav>Home</nav><p>{ARTICLE} Sorted by newest.</p>",
+            "/pricing-jobs": f"<p>{OTHER} pricing</p>",
+        }
+        with tempfile.TemporaryDirectory() as directory, LocalSite(pages) as site:
+            client = RufusClient(user_prompt="pricing", max_depth=1, checkpoint_dir=directory)
+            client.scrape(site.url("/"))
+
+        parsed = [call.args[0] for call in mock_parser.call_args_list]
+        self.assertEqual(len(parsed), 3)
+        self.assertEqual(set(client.skipped_duplicates), {site.url("/pricing?view=print"), site.url("/pricing?sort=desc")})
+        self.assertEqual(set(client.skipped_duplicates.values()), {site.url("/pricing")})
+
+
+if __name__ == "__main__":
+    unittest.main()
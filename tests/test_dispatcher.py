@@ -0,0 +1,174 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from RufusClient import dispatcher as dispatcher_module
+from RufusClient.dispatcher import (LLMDispatcher, TokenBucket, dispatch_call, estimate_request_tokens,
+                                    get_llm_dispatcher, is_retryable, retry_after, PRIORITY_HIGH, PRIORITY_LOW)
+from RufusClient.llm_clients import LLMClientRegistry
+from RufusClient.parser import Parser
+from tests.llm_server import FakeLLMServer
+
+MESSAGES = [{"role": "user", "content": "pricing"}]
+
+
+def error(status=None, headers=None):
+    return SimpleNamespace(status_code=status, response=SimpleNamespace(headers=headers or {}))
+
+
+class TestRateLimitHelpers(unittest.TestCase):
+    def test_retry_after(self):
+        self.assertEqual(retry_after(error(429, {"retry-after-ms": "1500", "retry-after": "2"})), 1.5)
+        self.assertEqual(retry_after(error(429, {"retry-after": "3"})), 3.0)
+        self.assertIsNone(retry_after(error(429)))
+        self.assertIsNone(retry_after(ValueError("no response")))
+
+    def test_retryable(self):
+        self.assertTrue(is_retryable(error(429)))
+        self.assertTrue(is_retryable(error(503)))
+        self.assertFalse(is_retryable(error(400)))
+        self.assertFalse(is_retryable(ValueError("bad schema")))
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(60, capacity=2)  # One token per second
+        self.assertEqual(bucket.delay(2), 0)
+        bucket.take(2)
+        self.assertAlmostEqual(bucket.delay(1), 1.0, places=1)
+        self.assertAlmostEqual(bucket.delay(10), 2.0, places=1)  # Oversized requests wait for a full bucket
+
+    def test_providers_get_their_own_limits(self):
+        with patch.dict(dispatcher_module._dispatchers, clear=True):
+            groq, openai = get_llm_dispatcher("groq"), get_llm_dispatcher("openai")
+            self.addCleanup(groq.close)
+            self.addCleanup(openai.close)
+            self.assertEqual(groq.tpm.capacity, 6_000)  # A full minute of Groq quota
+            self.assertEqual(openai.rpm.rate, 500 / 60)
+            self.assertEqual(dispatch_call("lm-studio", lambda: "local", tokens=50_000), "local")
+            self.assertNotIn("lm-studio", dispatcher_module._dispatchers)
+
+    def test_estimate_counts_prompt_and_completion(self):
+        small = estimate_request_tokens(MESSAGES, 100)
+        self.assertGreater(small, 100)
+        self.assertGreater(estimate_request_tokens([{"role": "user", "content": "pricing " * 500}], 100), small + 400)
+
+
+class TestLLMDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.registry = LLMClientRegistry()
+        self.addCleanup(self.registry.close)
+
+    def dispatcher(self, **kwargs):
+        dispatcher = LLMDispatcher(**kwargs)
+        self.addCleanup(dispatcher.close)
+        return dispatcher
+
+    def run_calls(self, server, dispatcher, count):
+        client = self.registry.get("openai", "test_api_key", base_url=server.base_url)
+        futures = [dispatcher.submit(*dispatcher._chat_call(client, dict(model="fake", messages=[
+            {"role": "user", "content": f"page {i}"}]))) for i in range(count)]
+        return [future.result(timeout=30).choices[0].message.content for future in futures]
+
+    def test_paces_calls_under_the_limit(self):
+        # Server accepts 10 requests per 0.5s; dispatcher allows 960 RPM (8 per 0.5s)
+        with FakeLLMServer(limit=10, window=0.5) as server:
+            dispatcher = self.dispatcher(requests_per_minute=960, burst_seconds=0.05)
+            start = time.perf_counter()
+            results = self.run_calls(server, dispatcher, 40)
+            elapsed = time.perf_counter() - start
+        self.assertEqual(results, [f"page {i}" for i in range(40)])
+        self.assertEqual(server.throttled, 0)
+        self.assertLess(elapsed, 5.0)  # 16 req/s against a ceiling of 20, so about 2.5s
+
+    def test_throttled_calls_are_retried_not_dropped(self):
+        with FakeLLMServer(limit=5, window=0.3) as server:
+            dispatcher = self.dispatcher(requests_per_minute=100_000, max_concurrency=8)
+            results = self.run_calls(server, dispatcher, 30)
+        self.assertEqual(results, [f"page {i}" for i in range(30)])
+        self.assertGreater(dispatcher.stats["throttled"], 0)
+        self.assertEqual(dispatcher.stats["failed"], 0)
+        self.assertEqual(dispatcher.stats["completed"], 30)
+        self.assertLess(server.throttled, 30)  # Admissions pause after a 429 instead of storming
+
+    def test_higher_priority_runs_first(self):
+        dispatcher = self.dispatcher(max_concurrency=1)
+        release = threading.Event()
+        order = []
+        blocker = dispatcher.submit(release.wait)
+        time.sleep(0.05)
+        futures = [dispatcher.submit(lambda name=name: order.append(name), priority=priority)
+                   for name, priority in [("low", PRIORITY_LOW), ("normal-1", 10), ("high", PRIORITY_HIGH),
+                                          ("normal-2", 10)]]
+        time.sleep(0.05)
+        release.set()
+        for future in [blocker] + futures:
+            future.result(timeout=5)
+        self.assertEqual(order, ["high", "normal-1", "normal-2", "low"])
+
+    def test_groups_are_served_round_robin(self):
+        dispatcher = self.dispatcher(max_concurrency=1)
+        release = threading.Event()
+        order = []
+        blocker = dispatcher.submit(release.wait)
+        time.sleep(0.05)
+        big_site, small_site = dispatcher.for_group("big"), dispatcher.for_group("small")
+        futures = [big_site.submit(lambda i=i: order.append(f"big-{i}")) for i in range(4)]
+        futures += [small_site.submit(lambda i=i: order.append(f"small-{i}")) for i in range(2)]
+        time.sleep(0.05)
+        release.set()
+        for future in [blocker] + futures:
+            future.result(timeout=5)
+        self.assertEqual(order, ["big-0", "small-0", "big-1", "small-1", "big-2", "big-3"])
+
+    def test_blocking_call_times_out_after_retry_budget(self):
+        dispatcher = self.dispatcher(max_retries=1, max_delay=0.1, call_timeout=0.2)
+        self.assertAlmostEqual(dispatcher.result_timeout, 0.2 * 2 + 0.1)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        start = time.perf_counter()
+        with self.assertRaises(TimeoutError):
+            dispatcher.call(release.wait)
+        self.assertLess(time.perf_counter() - start, 2)
+
+    def test_failed_scheduler_fails_pending_calls(self):
+        dispatcher = self.dispatcher(max_concurrency=1)
+        release = threading.Event()
+        blocker = dispatcher.submit(release.wait)
+        time.sleep(0.05)
+        queued = dispatcher.submit(lambda: "never")
+
+        def broken(*args):
+            raise RuntimeError("scheduler bug")
+
+        dispatcher.rpm.delay = broken
+        release.set()
+        blocker.result(timeout=5)
+        with self.assertRaises(RuntimeError):
+            queued.result(timeout=5)
+        with self.assertRaises(RuntimeError):
+            dispatcher.call(lambda: "later")
+
+    def test_non_retryable_errors_raise(self):
+        dispatcher = self.dispatcher()
+
+        def fail():
+            raise ValueError("bad request")
+
+        with self.assertRaises(ValueError):
+            dispatcher.call(fail)
+        self.assertEqual(dispatcher.stats["retried"], 0)
+
+    def test_parser_keeps_throttled_pages(self):
+        with FakeLLMServer(limit=1, window=0.2, responder=lambda request: "Pro plan") as server:
+            dispatcher = self.dispatcher(requests_per_minute=100_000)
+            client = self.registry.get("openai", "test_api_key", base_url=server.base_url)
+            results = []
+            for _ in range(3):
+                parser = Parser("<p>Pro plan</p>", "pricing", "test_api_key", dispatcher=dispatcher)
+                parser.client = client
+                results.append(parser.parse())
+        self.assertEqual(results, [{"extracted_content": "Pro plan"}] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from RufusClient.html_scan import scan_html
+
+PAGE = """<html><head><title>Pricing plans</title>
+<style>.pricing { color: red }</style>
+<script>var pricing = "hidden";</script></head>
+<body>
+<p>Compare our PRICING tiers.</p>
+<a href="/plans">See <b>plans</b></a>
+<a href="https://other.example.org/x">Elsewhere</a>
+<a href="plans#top">Plans again</a>
+<!-- pricing in a comment -->
+<a href="mailto:sales@example.com">Mail</a>
+</body></html>"""
+
+
+class TestScanHtml(unittest.TestCase):
+    def test_links_resolved_against_page_url_with_anchor_text(self):
+        scan = scan_html(PAGE, "https://example.com/docs/", ["pricing"])
+        self.assertEqual(scan.links["https://example.com/plans"], "See plans")
+        self.assertEqual(scan.links["https://example.com/docs/plans#top"], "Plans again")
+        self.assertIn("https://other.example.org/x", scan.links)
+
+    def test_accept_link_filters_and_rewrites(self):
+        def accept(url):
+            return url.split("#")[0] if url.startswith("https://example.com/") else None
+        scan = scan_html(PAGE, "https://example.com/docs/", [], accept)
+        self.assertEqual(set(scan.links), {"https://example.com/plans", "https://example.com/docs/plans"})
+
+    def test_keywords_counted_in_visible_text_only(self):
+        scan = scan_html(PAGE, "https://example.com/", ["Pricing", "refund"])
+        # Title and paragraph; not the style, script or comment
+        self.assertEqual(scan.keyword_hits, {"pricing": 2, "refund": 0})
+        self.assertTrue(scan.relevant)
+        self.assertEqual(scan.relevance, 0.5)
+
+    def test_markup_alone_is_not_relevant(self):
+        scan = scan_html('<div class="pricing-table"><a href="/pricing">Go</a></div>',
+                         "https://example.com/", ["pricing"])
+        self.assertFalse(scan.relevant)
+        self.assertEqual(list(scan.links), ["https://example.com/pricing"])
+
+    def test_base_href_and_empty_pages(self):
+        scan = scan_html('<base href="https://cdn.example.com/root/"><a href="page">x</a>',
+                         "https://example.com/", [])
+        self.assertEqual(list(scan.links), ["https://cdn.example.com/root/page"])
+        empty = scan_html("", "https://example.com/", ["pricing"])
+        self.assertEqual((empty.links, empty.relevant, empty.relevance), ({}, False, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import asyncio
+import glob
+import os
+import unittest
+from unittest.mock import patch
+from RufusClient.client import RufusClient
+from RufusClient.crawler import Crawler
+from RufusClient.html_scan import scan_html
+from RufusClient.html_workers import HtmlWorkerPool, pack, unpack
+from RufusClient.reducer import DEFAULT_REDUCER, HtmlReducer
+from tests.test_crawler import pricing_site
+from tests.site_server import LocalSite
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures", "*.html")))
+
+
+def read_fixtures():
+    pages = []
+    for path in FIXTURES:
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+class TestHtmlWorkerPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = HtmlWorkerPool(workers=2)
+        cls.pages = read_fixtures()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_pages_travel_as_compressed_bytes(self):
+        data = pack(self.pages[0])
+        self.assertIsInstance(data, bytes)
+        self.assertLess(len(data), len(self.pages[0].encode("utf-8")) / 3)
+        self.assertEqual(unpack(data), self.pages[0])
+
+    def test_reduction_matches_in_process(self):
+        expected = [DEFAULT_REDUCER.reduce(page) for page in self.pages]
+        self.assertEqual(self.pool.reduce(self.pages[0]), expected[0])
+        self.assertEqual(self.pool.reduce_many(self.pages + [None]), expected + [""])
+
+    def test_map_pages_runs_other_conversions(self):
+        self.assertEqual(self.pool.map_pages(str.upper, self.pages + [None]), [page.upper() for page in self.pages] + [""])
+
+    def test_workers_use_the_pool_reducer(self):
+        with HtmlWorkerPool(workers=1, reducer=HtmlReducer(markdown=False)) as pool:
+            self.assertEqual(pool.reduce(self.pages[0]), HtmlReducer(markdown=False).reduce(self.pages[0]))
+
+    def test_scan_matches_in_process(self):
+        keywords = ["pricing", "plans"]
+        for page in self.pages:
+            expected = scan_html(page, "https://example.com/page", keywords)
+            scan = self.pool.scan(page, "https://example.com/page", keywords)
+            self.assertEqual(scan.links, expected.links)
+            self.assertEqual(scan.keyword_hits, expected.keyword_hits)
+            self.assertEqual(scan.text_length, expected.text_length)
+
+
+class TestHtmlWorkersInScrape(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = HtmlWorkerPool(workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_crawl_finds_the_same_pages(self):
+        with LocalSite(pricing_site()) as site:
+            expected = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2).crawl()
+            crawler = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=2, html_workers=self.pool)
+            self.assertEqual(asyncio.run(crawler.acrawl()), expected)
+            # Off-site links are still dropped, in this process
+            scan = crawler.scan_page('<a href="https://example.com/pricing">x</a><a href="/pricing">p</a>')
+            self.assertEqual(scan.links, {crawler.canonicalize(site.url("/pricing")): "p"})
+
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "test_api_key"})
+    @patch("RufusClient.client.Synthesizer")
+    @patch("RufusClient.client.Parser")
+    def test_pages_are_reduced_by_the_pool(self, mock_parser, mock_synthesizer):
+        mock_parser.return_value.parse.return_value = {"extracted_content": "pricing"}
+        mock_synthesizer.return_value.synthesize.return_value = {}
+
+        client = RufusClient(user_prompt="pricing", max_depth=1, top_k=3, html_workers=self.pool)
+        with LocalSite(pricing_site()) as site:
+            client.scrape(site.url("/"))
+        self.assertTrue(mock_parser.call_args_list)
+        for call in mock_parser.call_args_list:
+            self.assertIs(call.kwargs["reducer"], self.pool)
+        self.assertTrue(client.passage_ranking.passages)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from RufusClient.http_cache import HttpCache, freshness_deadline
+from RufusClient.http_pool import HttpPool
+from RufusClient.crawler import Crawler
+from tests.site_server import LocalSite
+
+
+class TestHttpCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache = HttpCache(os.path.join(self.directory, "cache.sqlite"))
+        self.addCleanup(self.cache.close)
+        self.pool = HttpPool(cache=self.cache)
+        self.addCleanup(self.pool.close)
+
+    def test_freshness(self):
+        self.assertEqual(freshness_deadline({"Cache-Control": "max-age=60"}, 100), 160)
+        self.assertIsNone(freshness_deadline({"Cache-Control": "no-cache, max-age=60"}, 100))
+        self.assertIsNone(freshness_deadline({}, 100))
+
+    def test_unchanged_page_costs_a_304(self):
+        with LocalSite({"/": "<p>pricing</p>"}, etag=True) as site:
+            first = self.pool.get(site.url("/"))
+            second = self.pool.get(site.url("/"))
+        self.assertEqual(site.statuses, [200, 304])
+        self.assertEqual(first.text, second.text)
+        self.assertTrue(second.not_modified)
+        self.assertEqual((self.cache.misses, self.cache.revalidated), (1, 1))
+
+    def test_fresh_entries_skip_the_network(self):
+        with LocalSite({"/": "<p>pricing</p>"}, headers={"Cache-Control": "max-age=3600"}) as site:
+            self.pool.get(site.url("/"))
+            response = self.pool.get(site.url("/#section"))
+        self.assertEqual(len(site.hits), 1)
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.text, "<p>pricing</p>")
+
+    def test_no_store_is_not_cached(self):
+        with LocalSite({"/": "<p>pricing</p>"}, headers={"Cache-Control": "no-store"}) as site:
+            self.pool.get(site.url("/"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_lru_eviction_by_size(self):
+        self.cache.max_bytes = 250
+        pages = {f"/{i}": "x" * 100 for i in range(4)}
+        with LocalSite(pages) as site:
+            for i in range(3):
+                self.pool.get(site.url(f"/{i}"))
+            self.pool.get(site.url("/0"))  # still stale, refreshes /0 as most recently used
+            self.pool.get(site.url("/3"))
+        self.assertLessEqual(self.cache.total_bytes(), 250)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_counters_are_exact_under_concurrency(self):
+        with LocalSite({"/": "<p>pricing</p>"}, headers={"Cache-Control": "max-age=3600"}) as site:
+            self.pool.get(site.url("/"))
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda _: self.pool.get(site.url("/")), range(200)))
+        self.assertEqual((self.cache.misses, self.cache.hits), (1, 200))
+
+    def test_cache_persists_across_runs(self):
+        with LocalSite({"/": "<p>pricing</p>"}, etag=True) as site:
+            Crawler(base_url=site.url("/"), user_prompt="pricing", http_cache=self.cache).crawl()
+            self.cache.close()
+            reopened = HttpCache(self.cache.path)
+            self.addCleanup(reopened.close)
+            crawler = Crawler(base_url=site.url("/"), user_prompt="pricing", http_cache=reopened)
+            crawler.crawl()
+        self.assertEqual(site.statuses, [200, 304])
+        self.assertEqual(crawler.unchanged, {site.url("/")})
+
+
+if __name__ == "__main__":
+    unittest.main()
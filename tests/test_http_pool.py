@@ -0,0 +1,28 @@
+import unittest
+import requests
+from RufusClient.http_pool import HttpPool
+from tests.site_server import LocalSite
+
+
+class TestHttpPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = HttpPool(pool_maxsize=2)
+        self.addCleanup(self.pool.close)
+
+    def test_reuses_connections(self):
+        with LocalSite({"/": "<p>hello</p>"}) as site:
+            for _ in range(20):
+                self.assertEqual(self.pool.get(site.url("/")).text, "<p>hello</p>")
+        self.assertEqual(len(site.hits), 20)
+        self.assertEqual(site.connections, 1)
+
+    def test_bad_status_raises_request_exception(self):
+        with LocalSite({}) as site:
+            with self.assertRaises(requests.exceptions.RequestException):
+                self.pool.get(site.url("/missing"))
+            response = self.pool.get(site.url("/missing"), raise_for_status=False)
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from RufusClient.keywords import stem, extract_keywords, KeywordMatcher
+from RufusClient.frontier import score_link
+
+
+class TestKeywords(unittest.TestCase):
+    def test_stem_groups_inflections(self):
+        self.assertEqual({stem(word) for word in ("price", "prices", "pricing", "Priced")}, {"pric"})
+        self.assertEqual({stem(word) for word in ("plans", "planning", "planned")}, {"plan"})
+        self.assertEqual(stem("studies"), "study")
+        self.assertEqual(stem("class"), "class")
+        self.assertNotEqual(stem("planet"), stem("plan"))
+
+    def test_extract_keywords_drops_stopwords_and_duplicate_stems(self):
+        prompt = "Find information about the pricing plans and the price of each plan, FAQs?"
+        self.assertEqual(extract_keywords(prompt), ["pricing", "plans", "faqs"])
+
+    def test_prompt_of_only_stopwords_is_kept(self):
+        self.assertEqual(extract_keywords("Who are you?"), ["who", "are", "you"])
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    def test_counts_whole_words_by_stem(self):
+        matcher = KeywordMatcher(["Pricing", "plans"])
+        counts = matcher.count("Our PRICE list: prices, pricing. A prick on a planet. Planning ahead.")
+        self.assertEqual(counts, {"pricing": 3, "plans": 1})
+
+    def test_accumulates_over_text_nodes(self):
+        matcher = KeywordMatcher(["tuition"])
+        counts = matcher.count("Tuition fees")
+        matcher.count("tuition deadlines", counts)
+        self.assertEqual(counts, {"tuition": 2})
+
+    def test_search(self):
+        matcher = KeywordMatcher(["pricing"])
+        self.assertTrue(matcher.search("https://example.com/pricing/a"))
+        self.assertFalse(matcher.search("https://example.com/apricot"))
+        self.assertFalse(KeywordMatcher([]).search("anything"))
+
+    def test_score_link_matches_by_stem(self):
+        self.assertGreater(score_link(["pricing"], "https://example.com/prices", "Our plans"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from pydantic import BaseModel
+from RufusClient.llm_cache import LLMCache, llm_cache_key
+from RufusClient.llm_clients import LLMClientRegistry
+from RufusClient.parser import Parser
+from RufusClient.synthesizer import Synthesizer
+from tests.llm_server import FakeLLMServer
+
+
+class Listing(BaseModel):
+    name: str
+
+
+class TestLLMCacheKey(unittest.TestCase):
+    def test_key_depends_on_every_input(self):
+        base = dict(provider="openai", model="m", system_prompt="s", user_prompt="p", content="c")
+        key = llm_cache_key(**base)
+        self.assertEqual(key, llm_cache_key(**base))
+        for name in base:
+            self.assertNotEqual(key, llm_cache_key(**dict(base, **{name: "other"})))
+        self.assertNotEqual(key, llm_cache_key(**base, temperature=0.5))
+        self.assertNotEqual(key, llm_cache_key(**base, max_tokens=10))
+        self.assertNotEqual(key, llm_cache_key(**base, schema=Listing))
+        self.assertEqual(llm_cache_key(**base, schema=Listing),
+                         llm_cache_key(**base, schema=Listing.model_json_schema()))
+
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "llm.sqlite")
+
+    def open(self, **kwargs):
+        cache = LLMCache(self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_hits_misses_and_persistence(self):
+        cache = self.open()
+        self.assertIsNone(cache.get("k"))
+        cache.set("k", {"listings": [{"name": "Pro"}]})
+        self.assertEqual(cache.get("k"), {"listings": [{"name": "Pro"}]})
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5})
+        cache.close()
+        self.assertEqual(self.open().get("k"), {"listings": [{"name": "Pro"}]})
+
+    def test_bypass_skips_lookup_but_stores(self):
+        cache = self.open(bypass=True)
+        cache.set("k", "old")
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.get("k", bypass=False), "old")
+        self.assertEqual(cache.misses, 1)
+
+    def test_expired_entries_are_misses(self):
+        cache = self.open(ttl=60)
+        cache.set("k", "value")
+        with patch("RufusClient.llm_cache.time.time", return_value=time.time() + 61):
+            self.assertIsNone(cache.get("k"))
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = self.open(max_entries=2)
+        now = time.time()
+        for offset, key in enumerate(["a", "b"]):
+            with patch("RufusClient.llm_cache.time.time", return_value=now + offset):
+                cache.set(key, key)
+        with patch("RufusClient.llm_cache.time.time", return_value=now + 2):
+            cache.get("a")
+        with patch("RufusClient.llm_cache.time.time", return_value=now + 3):
+            cache.set("c", "c")
+        self.assertEqual(cache.get("a"), "a")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "c")
+
+    def test_size_budget(self):
+        cache = self.open(max_bytes=100)
+        for i in range(10):
+            cache.set(str(i), "x" * 30)
+        self.assertLessEqual(cache.total_bytes(), 100)
+
+
+class TestCachedCalls(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = LLMCache(os.path.join(directory.name, "llm.sqlite"))
+        self.addCleanup(self.cache.close)
+        self.registry = LLMClientRegistry()
+        self.addCleanup(self.registry.close)
+
+    def test_repeat_parse_makes_no_call(self):
+        with FakeLLMServer(responder=lambda request: "Pro plan: $20") as server:
+            client = self.registry.get("openai", "test_api_key", base_url=server.base_url)
+            results = []
+            for _ in range(2):
+                parser = Parser("<p>Pro plan: $20</p>", "pricing", "test_api_key", cache=self.cache)
+                parser.client = client
+                results.append(parser.parse())
+        self.assertEqual(results[0], {"extracted_content": "Pro plan: $20"})
+        self.assertEqual(results[1], results[0])
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_repeat_synthesis_makes_no_call(self):
+        with FakeLLMServer(responder=lambda request: '{"plans": ["Pro"]}') as server:
+            client = self.registry.get("openai", "test_api_key", base_url=server.base_url)
+            results = []
+            for _ in range(2):
+                synthesizer = Synthesizer({"extracted_content": ["Pro"]}, "pricing", "test_api_key",
+                                          cache=self.cache)
+                synthesizer.client = client
+                results.append(synthesizer.synthesize())
+        self.assertEqual(results, [{"plans": ["Pro"]}] * 2)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_failed_calls_are_not_cached(self):
+        with FakeLLMServer() as server:
+            parser = Parser("<p>pricing</p>", "pricing", "test_api_key", cache=self.cache)
+            parser.client = self.registry.get("openai", "test_api_key", base_url=server.base_url + "/missing")
+            self.assertEqual(parser.parse(), {})
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from RufusClient.llm_clients import LLMClientRegistry
+from RufusClient.parser import Parser
+from RufusClient.synthesizer import Synthesizer
+from tests.llm_server import FakeLLMServer
+
+
+class TestLLMClientRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = LLMClientRegistry()
+        self.addCleanup(self.registry.close)
+
+    def test_one_client_per_provider_endpoint_and_key(self):
+        first = self.registry.get("openai", "key-a")
+        self.assertIs(self.registry.get("openai", "key-a"), first)
+        self.assertIsNot(self.registry.get("openai", "key-b"), first)
+        self.assertIsNot(self.registry.get("openai", "key-a", base_url="http://localhost:1234/v1"), first)
+        self.assertEqual(len(self.registry), 3)
+
+    def test_unknown_provider(self):
+        with self.assertRaises(ValueError):
+            self.registry.get("nope", "key")
+
+    def test_calls_reuse_one_connection(self):
+        with FakeLLMServer() as server:
+            for _ in range(10):
+                client = self.registry.get("openai", "test_api_key", base_url=server.base_url)
+                response = client.chat.completions.create(
+                    model="fake", messages=[{"role": "user", "content": "pricing"}])
+                self.assertEqual(response.choices[0].message.content, "pricing")
+        self.assertEqual(len(server.requests), 10)
+        self.assertEqual(server.connections, 1)
+
+
+class TestSharedClients(unittest.TestCase):
+    def test_parsers_and_synthesizer_share_the_client(self):
+        parsers = [Parser(f"<p>page {i}</p>", "pricing", "shared-key") for i in range(3)]
+        synthesizer = Synthesizer({"page": "text"}, "pricing", "shared-key")
+        self.assertTrue(all(parser.client is synthesizer.client for parser in parsers))
+        self.assertIsNot(Parser("<p>x</p>", "pricing", "other-key").client, synthesizer.client)
+
+
+if __name__ == "__main__":
+    unittest.main()
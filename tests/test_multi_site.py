@@ -0,0 +1,100 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from contextlib import ExitStack
+from unittest.mock import patch
+from RufusClient.client import RufusClient
+from RufusClient.dispatcher import DispatcherGroup
+from tests.test_crawler import pricing_site
+from tests.site_server import LocalSite
+
+
+def slow_parse():
+    time.sleep(0.05)  # One LLM extraction
+    return {"extracted_content": "pricing"}
+
+
+class TestMultiSiteScrape(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(os.environ, {"OPENAI_API_KEY": "test_api_key"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.client = RufusClient(user_prompt="pricing", max_depth=1, checkpoint_dir=directory.name)
+
+    def test_site_clients_share_resources_but_not_reports(self):
+        site = self.client.for_site("http://a.example/")
+        self.assertIsInstance(site.llm_dispatcher, DispatcherGroup)
+        self.assertIs(site.llm_dispatcher.dispatcher, self.client.llm_dispatcher)
+        self.assertIs(site.llm_cache, self.client.llm_cache)
+        site.token_reports["http://a.example/"] = {}
+        self.assertEqual(self.client.token_reports, {})
+        self.assertIs(site.for_site("http://b.example/").llm_dispatcher.dispatcher, self.client.llm_dispatcher)
+
+    @patch("RufusClient.client.Synthesizer")
+    @patch("RufusClient.client.Parser")
+    def test_sites_run_concurrently(self, mock_parser, mock_synthesizer):
+        mock_parser.return_value.parse.side_effect = slow_parse
+        mock_synthesizer.return_value.synthesize.return_value = {"pricing": []}
+
+        with ExitStack() as stack:
+            urls = [stack.enter_context(LocalSite(pricing_site(), delay=0.1)).url("/") for _ in range(4)]
+            start = time.perf_counter()
+            for url in urls:
+                self.client.scrape(url)
+            sequential = time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = dict(self.client.scrape_many(urls))
+            concurrent = time.perf_counter() - start
+
+        self.assertEqual(results, dict.fromkeys(urls, {"pricing": []}))
+        self.assertLess(concurrent, sequential * 0.5)
+
+    @patch("RufusClient.client.Synthesizer")
+    @patch("RufusClient.client.Parser")
+    def test_results_come_in_completion_order(self, mock_parser, mock_synthesizer):
+        mock_parser.return_value.parse.return_value = {"extracted_content": "pricing"}
+        mock_synthesizer.return_value.synthesize.return_value = {"pricing": []}
+
+        with LocalSite(pricing_site(), delay=0.2) as slow, LocalSite(pricing_site()) as fast:
+            results = list(self.client.scrape_many([slow.url("/"), fast.url("/")]))
+        self.assertEqual([url for url, _ in results], [fast.url("/"), slow.url("/")])
+
+    def test_failed_site_is_returned_or_raised(self):
+        def scrape(site, url, **kwargs):
+            if "bad" in url:
+                raise RuntimeError("site down")
+            return {"url": url}
+
+        with patch.object(RufusClient, "scrape", autospec=True, side_effect=scrape):
+            results = dict(self.client.scrape_many(["http://good.example/", "http://bad.example/"]))
+            self.assertEqual(results["http://good.example/"], {"url": "http://good.example/"})
+            self.assertIsInstance(results["http://bad.example/"], RuntimeError)
+            with self.assertRaises(RuntimeError):
+                list(self.client.scrape_many(["http://bad.example/"], return_exceptions=False))
+
+    def test_async_api(self):
+        def scrape(site, url, **kwargs):
+            time.sleep(0.1)
+            return {"url": url, **kwargs}
+
+        async def run():
+            single = await self.client.ascrape("http://one.example/", stream=True)
+            start = time.perf_counter()
+            many = [result async for result in self.client.ascrape_many(
+                [f"http://{i}.example/" for i in range(8)], max_sites=8)]
+            return single, many, time.perf_counter() - start
+
+        with patch.object(RufusClient, "scrape", autospec=True, side_effect=scrape):
+            single, many, elapsed = asyncio.run(run())
+        self.assertEqual(single, {"url": "http://one.example/", "stream": True})
+        self.assertEqual(sorted(url for url, _ in many), sorted(f"http://{i}.example/" for i in range(8)))
+        self.assertLess(elapsed, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
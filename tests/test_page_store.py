@@ -0,0 +1,53 @@
+import os
+import threading
+import unittest
+from unittest.mock import patch
+from RufusClient.page_store import PageStore
+
+
+class TestPageStore(unittest.TestCase):
+    def setUp(self):
+        self.store = PageStore(max_memory_bytes=100)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_round_trip(self):
+        self.store.put("https://a.example/", "<p>hello</p>")
+        self.assertIn("https://a.example/", self.store)
+        self.assertEqual(self.store.get("https://a.example/"), "<p>hello</p>")
+        self.assertIsNone(self.store.get("https://missing.example/"))
+
+    def test_spills_least_recently_used_pages(self):
+        pages = {f"https://a.example/{i}": f"<p>{i}</p>" + "x" * 40 for i in range(5)}
+        for url, html in pages.items():
+            self.store.put(url, html)
+        self.assertEqual(len(self.store), 5)
+        self.assertTrue(self.store.spill_dir and os.listdir(self.store.spill_dir))
+        for url, html in pages.items():
+            self.assertEqual(self.store.get(url), html)
+
+    def test_spilled_read_is_not_raced_by_close(self):
+        self.store.put("https://a.example/0", "a" * 60)
+        self.store.put("https://a.example/1", "b" * 60)  # Spills /0
+
+        def open_racing_close(path, *args, **kwargs):
+            closer = threading.Thread(target=self.store.close)
+            closer.start()
+            closer.join(0.2)  # close() runs to completion unless the read holds the lock
+            return open(path, *args, **kwargs)
+
+        with patch("RufusClient.page_store.open", open_racing_close, create=True):
+            self.assertEqual(self.store.get("https://a.example/0"), "a" * 60)
+
+    def test_close_removes_spill_dir(self):
+        for i in range(5):
+            self.store.put(f"https://a.example/{i}", "y" * 60)
+        spill_dir = self.store.spill_dir
+        self.store.close()
+        self.assertFalse(os.path.exists(spill_dir))
+        self.assertEqual(len(self.store), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from RufusClient.client import RufusClient
+from RufusClient.pipeline import PagePipeline, Stage
+from tests.test_crawler import pricing_site
+from tests.site_server import LocalSite
+
+
+def slow(seconds, function=lambda item: item):
+    def stage(item):
+        time.sleep(seconds)
+        return function(item)
+    return stage
+
+
+class TestPagePipeline(unittest.TestCase):
+    def test_every_item_flows_through_every_stage(self):
+        pipeline = PagePipeline([Stage("double", lambda item: item * 2, workers=3),
+                                 Stage("drop-odd", lambda item: item if item % 4 == 0 else None)])
+        outputs = pipeline.run(lambda emit: [emit(item) for item in range(20)])
+        self.assertEqual(sorted(outputs), [item * 2 for item in range(0, 20, 2)])
+        self.assertEqual(pipeline.stats["double"]["processed"], 20)
+        self.assertEqual(pipeline.stats["drop-odd"]["dropped"], 10)
+
+    def test_stages_overlap_with_the_producer(self):
+        def produce(emit):
+            for item in range(10):
+                time.sleep(0.05)  # Fetching
+                emit(item)
+
+        pipeline = PagePipeline([Stage("extract", slow(0.05), workers=2)])
+        start = time.perf_counter()
+        pipeline.run(produce)
+        elapsed = time.perf_counter() - start
+        # Sequential phases would take 0.5s + 0.5s; streamed, about the crawl alone
+        self.assertLess(elapsed, 0.8)
+
+    def test_slow_consumer_applies_backpressure(self):
+        emitted, lock = [], threading.Lock()
+
+        def produce(emit):
+            for item in range(12):
+                emit(item)
+                with lock:
+                    emitted.append(time.perf_counter())
+
+        pipeline = PagePipeline([Stage("fast", lambda item: item), Stage("slow", slow(0.05))], queue_size=2)
+        start = time.perf_counter()
+        outputs = pipeline.run(produce)
+        self.assertEqual(sorted(outputs), list(range(12)))
+        for stats in pipeline.stats.values():
+            self.assertLessEqual(stats["max_queued"], 2)
+        # The producer was held back: the last item went in long after the first
+        self.assertGreater(emitted[-1] - start, 0.2)
+
+    def test_failed_items_are_dropped_and_producer_errors_raised(self):
+        def fragile(item):
+            if item == 3:
+                raise ValueError("bad page")
+            return item
+
+        def produce(emit):
+            for item in range(5):
+                emit(item)
+            raise RuntimeError("crawl died")
+
+        pipeline = PagePipeline([Stage("fragile", fragile)])
+        with self.assertRaises(RuntimeError):
+            pipeline.run(produce)
+        self.assertEqual(sorted(pipeline.outputs), [0, 1, 2, 4])
+        self.assertEqual(pipeline.stats["fragile"]["failed"], 1)
+
+
+class TestStreamingScrape(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(os.environ, {"OPENAI_API_KEY": "test_api_key"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("RufusClient.client.Synthesizer")
+    @patch("RufusClient.client.Parser")
+    def test_pages_stream_into_extraction_and_synthesis(self, mock_parser, mock_synthesizer):
+        mock_parser.return_value.prepare_chunks.return_value = ["chunk"]
+        mock_parser.return_value.extract_chunks.return_value = "pricing"
+        mock_parser.return_value.content = "<p>pricing</p>"
+        stream = mock_synthesizer.return_value.stream.return_value
+        stream.finish.return_value = {"pricing": []}
+
+        client = RufusClient(user_prompt="pricing", max_depth=1)
+        with LocalSite(pricing_site()) as site:
+            result = client.scrape(site.url("/"), stream=True)
+
+        self.assertEqual(result, {"pricing": []})
+        self.assertEqual(mock_parser.return_value.extract_chunks.call_count, 3)
+        self.assertEqual(stream.add.call_count, 3)
+        mock_synthesizer.return_value.synthesize.assert_not_called()
+        self.assertEqual(client.pipeline_stats["extract"]["processed"], 3)
+
+    def test_batch_and_stream_are_exclusive(self):
+        with self.assertRaises(ValueError):
+            RufusClient(user_prompt="pricing").scrape("http://localhost/", batch=True, stream=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
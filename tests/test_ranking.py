@@ -0,0 +1,92 @@
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from RufusClient.client import RufusClient
+from RufusClient.parser import Parser
+from RufusClient.ranking import PassageRanking
+from RufusClient.tokens import count_tokens, input_cost
+from tests.test_chunking import FakeCompletions
+from tests.test_crawler import pricing_site
+from tests.site_server import LocalSite
+
+FILLER = "Our team enjoys hiking, coffee and long walks along the river every single weekend. " * 4
+PAGE = "\n\n".join([
+    "## About us\n\n" + FILLER,
+    "## Pricing\n\nThe Basic plan costs $10 per month and the Pro plan costs $30 per month.",
+    "## Careers\n\n" + FILLER,
+    "## Plans compared\n\nEvery plan includes support; Pro plans add priority pricing reviews.",
+    "## Contact\n\n" + FILLER,
+])
+
+
+class TestPassageRanking(unittest.TestCase):
+    def test_relevant_passages_rank_first_and_keep_document_order(self):
+        ranking = PassageRanking("pricing plans", {"page": PAGE}, passage_tokens=40)
+        selected = ranking.select_text("page", k=2)
+        self.assertIn("Basic plan costs", selected)
+        self.assertIn("Plans compared", selected)
+        self.assertNotIn("hiking", selected)
+        self.assertLess(selected.index("Basic plan"), selected.index("Plans compared"))
+
+    def test_token_budget_skips_passages_that_do_not_fit(self):
+        ranking = PassageRanking("pricing plans", {"page": PAGE}, passage_tokens=40)
+        selected = ranking.select_text("page", token_budget=25)
+        self.assertTrue(selected)
+        self.assertLessEqual(count_tokens(selected), 25)
+
+    def test_idf_is_measured_across_all_documents(self):
+        # "plan" appears in every document, "refund" in one: the refund passage wins
+        documents = {f"page-{i}": f"## Plan {i}\n\nThe plan is great." for i in range(5)}
+        documents["refunds"] = "## Plan refund\n\nEvery plan has a refund policy."
+        ranking = PassageRanking("plan refund", documents)
+        self.assertEqual(ranking.passages[int(ranking.scores.argmax())][0], "refunds")
+
+    def test_page_without_matches_falls_back_to_leading_passages(self):
+        ranking = PassageRanking("pricing", {"page": PAGE.replace("ric", "")}, passage_tokens=40)
+        self.assertEqual(ranking.select("page", k=2), [0, 1])
+
+    def test_cost_report_covers_each_k_and_the_whole_page(self):
+        ranking = PassageRanking("pricing plans", {"page": PAGE}, passage_tokens=40)
+        report = ranking.cost_report("page", ks=(1, 2))
+        self.assertEqual(list(report), [1, 2, "all"])
+        self.assertLess(report[1]["tokens"], report[2]["tokens"])
+        self.assertLess(report[2]["tokens"], report["all"]["tokens"])
+        self.assertEqual(report["all"]["cost"], input_cost(report["all"]["tokens"]))
+
+
+class TestPassageSelectionInParser(unittest.TestCase):
+    def test_only_selected_passages_are_sent(self):
+        completions = FakeCompletions(delay=0)
+        parser = Parser(PAGE, "pricing plans", "test_api_key", reducer=None, top_k=1)
+        parser.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        parser.parse()
+        self.assertEqual(completions.calls, 1)
+        self.assertLess(parser.token_report["tokens_selected"], parser.token_report["tokens_after"])
+
+
+class TestRufusClientPassageRanking(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(os.environ, {"OPENAI_API_KEY": "test_api_key"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("RufusClient.client.Synthesizer")
+    @patch("RufusClient.client.Parser")
+    def test_one_ranking_is_shared_by_every_page(self, mock_parser, mock_synthesizer):
+        mock_parser.return_value.parse.return_value = {"extracted_content": "pricing"}
+        mock_synthesizer.return_value.synthesize.return_value = {}
+
+        client = RufusClient(user_prompt="pricing", max_depth=1, top_k=3)
+        with LocalSite(pricing_site()) as site:
+            client.scrape(site.url("/"))
+
+        rankings = {id(call.kwargs["ranking"]) for call in mock_parser.call_args_list}
+        self.assertEqual(rankings, {id(client.passage_ranking)})
+        self.assertEqual(set(client.passage_reports), {call.kwargs["page_key"] for call in mock_parser.call_args_list})
+        for report in client.passage_reports.values():
+            self.assertEqual(list(report), [1, 3, 5, 10, "all"])
+
+
+if __name__ == "__main__":
+    unittest.main()
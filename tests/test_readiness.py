@@ -0,0 +1,110 @@
+import unittest
+from RufusClient.readiness import PageReadiness, PROBE_SCRIPT, SCROLL_SCRIPT
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakePage:
+    """
+    Simulated browser page driven by a FakeClock.
+
+    The document finishes loading at ``load_at``, the DOM keeps changing until
+    ``settles_at``, and each scroll loads one more batch of content (0.2s later)
+    until ``batches`` run out.
+    """
+
+    def __init__(self, clock, load_at=0.3, settles_at=0.6, batches=0, never_settles=False):
+        self.clock = clock
+        self.load_at = load_at
+        self.settles_at = settles_at
+        self.batches = batches
+        self.never_settles = never_settles
+        self.height = 1000
+        self.pending = []  # times at which scroll-triggered content lands
+        self.last_change = settles_at
+
+    def execute_script(self, script):
+        now = self.clock()
+        for when in [w for w in self.pending if w <= now]:
+            self.pending.remove(when)
+            self.height += 1000
+            self.last_change = max(self.last_change, when)
+        if script == SCROLL_SCRIPT:
+            self.last_change = now
+            if self.batches:
+                self.batches -= 1
+                self.pending.append(now + 0.2)
+            return None
+        assert script == PROBE_SCRIPT
+        last_change = now if self.never_settles else min(self.last_change, now)
+        if not self.never_settles and now < self.settles_at:
+            last_change = now
+        return {
+            "readyState": "complete" if now >= self.load_at else "loading",
+            "inflight": 1 if self.pending else 0,
+            "quietFor": (now - last_change) * 1000,
+            "height": self.height,
+        }
+
+
+class TestPageReadiness(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.readiness = PageReadiness(deadline=10, quiet_period=0.5, poll_interval=0.1,
+                                       clock=self.clock, sleep=self.clock.sleep)
+
+    def test_fast_page_returns_without_fixed_sleeps(self):
+        record = self.readiness.wait(FakePage(self.clock), "https://a.example/")
+        # 0.6s to settle + 0.5s quiet, then one scroll that brings nothing new
+        self.assertLess(record["waited"], 2.0)
+        self.assertEqual(record["scrolls"], 1)
+        self.assertFalse(record["timed_out"])
+
+    def test_infinite_scroll_stops_when_no_new_content(self):
+        page = FakePage(self.clock, batches=3)
+        record = self.readiness.wait(page, "https://a.example/feed")
+        self.assertEqual(page.height, 4000)
+        self.assertEqual(record["scrolls"], 4)
+        self.assertFalse(record["timed_out"])
+
+    def test_probe_ignores_attribute_and_text_churn(self):
+        # Carousels and clocks only flip classes or text; they must not hold a page at the deadline
+        self.assertIn("childList: true", PROBE_SCRIPT)
+        self.assertNotIn("attributes: true", PROBE_SCRIPT)
+        self.assertNotIn("characterData: true", PROBE_SCRIPT)
+
+    def test_deadline_bounds_busy_pages(self):
+        record = self.readiness.wait(FakePage(self.clock, never_settles=True), "https://a.example/busy")
+        self.assertTrue(record["timed_out"])
+        self.assertAlmostEqual(record["waited"], 10, delta=0.2)
+
+    def test_records_wait_time_per_page(self):
+        self.readiness.wait(FakePage(self.clock), "https://a.example/1")
+        self.readiness.wait(FakePage(self.clock, load_at=self.clock() + 0.3,
+                                     settles_at=self.clock() + 0.6), "https://a.example/2")
+        self.assertEqual([r["url"] for r in self.readiness.records],
+                         ["https://a.example/1", "https://a.example/2"])
+        self.assertAlmostEqual(self.readiness.total_wait(),
+                               sum(r["waited"] for r in self.readiness.records))
+
+    def test_records_are_bounded(self):
+        readiness = PageReadiness(deadline=10, clock=self.clock, sleep=self.clock.sleep, max_records=2)
+        for i in range(5):
+            readiness.wait(FakePage(self.clock, load_at=self.clock() + 0.3, settles_at=self.clock() + 0.6),
+                           f"https://a.example/{i}")
+        self.assertEqual([r["url"] for r in readiness.records], ["https://a.example/3", "https://a.example/4"])
+        self.assertEqual(readiness.pages, 5)
+        self.assertGreater(readiness.total_wait(), sum(r["waited"] for r in readiness.records))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from RufusClient.reducer import HtmlReducer, collapse_whitespace
+from RufusClient.tokens import count_tokens
+
+PAGE = """<html><head><title>Plans</title><style>.a{color:red}</style>
+<script id="__NEXT_DATA__" type="application/json">{"props": {"plans": [1, 2, 3]}}</script></head>
+<body class="flex items-center bg-white" data-theme="light">
+<!-- build 1234 -->
+<nav class="nav"><a class="link px-4" href="/pricing" data-track="nav">Pricing</a></nav>
+<h1 class="text-5xl">Plans</h1>
+<svg viewBox="0 0 24 24"><path d="M4.5 12.75l6 6 9-13.5"/></svg>
+<table class="table"><tr><td class="cell" colspan="2">Team</td><td>$12/month</td></tr></table>
+<button type="button" class="faq">Can I cancel?</button>
+<div hidden><p>Old promotion</p></div>
+<p style="display: none">Tracking pixel text</p>
+<img src="data:image/png;base64,iVBORw0KGgo=" alt="Logo">
+<form><input name="q"><p>Yes,    anytime.</p></form>
+</body></html>"""
+
+
+class TestHtmlReducer(unittest.TestCase):
+    def test_markdown_keeps_content_and_drops_noise(self):
+        reduced = HtmlReducer().reduce(PAGE)
+        for kept in ("[Pricing](/pricing)", "# Plans", "Team", "$12/month", "Can I cancel?", "Yes, anytime.", "Logo"):
+            self.assertIn(kept, reduced)
+        for dropped in ("__NEXT_DATA__", "plans\": [1", "color:red", "build 1234", "M4.5", "Old promotion",
+                        "Tracking pixel", "base64", "flex items-center"):
+            self.assertNotIn(dropped, reduced)
+
+    def test_cleaned_html_keeps_only_semantic_attributes(self):
+        reduced = HtmlReducer(markdown=False).reduce(PAGE)
+        self.assertIn('<a href="/pricing">Pricing</a>', reduced)
+        self.assertIn('<td colspan="2">Team</td>', reduced)
+        self.assertNotIn("class=", reduced)
+        self.assertNotIn("data-track", reduced)
+        self.assertNotIn("<script", reduced)
+
+    def test_options(self):
+        self.assertNotIn("/pricing", HtmlReducer(keep_links=False).reduce(PAGE))
+        self.assertIn("Old promotion", HtmlReducer(keep_hidden=True).reduce(PAGE))
+        self.assertEqual(HtmlReducer().reduce("  "), "")
+
+    def test_token_reduction(self):
+        bloated = PAGE.replace("<h1", "<script>" + "var x = 1;" * 2000 + "</script><h1")
+        self.assertLess(count_tokens(HtmlReducer().reduce(bloated)) * 10, count_tokens(bloated))
+
+    def test_title_is_kept(self):
+        self.assertTrue(HtmlReducer().reduce(PAGE).startswith("Plans\n\n"))
+        self.assertIn("<p>Plans</p>", HtmlReducer(markdown=False).reduce(PAGE))
+
+    def test_xml_declaration(self):
+        page = '<?xml version="1.0" encoding="utf-8"?>\n<html><body><p class="x">Team plan</p></body></html>'
+        self.assertEqual(HtmlReducer().reduce(page), "Team plan")
+
+    def test_markdown_indentation_is_kept(self):
+        reduced = HtmlReducer().reduce("<ul><li>Team<ul><li>5 seats</li></ul></li></ul><pre>if a:\n    b()</pre>")
+        self.assertIn("  * Team\n    * 5 seats", reduced)
+        self.assertIn("    if a:\n        b()", reduced)
+
+    def test_collapse_whitespace(self):
+        self.assertEqual(collapse_whitespace("\na  b \n\n \n\n  c \n"), "a  b\n\n  c")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import gzip
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timezone
+from RufusClient.crawler import Crawler
+from RufusClient.http_cache import HttpCache
+from RufusClient.sitemap import iter_sitemap, parse_lastmod
+from tests.site_server import LocalSite
+
+
+def urlset(*entries):
+    body = "".join(f"<url><loc>{loc}</loc>{f'<lastmod>{lastmod}</lastmod>' if lastmod else ''}</url>"
+                   for loc, lastmod in entries)
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{body}</urlset>'
+
+
+def sitemap_site():
+    """
+    A site whose pricing pages are only reachable through a gzipped sitemap behind a sitemap index.
+    """
+    site = LocalSite({"/": "pricing home"})
+    site.pages.update({
+        "/robots.txt": f"User-agent: *\nDisallow: /pricing/private\n"
+                       f"Sitemap: {site.url('/sitemap_index.xml')}\n",
+        "/sitemap_index.xml": '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                              f'<sitemap><loc>{site.url("/sitemap-pages.xml.gz")}</loc></sitemap></sitemapindex>',
+        "/sitemap-pages.xml.gz": gzip.compress(urlset(
+            (site.url("/"), None),
+            (site.url("/pricing/a"), "2020-01-01"),
+            (site.url("/pricing/b"), "2020-01-01T00:00:00Z"),
+            (site.url("/pricing/private"), None),
+            (site.url("/careers"), None),
+            ("https://other.example.org/pricing", None)).encode("utf-8")),
+        "/pricing/a": "pricing a",
+        "/pricing/b": "pricing b",
+        "/pricing/private": "pricing secret",
+        "/careers": "pricing jobs",
+    })
+    return site
+
+
+class TestSitemapParsing(unittest.TestCase):
+    def test_parse_lastmod(self):
+        self.assertEqual(parse_lastmod("2024-05-01"), datetime(2024, 5, 1, tzinfo=timezone.utc))
+        self.assertEqual(parse_lastmod("2024-05-01T12:00:00Z"), datetime(2024, 5, 1, 12, tzinfo=timezone.utc))
+        self.assertIsNone(parse_lastmod("yesterday"))
+
+    def test_iter_sitemap_plain_gzip_and_index(self):
+        document = urlset(("https://a.example/x", "2024-01-02"), ("https://a.example/y", None)).encode("utf-8")
+        expected = [("url", "https://a.example/x", parse_lastmod("2024-01-02")), ("url", "https://a.example/y", None)]
+        self.assertEqual(list(iter_sitemap(document)), expected)
+        self.assertEqual(list(iter_sitemap(gzip.compress(document))), expected)
+        index = b"<sitemapindex><sitemap><loc>https://a.example/s.xml.gz</loc></sitemap></sitemapindex>"
+        self.assertEqual(list(iter_sitemap(index)), [("sitemap", "https://a.example/s.xml.gz", None)])
+
+    def test_truncated_sitemap_keeps_entries_read(self):
+        document = urlset(("https://a.example/x", None), ("https://a.example/y", None)).encode("utf-8")
+        self.assertEqual([loc for _, loc, _ in iter_sitemap(document[:-40])], ["https://a.example/x"])
+
+
+class TestSitemapSeeding(unittest.TestCase):
+    """
+    Offline tests for robots.txt / sitemap frontier seeding.
+    """
+    def test_seeds_relevant_allowed_urls_before_fetching_pages(self):
+        with sitemap_site() as site:
+            visited = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=1,
+                              use_sitemaps=True).crawl()
+        self.assertEqual(visited, {site.url("/"), site.url("/pricing/a"), site.url("/pricing/b")})
+        self.assertEqual(site.hits[:3], ["/robots.txt", "/sitemap_index.xml", "/sitemap-pages.xml.gz"])
+        self.assertNotIn("/pricing/private", site.hits)
+        self.assertNotIn("/careers", site.hits)
+
+    def test_best_first_acrawl_fetches_sitemap_seeds(self):
+        with sitemap_site() as site:
+            crawler = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=1, use_sitemaps=True,
+                              strategy="best_first")
+            visited = asyncio.run(crawler.acrawl())
+        self.assertEqual(visited, {site.url("/"), site.url("/pricing/a"), site.url("/pricing/b")})
+
+    def test_lastmod_skips_pages_cached_since(self):
+        with tempfile.TemporaryDirectory() as directory, sitemap_site() as site:
+            cache = HttpCache(os.path.join(directory, "cache.sqlite"))
+            Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=1, use_sitemaps=True,
+                    http_cache=cache).crawl()
+            site.hits.clear()
+            crawler = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=1, use_sitemaps=True,
+                              http_cache=cache)
+            visited = crawler.crawl()
+            cache.close()
+        self.assertEqual(len(visited), 3)
+        self.assertNotIn("/pricing/a", site.hits)
+        self.assertNotIn("/pricing/b", site.hits)
+        self.assertEqual(crawler.unchanged, {site.url("/pricing/a"), site.url("/pricing/b")})
+
+    def test_crawl_delay_spaces_requests(self):
+        pages = {"/robots.txt": "User-agent: *\nCrawl-delay: 1\n",
+                 "/": '<a href="/pricing">plans</a> pricing', "/pricing": "pricing"}
+        with LocalSite(pages) as site:
+            crawler = Crawler(base_url=site.url("/"), user_prompt="pricing", max_depth=1, use_sitemaps=True)
+            start = time.perf_counter()
+            visited = crawler.crawl()
+            elapsed = time.perf_counter() - start
+        self.assertEqual(len(visited), 2)
+        self.assertEqual(crawler.crawl_delay, 1.0)
+        self.assertGreaterEqual(elapsed, 1.0)  # Two page fetches, one delay between them
+        self.assertEqual(site.hits.count("/robots.txt"), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from RufusClient.llm_clients import LLMClientRegistry
+from RufusClient.synthesis_state import SynthesisState
+from RufusClient.synthesizer import Synthesizer
+from tests.llm_server import FakeLLMServer
+
+PAGES = [f"Plan {i}: costs ${i} per month. " + "Includes email support and a dashboard. " * 20 for i in range(24)]
+
+
+def tree_responder(request):
+    """Structures pages as {"plans": [first words]} and merges documents by concatenating their plans."""
+    data = json.loads(request["messages"][-1]["content"].split("\n\n", 1)[1])
+    if request["messages"][-1]["content"].startswith("Merge"):
+        return json.dumps({"plans": [plan for document in data for plan in document["plans"]]})
+    pages = data if isinstance(data, list) else [data]
+    return "```json\n" + json.dumps({"plans": [page.split(":")[0] for page in pages]}) + "\n```"
+
+
+class TestTreeSynthesis(unittest.TestCase):
+    def setUp(self):
+        self.registry = LLMClientRegistry()
+        self.addCleanup(self.registry.close)
+
+    def synthesizer(self, server, data, **kwargs):
+        synthesizer = Synthesizer(data, "pricing", "test_api_key", **kwargs)
+        synthesizer.client = self.registry.get("openai", "test_api_key", base_url=server.base_url)
+        return synthesizer
+
+    def test_small_input_is_one_call(self):
+        with FakeLLMServer(responder=tree_responder) as server:
+            synthesizer = self.synthesizer(server, {"extracted_content": PAGES[:2]})
+            self.assertEqual(synthesizer.synthesize(), {"plans": ["Plan 0", "Plan 1"]})
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(synthesizer.levels, 1)
+
+    def test_large_input_is_reduced_level_by_level(self):
+        with FakeLLMServer(responder=tree_responder, delay=0.2) as server:
+            synthesizer = self.synthesizer(server, {"extracted_content": PAGES}, batch_tokens=600, max_workers=12)
+            start = time.perf_counter()
+            result = synthesizer.synthesize()
+            elapsed = time.perf_counter() - start
+        self.assertEqual(result, {"plans": [f"Plan {i}" for i in range(24)]})
+        self.assertEqual(synthesizer.levels, 2)
+        self.assertEqual(len(server.requests), 12 + 1)
+        for request in server.requests:
+            self.assertLessEqual(len(request["messages"][-1]["content"]) // 4, 600 + 100)
+        # One round trip per level, not per call
+        self.assertLess(elapsed, 0.2 * (synthesizer.levels + 2))
+
+    def test_items_that_do_not_fit_together_are_paired(self):
+        # No two pages fit one 300-token call: 5 pages -> 3 pairs -> 1 merge
+        with FakeLLMServer(responder=tree_responder) as server:
+            synthesizer = self.synthesizer(server, {"extracted_content": PAGES[:5]}, batch_tokens=300)
+            result = synthesizer.synthesize()
+        self.assertEqual(result, {"plans": [f"Plan {i}" for i in range(5)]})
+        self.assertEqual(synthesizer.levels, 2)
+
+    def test_stream_structures_full_batches_before_finish(self):
+        with FakeLLMServer(responder=tree_responder) as server:
+            synthesizer = self.synthesizer(server, {}, batch_tokens=600)
+            stream = synthesizer.stream()
+            for page in PAGES[:8]:
+                stream.add(page)
+            time.sleep(0.5)
+            structured_early = len(server.requests)
+            result = stream.finish()
+        self.assertEqual(structured_early, 3)  # Batches of pages 0-1, 2-3 and 4-5 were full
+        self.assertEqual(result, {"plans": [f"Plan {i}" for i in range(8)]})
+        self.assertEqual(len(server.requests), 4 + 1)
+
+    def test_failed_batch_is_left_out(self):
+        def responder(request):
+            content = request["messages"][-1]["content"]
+            if "Plan 3" in content and not content.startswith("Merge"):
+                raise ValueError("boom")
+            return tree_responder(request)
+
+        with FakeLLMServer(responder=responder) as server:
+            synthesizer = self.synthesizer(server, {"extracted_content": PAGES[:6]}, batch_tokens=300)
+            result = synthesizer.synthesize()
+        # Plans 2 and 3 shared the failed batch
+        self.assertEqual(result["plans"], ["Plan 0", "Plan 1", "Plan 4", "Plan 5"])
+
+
+class TestIncrementalSynthesis(unittest.TestCase):
+    def setUp(self):
+        self.registry = LLMClientRegistry()
+        self.addCleanup(self.registry.close)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "run.synthesis.json")
+        self.pages = {f"https://example.com/{i}": page for i, page in enumerate(PAGES[:8])}
+
+    def run_synthesis(self, server, pages, prompt="pricing"):
+        synthesizer = Synthesizer({"extracted_content": list(pages.values())}, prompt, "test_api_key",
+                                  batch_tokens=600)
+        synthesizer.client = self.registry.get("openai", "test_api_key", base_url=server.base_url)
+        state = SynthesisState(self.path, prompt, synthesizer.model)
+        document = synthesizer.synthesize_incremental(pages, state)
+        return document, synthesizer
+
+    def test_unchanged_rerun_makes_no_calls(self):
+        with FakeLLMServer(responder=tree_responder) as server:
+            first, synthesizer = self.run_synthesis(server, self.pages)
+            self.assertEqual(sorted(first["plans"]), sorted(f"Plan {i}" for i in range(8)))
+            self.assertEqual(synthesizer.calls, 4 + 1)
+            second, synthesizer = self.run_synthesis(server, self.pages)
+        self.assertEqual(second, first)
+        self.assertEqual(synthesizer.calls, 0)
+        self.assertEqual(synthesizer.report["reused"], 8)
+
+    def test_only_changed_and_removed_sources_are_resynthesized(self):
+        with FakeLLMServer(responder=tree_responder) as server:
+            self.run_synthesis(server, self.pages)
+            pages = dict(self.pages)
+            pages["https://example.com/3"] = pages["https://example.com/3"].replace("Plan 3", "Plan 3b")
+            del pages["https://example.com/6"]
+            pages["https://example.com/new"] = PAGES[20]
+            document, synthesizer = self.run_synthesis(server, pages)
+        self.assertEqual(sorted(document["plans"]),
+                         sorted(["Plan 0", "Plan 1", "Plan 2", "Plan 3b", "Plan 4", "Plan 5", "Plan 7", "Plan 20"]))
+        # Pages 2 and 3 shared a group, as did 6 and 7: pages 0, 1, 4 and 5 were reused
+        self.assertEqual(synthesizer.report, {"sources": 8, "reused": 4, "resynthesized": 4, "removed": 1,
+                                              "calls": synthesizer.calls})
+        self.assertLess(synthesizer.calls, 4 + 1 + 2)
+
+    def test_state_of_another_prompt_is_ignored(self):
+        with FakeLLMServer(responder=tree_responder) as server:
+            self.run_synthesis(server, self.pages)
+            _, synthesizer = self.run_synthesis(server, self.pages, prompt="plans")
+        self.assertEqual(synthesizer.report["reused"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
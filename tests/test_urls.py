@@ -0,0 +1,50 @@
+import unittest
+from RufusClient.urls import canonicalize_url, FingerprintSet, BloomFilter
+
+
+class TestCanonicalizeUrl(unittest.TestCase):
+    def test_spellings_of_the_same_page_collapse(self):
+        variants = [
+            "https://Example.com/products?b=2&a=1",
+            "HTTPS://example.COM:443/products/?a=1&b=2#reviews",
+            "https://example.com/products?utm_source=news&a=1&b=2&gclid=xyz",
+            "https://example.com/products?a=1&UTM_Campaign=spring&b=2&fbclid=1",
+        ]
+        self.assertEqual({canonicalize_url(url) for url in variants}, {"https://example.com/products?a=1&b=2"})
+
+    def test_keeps_meaningful_differences(self):
+        self.assertNotEqual(canonicalize_url("https://example.com/Products"),
+                            canonicalize_url("https://example.com/products"))
+        self.assertNotEqual(canonicalize_url("https://example.com/?page=2"),
+                            canonicalize_url("https://example.com/?page=3"))
+        self.assertEqual(canonicalize_url("http://example.com:8080"), "http://example.com:8080/")
+        # Parameters some sites use to pick content are not tracking noise
+        self.assertNotEqual(canonicalize_url("https://example.com/?ref=a"), canonicalize_url("https://example.com/?ref=b"))
+        self.assertNotEqual(canonicalize_url("https://example.com/?sid=1"), canonicalize_url("https://example.com/?sid=2"))
+
+    def test_configurable_tracking_params(self):
+        url = "https://example.com/?sort=price&page=2"
+        self.assertEqual(canonicalize_url(url, drop_params={"sort"}), "https://example.com/?page=2")
+
+
+class TestSeenSets(unittest.TestCase):
+    def test_fingerprint_set(self):
+        seen = FingerprintSet()
+        self.assertTrue(seen.add("https://example.com/a"))
+        self.assertFalse(seen.add("https://example.com/a/#top"))
+        self.assertIn("https://EXAMPLE.com/a?utm_medium=email", seen)
+        self.assertNotIn("https://example.com/b", seen)
+        self.assertEqual(len(seen), 1)
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=5000, error_rate=1e-3)
+        urls = [f"https://example.com/item/{i}" for i in range(5000)]
+        for url in urls:
+            bloom.add(url)
+        self.assertTrue(all(url in bloom for url in urls))
+        false_positives = sum(f"https://example.com/other/{i}" in bloom for i in range(5000))
+        self.assertLess(false_positives, 25)
+
+
+if __name__ == "__main__":
+    unittest.main()